@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for the hot paths of the colour module
+
+Run with no arguments to time every benchmark and print the results as JSON.
+For each benchmark this gives
+	ops_per_sec
+		calls per second, from the fastest of several timed runs
+	peak_bytes
+		the most memory allocated at any point during a single call
+	blocks
+		the number of memory blocks a single call leaves allocated (its result, 
+		plus anything it caches)
+The memory figures need tracemalloc (Python 3.4 and above) and are null 
+otherwise.
+
+The time taken to import the module in a fresh interpreter is also measured, 
+as import_us (microseconds, needing Python 3.7 and above for -X importtime). 
+The run fails if this is over the import budget, since the module is often 
+imported by short-lived processes.
+
+Examples:
+	# save a baseline
+	python bench.py --output baseline.json
+
+	# compare against it later, failing if anything is over 10% slower
+	python bench.py --baseline baseline.json --threshold 0.1
+
+	# only run the benchmarks whose names match a regular expression
+	python bench.py --filter "^init"
+
+	# only measure the import time, with a budget of 10ms
+	python bench.py --filter "^import$" --import-budget 10
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import itertools
+import json
+import platform
+import os
+import re
+import subprocess
+import sys
+import timeit
+
+try:
+	import tracemalloc
+except ImportError:
+	tracemalloc = None
+
+import colour
+from colour import Colour
+
+# the most milliseconds importing the module may take by default
+IMPORT_BUDGET = 25
+
+def benchmarks():
+	"""
+	Return an ordered dictionary of benchmark names to functions taking no 
+	arguments
+
+	Benchmarks which modify a colour first reset it with the rgb() setter, so 
+	that every call does the same work; the "rgb set" benchmark gives that 
+	cost on its own.
+	"""
+	b = collections.OrderedDict()
+	rgb = (0.855, 0.647, 0.125)
+	hsx = (43.0, 0.744, 0.5)
+	scratch = Colour()
+	goldenrod = Colour("goldenrod")
+	slateblue = Colour("slateblue")
+	counter = itertools.count()
+
+	# constructor dispatch
+	b["init empty"] = lambda: Colour()
+	b["init arg grey"] = lambda: Colour(0.5)
+	b["init arg rgb"] = lambda: Colour(rgb)
+	b["init arg hex"] = lambda: Colour("#daa520")
+	b["init arg css3"] = lambda: Colour("goldenrod")
+	b["init arg colour"] = lambda: Colour(goldenrod)
+	b["init grey"] = lambda: Colour(grey=0.5)
+	b["init rgb"] = lambda: Colour(rgb=rgb)
+	b["init rgb100"] = lambda: Colour(rgb100=(85, 65, 12))
+	b["init rgb255"] = lambda: Colour(rgb255=(218, 165, 32))
+	b["init hsv"] = lambda: Colour(hsv=hsx)
+	b["init hsv100"] = lambda: Colour(hsv100=(43, 74, 50))
+	b["init hsv255"] = lambda: Colour(hsv255=(43, 190, 128))
+	b["init hsl"] = lambda: Colour(hsl=hsx)
+	b["init hsl100"] = lambda: Colour(hsl100=(43, 74, 50))
+	b["init hsl255"] = lambda: Colour(hsl255=(43, 190, 128))
+	b["init yiq"] = lambda: Colour(yiq=(0.5, 0.2, -0.1))
+	b["init hex"] = lambda: Colour(hex="#daa520")
+	b["init css3"] = lambda: Colour(css3="goldenrod")
+	b["init hash"] = lambda: Colour(hash="goldenrod")
+	b["init colour"] = lambda: Colour(colour=goldenrod)
+
+	# factory methods
+	b["from_rgb"] = lambda: Colour.from_rgb(rgb)
+	b["from_rgb255"] = lambda: Colour.from_rgb255((218, 165, 32))
+	b["from_hsv"] = lambda: Colour.from_hsv(hsx)
+	b["from_hsl"] = lambda: Colour.from_hsl(hsx)
+	b["from_yiq"] = lambda: Colour.from_yiq((0.5, 0.2, -0.1))
+	b["from_hex"] = lambda: Colour.from_hex("#daa520")
+	b["from_css3"] = lambda: Colour.from_css3("goldenrod")
+
+	# module-level conversion functions
+	b["rgbtohsv"] = lambda: colour.rgbtohsv(rgb)
+	b["rgbtohsl"] = lambda: colour.rgbtohsl(rgb)
+	b["rgbtoyiq"] = lambda: colour.rgbtoyiq(rgb)
+	b["hsvtorgb"] = lambda: colour.hsvtorgb(hsx)
+	b["hsltorgb"] = lambda: colour.hsltorgb(hsx)
+	b["yiqtorgb"] = lambda: colour.yiqtorgb((0.5, 0.2, -0.1))
+	b["hextorgb"] = lambda: colour.hextorgb("#daa520")
+	b["rgbtohex"] = lambda: colour.rgbtohex(rgb)
+	b["hsvtorgb trusted"] = lambda: colour.hsvtorgb(hsx, trusted=True)
+	rgb255 = Colour.from_rgb255((218, 165, 32)).rgb()
+	lab = colour.rgbtolab(rgb)
+	b["rgbtolab"] = lambda: colour.rgbtolab(rgb)
+	b["rgbtolab from rgb255"] = lambda: colour.rgbtolab(rgb255)
+	b["labtorgb"] = lambda: colour.labtorgb(lab)
+	b["setluma"] = lambda: colour.setluma(rgb, 0.3)
+
+	# 8-bit conversion functions, and the float conversions they replace
+	b["rgb255tohsv255"] = lambda: colour.rgb255tohsv255((218, 165, 32))
+	b["rgb255tohsv255 via floats"] = lambda: tuple(int(round(x * y)) \
+			for x, y in zip(colour.rgbtohsv(rgb255), (1, 255, 255)))
+	b["rgb255tohsl255"] = lambda: colour.rgb255tohsl255((218, 165, 32))
+	b["rgb255toyiq255"] = lambda: colour.rgb255toyiq255((218, 165, 32))
+	b["hsv255torgb255"] = lambda: colour.hsv255torgb255((43, 218, 218))
+	b["hsl255torgb255"] = lambda: colour.hsl255torgb255((43, 190, 125))
+	webcolours = [Colour(hash=str(x)).rgb255() for x in range(1000)] * 10
+	b["rgb255tohsl255_many 10000"] = \
+			lambda: colour.rgb255tohsl255_many(webcolours)
+	if colour._hasnumpy():
+		import numpy
+		webarray = numpy.array(webcolours)
+		b["rgb255tohsl255_many 10000 array"] = \
+				lambda: colour.rgb255tohsl255_many(webarray)
+
+	# hashing, with and without the memo
+	b["hash cached"] = lambda: scratch.hash("goldenrod")
+	b["hash uncached"] = lambda: scratch.hash(str(next(counter)))
+
+	# named colours
+	b["css3 get"] = lambda: goldenrod.css3()
+	b["nearest_css3"] = lambda: slateblue.nearest_css3()
+
+	# getters and setters
+	b["rgb set"] = lambda: scratch.rgb(rgb)
+	b["rgb set trusted"] = lambda: scratch.rgb(rgb, trusted=True)
+	b["hex get"] = lambda: goldenrod.hex()
+	b["rgb255 get"] = lambda: goldenrod.rgb255()
+	b["hsv255 get"] = lambda: scratch.rgb255((218, 165, 32)).hsv255()
+	b["luma get"] = lambda: scratch.rgb(rgb).luma()
+	b["lab get"] = lambda: scratch.rgb(rgb).lab()
+	b["lab set"] = lambda: scratch.lab(lab)
+
+	# mixing
+	b["mix colour"] = lambda: scratch.rgb(rgb).mix(slateblue, 0.25)
+	b["mix string"] = lambda: scratch.rgb(rgb).mix("slateblue", 0.25)
+
+	# perceptual variants and their plain counterparts
+	for perceptual in (False, True):
+		suffix = " perceptual" if perceptual else ""
+		b["hsv get" + suffix] = \
+				lambda p=perceptual: scratch.rgb(rgb).hsv(perceptual=p)
+		b["hue get" + suffix] = \
+				lambda p=perceptual: scratch.rgb(rgb).hue(perceptual=p)
+		b["shifthue" + suffix] = \
+				lambda p=perceptual: scratch.rgb(rgb).shifthue(30, perceptual=p)
+		b["saturation_hsv set" + suffix] = \
+				lambda p=perceptual: scratch.rgb(rgb).saturation_hsv(0.5,
+						perceptual=p)
+		b["shiftsaturation_hsl" + suffix] = \
+				lambda p=perceptual: scratch.rgb(rgb).shiftsaturation_hsl(0.5,
+						perceptual=p)
+	b["shiftluma"] = lambda: scratch.rgb(rgb).shiftluma(0.1)
+
+	# transforms: a chain of affine operations, which is fused
+	chain = colour.Transform().mix("red", 0.2).shiftintensity(0.3) \
+			.shiftluma(-0.4).mix("navy", 0.1)
+	b["transform affine"] = lambda: chain(scratch.rgb(rgb))
+	b["transform affine stepwise"] = lambda: scratch.rgb(rgb).mix("red", 0.2) \
+			.shiftintensity(0.3).shiftluma(-0.4).mix("navy", 0.1)
+	b["luma set"] = lambda: scratch.rgb(rgb).luma(0.3)
+
+	# lookup tables
+	lut = colour.LUT(colour.Transform().shiftluma(0.2).mix("red", 0.2),
+			size=17, processes=1)
+	b["lut apply_rgb255"] = lambda: lut.apply_rgb255((218, 165, 32))
+	if colour._hasnumpy():
+		import numpy
+		pixels = numpy.random.RandomState(0).randint(0, 256, (10000, 3))
+		b["lut apply_rgb255_many 10000"] = lambda: lut.apply_rgb255_many(pixels)
+
+	# colour differences
+	for metric in ("rgb", "yiq", "cie76", "ciede2000"):
+		b["distance " + metric] = lambda m=metric: colour.distance(goldenrod,
+				slateblue, m)
+	if colour._hasnumpy():
+		many = colour.ColourArray(hash=[str(x) for x in range(500)])
+		b["distance_matrix 500 ciede2000"] = \
+				lambda: colour.distance_matrix(many, "ciede2000")
+
+	# palettes
+	css3 = colour.Palette.css3()
+	b["palette css3 nearest"] = lambda: css3.nearest(slateblue)
+	b["palette css3 nearest k=5"] = lambda: css3.nearest(slateblue, k=5)
+	big = colour.Palette([Colour(hash=str(x)) for x in range(10000)])
+	b["palette 10000 nearest"] = lambda: big.nearest(slateblue)
+
+	# packed colour lists
+	hexes = ["#%06x" % (x * 2654435761 % 0x1000000) for x in range(1000)]
+	packed = colour.ColourList(hexes)
+	b["colourlist from hex 1000"] = lambda: colour.ColourList(hexes)
+	b["colourlist hex 1000"] = lambda: packed.hex()
+	b["colourlist index"] = lambda: packed[500]
+	b["colourlist view hex"] = lambda: packed[500].hex()
+	b["colourlist view hsv"] = lambda: packed[500].hsv()
+
+	# distinct hash colours
+	keys = ["series%d" % x for x in range(1000)]
+	def assign():
+		assigner = colour.HashAssigner(threshold=2)
+		assigner.rgb_many(keys)
+		return assigner
+	b["hashassigner 1000"] = assign
+	assigner = assign()
+	b["hashassigner rgb"] = lambda: assigner.rgb("series500")
+	b["hashassigner remove and add"] = lambda: (assigner.remove("series500"),
+			assigner.rgb("series500"))
+
+	# gradients
+	heat = colour.Gradient(["black", "red", "yellow", "white"], space="lab")
+	b["gradient rgb"] = lambda: heat.rgb(0.3)
+	b["gradient lookup"] = lambda: heat.lookup(0.3)
+	if colour._hasnumpy():
+		import numpy
+		cells = numpy.random.RandomState(0).random_sample((1000, 1000))
+		b["gradient lookup 1000000"] = lambda: heat.lookup(cells, size=1024)
+		b["gradient rgb_many 10000"] = lambda: heat.rgb_many(cells[:10])
+
+	# swatches, one at a time and written out in bulk
+	b["swatch"] = lambda: goldenrod.swatch()
+	palette = [Colour(hsv=(x * 7.0, 0.8, 0.6)) for x in range(50)] * 20
+	b["swatchwriter 1000"] = lambda: colour.SwatchWriter(_Discard()) \
+			.writemany(palette).close()
+	b["swatchwriter 1000 classes"] = lambda: colour.SwatchWriter(_Discard(),
+			classes=True).writemany(palette).close()
+
+	return b
+
+class _Discard(object):
+	"""A file-like object which throws away what is written to it"""
+
+	def write(self, data):
+		pass
+
+def rate(function, repeat=5, mintime=0.2):
+	"""
+	Return the number of calls per second of the given function
+
+	The number of calls per timed run is chosen so that a run takes at least 
+	mintime seconds, and the fastest of repeat runs is used.
+	"""
+	timer = timeit.Timer(function)
+	number = 1
+	while True:
+		elapsed = timer.timeit(number)
+		if elapsed >= mintime:
+			break
+		number *= 10 if elapsed < mintime / 10 else 2
+	best = min([elapsed] + timer.repeat(repeat - 1, number))
+	return number / best
+
+def memory(function):
+	"""
+	Return a 2-tuple of the peak bytes allocated during one call of the given 
+	function and the number of blocks left allocated after it, or 
+	(None, None) if tracemalloc is unavailable
+	"""
+	if tracemalloc is None:
+		return (None, None)
+	# warm up any lazily built tables first
+	function()
+	tracemalloc.start()
+	try:
+		start = tracemalloc.get_traced_memory()[0]
+		result = function()
+		peak = tracemalloc.get_traced_memory()[1] - start
+		# everything traced now was allocated by the call and is still alive
+		snapshot = tracemalloc.take_snapshot().filter_traces(
+				[tracemalloc.Filter(False, tracemalloc.__file__)])
+	finally:
+		tracemalloc.stop()
+	del result
+	blocks = sum(x.count for x in snapshot.statistics("filename"))
+	return (max(0, peak), blocks)
+
+def importtime(repeat=5):
+	"""
+	Return the microseconds taken to import the colour module, including the 
+	modules it imports, in a fresh interpreter, the fastest of repeat runs, or 
+	None before Python 3.7
+	"""
+	if sys.version_info < (3, 7):
+		return None
+	directory = os.path.dirname(os.path.abspath(colour.__file__))
+	best = None
+	for x in range(repeat):
+		output = subprocess.check_output(
+				[sys.executable, "-X", "importtime", "-c", "import colour"],
+				stderr=subprocess.STDOUT, cwd=directory)
+		for line in output.decode("utf-8").splitlines():
+			# import time: self [us] | cumulative | imported package
+			fields = line.split("|")
+			if len(fields) == 3 and fields[2].strip() == "colour":
+				us = int(fields[1])
+				best = us if best is None else min(best, us)
+	return best
+
+def run(pattern=None, repeat=5, mintime=0.2):
+	"""
+	Run the benchmarks whose names match the given regular expression (or all 
+	of them) and return the results as a dictionary ready for JSON
+	"""
+	results = collections.OrderedDict()
+	for name, function in benchmarks().items():
+		if pattern is not None and not re.search(pattern, name):
+			continue
+		peak, blocks = memory(function)
+		results[name] = collections.OrderedDict((
+				("ops_per_sec", rate(function, repeat, mintime)),
+				("peak_bytes", peak),
+				("blocks", blocks),
+				))
+	us = None
+	if pattern is None or re.search(pattern, "import"):
+		us = importtime(repeat)
+	return collections.OrderedDict((
+			("colour_version", colour.VERSION),
+			("python", platform.python_version()),
+			("implementation", platform.python_implementation()),
+			("import_us", us),
+			("results", results),
+			))
+
+def compare(current, baseline, threshold=0.1):
+	"""
+	Compare two sets of results, returning a list of lines of report and a list 
+	of the names of benchmarks which are more than threshold (a fraction) 
+	slower than in the baseline
+	"""
+	lines = []
+	regressions = []
+	us, old = current.get("import_us"), baseline.get("import_us")
+	if us is not None and old:
+		ratio = us / float(old)
+		flag = ""
+		if ratio > 1 + threshold:
+			flag = "  SLOWER"
+			regressions.append("import")
+		elif ratio < 1 - threshold:
+			flag = "  faster"
+		lines.append("%-32s %12d us    %7.2fx%s" % ("import", us, ratio, flag))
+	old = baseline["results"]
+	for name, result in current["results"].items():
+		if name not in old:
+			lines.append("%-32s %12.0f ops/s (new)" % (name,
+					result["ops_per_sec"]))
+			continue
+		ratio = result["ops_per_sec"] / old[name]["ops_per_sec"]
+		flag = ""
+		if ratio < 1 - threshold:
+			flag = "  SLOWER"
+			regressions.append(name)
+		elif ratio > 1 + threshold:
+			flag = "  faster"
+		lines.append("%-32s %12.0f ops/s %7.2fx%s" % (name,
+				result["ops_per_sec"], ratio, flag))
+	return lines, regressions
+
+def main():
+	parser = argparse.ArgumentParser(
+			description="Benchmark the colour module and print JSON results")
+	parser.add_argument("--filter", metavar="PATTERN",
+			help="only run benchmarks whose names match this regular expression")
+	parser.add_argument("--output", metavar="FILE",
+			help="write the JSON results to this file rather than stdout")
+	parser.add_argument("--baseline", metavar="FILE",
+			help="compare against results previously saved to this file")
+	parser.add_argument("--threshold", type=float, default=0.1,
+			help="fraction by which a benchmark may be slower than the "
+				"baseline before it is reported as a regression (default 0.1)")
+	parser.add_argument("--repeat", type=int, default=5,
+			help="number of timed runs per benchmark (default 5)")
+	parser.add_argument("--mintime", type=float, default=0.2,
+			help="minimum duration of each timed run in seconds (default 0.2)")
+	parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET,
+			metavar="MS",
+			help="fail if importing the module takes longer than this many "
+				"milliseconds (default %d)" % IMPORT_BUDGET)
+	args = parser.parse_args()
+
+	current = run(args.filter, args.repeat, args.mintime)
+	status = 0
+
+	us = current["import_us"]
+	if us is not None and us > args.import_budget * 1000:
+		print("importing took %.1fms, over the budget of %gms" \
+				% (us / 1000.0, args.import_budget), file=sys.stderr)
+		status = 1
+
+	output = json.dumps(current, indent=2)
+	if args.output is None:
+		print(output)
+	else:
+		with open(args.output, "w") as f:
+			f.write(output + "\n")
+
+	if args.baseline is not None:
+		with open(args.baseline) as f:
+			baseline = json.load(f)
+		lines, regressions = compare(current, baseline, args.threshold)
+		for line in lines:
+			print(line, file=sys.stderr)
+		if regressions:
+			print("%d benchmark(s) slower than the baseline" % len(regressions),
+					file=sys.stderr)
+			status = 1
+	return status
+
+if __name__ == "__main__":
+	sys.exit(main())
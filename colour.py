@@ -8,7 +8,15 @@ Originally ported from Colour.php, a colour manipulation class for PHP by the
 same author, but now quite different.
 
 Provides a Colour class and various supporting functions, plus the list of CSS3 
-named colours.
+named colours. There is also an immutable, hashable FrozenColour variant and, if 
+numpy is available, a ColourArray class for working with large numbers of 
+colours at once. A ColourList keeps large numbers of 8-bit colours compactly, 
+packed into integers. Operations can be recorded with a Transform, compiled into a 
+LUT (3D lookup table) and applied to whole image files with recolour(). A 
+Palette finds the nearest of a fixed set of colours quickly, a Gradient 
+interpolates between any number of colours in a choice of colour spaces, a 
+HashAssigner keeps the hash colours of inputs shown together distinct, and 
+SwatchWriter writes HTML swatch reports of any size.
 
 Colours are internally stored as float RGB values. RGB values are the 
 intensities of the red, green and blue channels.
@@ -102,6 +110,43 @@ halfway up the HSL cylinder (grey in the centre, colours towards the edges) but
 rotated somewhat and with all points appearing to be at the same lightness. (In 
 the HSL plane some parts would look lighter than others, such as yellow looking 
 brighter than blue).
+
+CIE XYZ, CIELAB and LCh
+-----------------------
+
+These are device-independent models defined by the CIE, for which RGB values 
+are taken to be in the sRGB colour space (as on the web) with a D65 white 
+point.
+
+XYZ is linear in the amounts of light, with Y being the relative luminance. 
+CIELAB (or L*a*b*) is derived from it so as to be roughly perceptually uniform: 
+L is lightness from 0 (black) to 100 (white), a runs from green to red and b 
+from blue to yellow, and the Euclidean distance between two colours 
+approximates how different they look. LCh is CIELAB in cylindrical 
+coordinates: lightness, chroma (the distance from grey) and hue angle.
+
+Much of each of these spaces lies outside the RGB colour cube; colours set in 
+them are clamped to it.
+
+8-bit values
+------------
+
+Values are often wanted as whole numbers from 0 to 255 (8 bits), as in hex 
+strings and most image formats. The rgb255(), hsv255() and hsl255() methods 
+give a colour's values so: each float value is scaled to the range 0~255 (or, 
+for hue, kept in degrees) and rounded with round(). A hue just below 360 
+therefore comes out as 360.
+
+Functions such as rgb255tohsv255() and hsv255torgb255() convert between 8-bit 
+values directly. Their results are exactly those of converting to floats, 
+converting with the float functions and rounding as the methods do (for YIQ, 
+which has no 8-bit methods, rgbtoyiq()'s values are multiplied by 255 and 
+rounded), but they are worked out with integers and lookup tables. Only where 
+a value is exactly half way between two integers (or, for YIQ, very nearly), 
+so that which way it rounds depends on floating point error and on the version 
+of Python, is the float conversion used. The 8-bit methods use these functions 
+for colours whose channels are whole numbers of 255ths, such as those set from 
+hex strings.
 """
 
 NAME = "py-colour"
@@ -114,11 +159,77 @@ LICENSE = "GNU GPLv3"
 COPYRIGHT_YEAR = "2011~2017"
 
 import colorsys
-import re
-import hashlib
-from six import string_types
+import math
+import itertools
+import os
+import sys
+
+try:
+	import _thread
+except ImportError:
+	import thread as _thread
+
+# the C implementations where available, which unlike collections itself are 
+# quick to import
+try:
+	from _collections import OrderedDict, deque
+except ImportError:
+	from collections import OrderedDict, deque
+
+try:
+	string_types = basestring
+except NameError:
+	string_types = str
+
+class _LazyModule(object):
+	"""
+	Internal class, a stand-in for a module which is only imported when one of 
+	its attributes is first used
+
+	The import then replaces the stand-in in this module's namespace (see 
+	_import()), so only the first use costs anything extra.
+	"""
+
+	def __init__(self, name):
+		self.__name = name
+
+	def __getattr__(self, attribute):
+		return getattr(_import(self.__name), attribute)
+
+def _import(name):
+	"""
+	Internal function, import the named module if its stand-in is still in 
+	place and return the module
 
-class Colour:
+	If the module is not available (only likely for the optional numpy) its 
+	stand-in is replaced with None and ImportError is raised, then and on any 
+	later call.
+	"""
+	module = globals()[name]
+	if module is None:
+		raise ImportError("%s is required for this feature" % name)
+	if not isinstance(module, _LazyModule):
+		return module
+	try:
+		module = __import__(name)
+	except ImportError:
+		globals()[name] = None
+		raise ImportError("%s is required for this feature" % name)
+	globals()[name] = module
+	return module
+
+# modules only needed by some features, which are imported on first use so as 
+# to keep importing this module fast
+re = _LazyModule("re")
+hashlib = _LazyModule("hashlib")
+heapq = _LazyModule("heapq")
+array = _LazyModule("array")
+multiprocessing = _LazyModule("multiprocessing")
+mmap = _LazyModule("mmap")
+bisect = _LazyModule("bisect")
+numpy = _LazyModule("numpy")
+
+class Colour(object):
 	"""
 	Colours can be made from CSS3 named colours, hex strings, RGB values, HSV 
 	values, HSL values, YIQ values, lightness (for shades of grey), arbitrary 
@@ -128,8 +239,8 @@ class Colour:
 	They can be manipulated in various ways -- setting or shifting luma, hue, 
 	value, saturation and so on, or mixing with other colours.
 
-	Colours can be output as hex strings, 3-tuples of RGB, HSV, HSL or YIQ 
-	values and HTML colour swatches.
+	Colours can be output as hex strings, 3-tuples of RGB, HSV, HSL, YIQ, CIE 
+	XYZ, CIELAB or LCh values and HTML colour swatches.
 
 	Very basic examples:
 		# Import the library
@@ -184,6 +295,10 @@ class Colour:
 			print("<li style=\"color: %s\">%s</li>" \\
 					% (Colour().hash(username, minh=0, maxh=30), username))
 
+		# Where lots of colours are made from values of a known kind, the 
+		# from_ factory methods are much faster than the constructor
+		pixels = [Colour.from_rgb255(x) for x in [(218, 165, 32), (0, 99, 16)]]
+
 	To test the class and see lots more examples you can use the test.py script 
 	(distributed with this module) which outputs HTML, then view the result in 
 	your browser:
@@ -191,7 +306,10 @@ class Colour:
 		x-www-browser /tmp/colour.html
 	"""
 
-	__colour = (0.0, 0.0, 0.0)
+	# __derived is None or a list caching the colour in HSV, HSL, YIQ, XYZ, 
+	# CIELAB and LCh space (see __converted()); it is reset whenever the colour 
+	# changes
+	__slots__ = ("__colour", "__derived")
 
 	def __init__(self, arg=None,
 			grey=None,
@@ -258,6 +376,9 @@ class Colour:
 				)) > 1:
 			raise ValueError("expected at most one non-None argument")
 
+		self.__colour = (0.0, 0.0, 0.0)
+		self.__derived = None
+
 		if arg is not None:
 			# determine what is meant by looking at the type and value
 			try:
@@ -275,7 +396,7 @@ class Colour:
 			if isinstance(arg, string_types):
 				self.css3(arg)
 				return
-			if isinstance(arg, self.__class__):
+			if isinstance(arg, Colour):
 				self.rgb(arg.rgb())
 				return
 			raise ValueError("unrecognized constructor option")
@@ -321,10 +442,123 @@ class Colour:
 			# no argument was given -- default to black
 			self.grey(0)
 
+	# pickling
+	# --------------------------------------------------------------------------
+
+	def __getstate__(self):
+		"""
+		Return the object's state for pickling, in the same form as before the 
+		class had __slots__, so pickles are read by either version
+		"""
+		return {"_Colour__colour": self.__colour}
+
+	def __setstate__(self, state):
+		"""Restore the object's state when it is unpickled"""
+		if isinstance(state, tuple):
+			# the default state of a class with __slots__, as pickled with 
+			# protocol 2 and above before __getstate__ was defined
+			state = state[1]
+		self.__colour = tuple(state["_Colour__colour"])
+		self.__derived = None
+
+	# factory methods which skip the constructor's argument handling
+	# --------------------------------------------------------------------------
+
+	@classmethod
+	def _fromrgb(cls, rgb):
+		"""
+		Internal method, return a new object with the given 3-tuple of RGB 
+		values in the range 0~1, which are not checked, without calling the 
+		constructor
+		"""
+		colour = cls.__new__(cls)
+		colour.__colour = rgb
+		colour.__derived = None
+		return colour
+
+	@classmethod
+	def from_rgb(cls, rgb, trusted=False):
+		"""
+		Return a new Colour with the given 3-tuple of RGB values in the range 
+		0~1
+
+		This and the other from_ methods give the same colour as the equivalent 
+		constructor argument (Colour(rgb=rgb) in this case) but skip the 
+		constructor's work of deciding which argument was used, so are several 
+		times faster. No channel may be None. If trusted is True the values are 
+		not checked (see the module's trusted() function).
+		"""
+		if trusted or _trust.trusted:
+			return cls._fromrgb(tuple(rgb))
+		if len(rgb) != 3:
+			raise ValueError("expected a 3-tuple")
+		r, g, b = rgb
+		if r < 0 or r > 1 or g < 0 or g > 1 or b < 0 or b > 1:
+			raise ValueError("expected values in the range 0.0~1.0")
+		return cls._fromrgb((r, g, b))
+
+	@classmethod
+	def from_rgb255(cls, rgb255, trusted=False):
+		"""
+		Return a new Colour with the given 3-tuple of RGB values in the range 
+		0~255
+		"""
+		if trusted or _trust.trusted:
+			r, g, b = rgb255
+		else:
+			if len(rgb255) != 3:
+				raise ValueError("expected a 3-tuple")
+			r, g, b = rgb255
+			if r < 0 or r > 255 or g < 0 or g > 255 or b < 0 or b > 255:
+				raise ValueError("expected values in the range 0~255")
+		return cls._fromrgb((r / 255.0, g / 255.0, b / 255.0))
+
+	@classmethod
+	def from_hsv(cls, hsv, trusted=False):
+		"""
+		Return a new Colour with the given 3-tuple of HSV values in the range 
+		(0~360, 0~1, 0~1)
+		"""
+		return cls._fromrgb(hsvtorgb(hsv, trusted))
+
+	@classmethod
+	def from_hsl(cls, hsl, trusted=False):
+		"""
+		Return a new Colour with the given 3-tuple of HSL values in the range 
+		(0~360, 0~1, 0~1)
+		"""
+		return cls._fromrgb(hsltorgb(hsl, trusted))
+
+	@classmethod
+	def from_yiq(cls, yiq, trusted=False):
+		"""
+		Return a new Colour with the given 3-tuple of YIQ values in the range 
+		(0~1, -1~1, -1~1)
+		"""
+		return cls._fromrgb(yiqtorgb(yiq, trusted))
+
+	@classmethod
+	def from_hex(cls, hex):
+		"""
+		Return a new Colour from the given hex RGB string (see hex() for what is 
+		accepted)
+		"""
+		return cls._fromrgb(hextorgb(hex))
+
+	@classmethod
+	def from_css3(cls, name):
+		"""
+		Return a new Colour of the CSS3 named colour of the given name
+		"""
+		try:
+			return cls._fromrgb(hextorgb(CSS3[name.lower()]))
+		except KeyError:
+			raise ValueError("no such CSS3 named colour")
+
 	# base methods for the various colour models
 	# --------------------------------------------------------------------------
 
-	def rgb(self, rgb=None, min=0.0, max=1.0):
+	def rgb(self, rgb=None, min=0.0, max=1.0, trusted=False):
 		"""
 		Get or set the colour as a 3-tuple of RGB values in a particular range
 
@@ -335,6 +569,8 @@ class Colour:
 		Called with a 3-tuple, the colour is set to the given colour.
 		Any missing channels (that is, where None is given rather than a number) 
 		are not changed.
+		If trusted is True the values are not checked (see the module's 
+		trusted() function).
 		"""
 
 		if rgb is None:
@@ -347,11 +583,13 @@ class Colour:
 				return tuple(map(int, map(round, values)))
 			return tuple(values)
 
-		if len(rgb) != 3:
-			raise ValueError("expected a 3-tuple")
-		for i in rgb:
-			if i is not None and (i < min or i > max):
-				raise ValueError("expected values in the range %s~%s" % (min, max))
+		if not (trusted or _trust.trusted):
+			if len(rgb) != 3:
+				raise ValueError("expected a 3-tuple")
+			for i in rgb:
+				if i is not None and (i < min or i > max):
+					raise ValueError("expected values in the range %s~%s" \
+							% (min, max))
 
 		if min == 0.0 and max == 1.0:
 			newrgb = tuple(rgb[i] \
@@ -362,6 +600,8 @@ class Colour:
 					if rgb[i] is not None else self.__colour[i] \
 					for i in range(3))
 
+		if newrgb != self.__colour:
+			self.__derived = None
 		self.__colour = newrgb
 		return self
 	def rgb100(self, *args, **kwargs):
@@ -369,16 +609,56 @@ class Colour:
 		return self.rgb(min=0, max=100, *args, **kwargs)
 	def rgb255(self, *args, **kwargs):
 		"""Same as rgb() with min set to 0 and max to 255"""
+		if not args and not kwargs:
+			rgb255 = self.__rgb255()
+			if rgb255 is not None:
+				return rgb255
 		return self.rgb(min=0, max=255, *args, **kwargs)
 
+	def __rgb255(self):
+		"""
+		Internal method, return the colour as a 3-tuple of integer RGB values in 
+		the range 0~255 if each channel is exactly a whole number of 255ths (as 
+		for colours set from hex strings or 8-bit values), otherwise None
+
+		The 8-bit getters convert such colours with the 8-bit conversion 
+		functions, which give the same results as the float conversions.
+		"""
+		r, g, b = self.__colour
+		r = _BYTES.get(r)
+		g = _BYTES.get(g)
+		b = _BYTES.get(b)
+		if r is None or g is None or b is None:
+			return None
+		return (r, g, b)
+
+	def __converted(self, index):
+		"""
+		Internal method, return the colour converted to HSV (index 0), HSL (1), 
+		YIQ (2), XYZ (3), CIELAB (4) or LCh (5) space at the default ranges
+
+		Conversions are cached until the colour changes.
+		"""
+		derived = self.__derived
+		if derived is None:
+			derived = self.__derived = [None] * len(_CONVERTERS)
+		converted = derived[index]
+		if converted is None:
+			converted = derived[index] = _CONVERTERS[index](self.__colour)
+		return converted
+
 	def __hsx(self, hsl, hsx=None, perceptual=False,
-			hmin=0.0, hmax=360.0, sxmin=0.0, sxmax=1.0):
+			hmin=0.0, hmax=360.0, sxmin=0.0, sxmax=1.0, trusted=False):
 		"""
 		Internal method, logic behind hsv() and hsl()
 		"""
 		if hsx is None:
-			h, s, x = rgbtohsl(self.__colour) if hsl \
-					else rgbtohsv(self.__colour)
+			converted = self.__converted(1 if hsl else 0)
+			if hmin == 0.0 and hmax == 360.0 and sxmin == 0.0 and sxmax == 1.0 \
+					and isinstance(hmin, float) and isinstance(sxmin, float):
+				# default ranges: no scaling or rounding to do
+				return converted
+			h, s, x = converted
 			if hmin != 0.0 or hmax != 360.0:
 				h = hmin + (h / 360.0) * (hmax - hmin)
 			if not isinstance(hmin, float) \
@@ -395,16 +675,18 @@ class Colour:
 				x = int(round(x))
 			return (h, s, x)
 
-		if len(hsx) != 3:
-			raise ValueError("expected a 3-tuple")
+		trusted = trusted or _trust.trusted
+		if not trusted:
+			if len(hsx) != 3:
+				raise ValueError("expected a 3-tuple")
+			for i in hsx[1:]:
+				if i is not None and (i < sxmin or i > sxmax):
+					raise ValueError(\
+							"expected saturation and %s values in the range %s~%s" \
+							% ("lightness" if hsl else "value", sxmin, sxmax))
 		h, s, x = hsx
 		if h is not None:
 			h = (h - hmin) % (hmax - hmin) + hmin
-		for i in [s, x]:
-			if i is not None and (i < sxmin or i > sxmax):
-				raise ValueError(\
-						"expected saturation and %s values in the range %s~%s" \
-						% ("lightness" if hsl else "value", sxmin, sxmax))
 
 		oldhsx = self.__hsx(hsl)
 
@@ -423,21 +705,19 @@ class Colour:
 		elif sxmin != 0.0 or sxmax != 1.0:
 			x = float(x - sxmin) / float(sxmax - sxmin)
 
-		if perceptual:
-			oldluma = self.luma()
-
 		if hsl:
-			self.rgb(hsltorgb((h, s, x)))
+			rgb = hsltorgb((h, s, x), trusted)
 		else:
-			self.rgb(hsvtorgb((h, s, x)))
+			rgb = hsvtorgb((h, s, x), trusted)
 
 		if perceptual:
-			self.luma(oldluma)
-
-		return self
+			# restore the old luma
+			return self.rgb(setluma(rgb, self.__converted(2)[0], True),
+					trusted=True)
+		return self.rgb(rgb, trusted=trusted)
 
 	def hsv(self, hsv=None, perceptual=False,
-			hmin=0.0, hmax=360.0, svmin=0.0, svmax=1.0):
+			hmin=0.0, hmax=360.0, svmin=0.0, svmax=1.0, trusted=False):
 		"""
 		Get or set the colour as a 3-tuple of HSV values in a particular range
 
@@ -451,18 +731,24 @@ class Colour:
 		Hues out of the range are accepted since hue is circular.
 		If the perceptual argument is True attempt to preserve the colour's luma 
 		in order to retain the colour's perceived brightness.
+		If trusted is True the values are not checked (see the module's 
+		trusted() function).
 		"""
 		return self.__hsx(False, hsx=hsv, perceptual=perceptual, \
-				hmin=hmin, hmax=hmax, sxmin=svmin, sxmax=svmax)
+				hmin=hmin, hmax=hmax, sxmin=svmin, sxmax=svmax, trusted=trusted)
 	def hsv100(self, *args, **kwargs):
 		"""Same as hsv() with hmin=0, hmax=360, svmin=0, svmax=100"""
 		return self.hsv(hmin=0, hmax=360, svmin=0, svmax=100, *args, **kwargs)
 	def hsv255(self, *args, **kwargs):
 		"""Same as hsv() with hmin=0, hmax=360, svmin=0, svmax=255"""
+		if not args and not kwargs:
+			rgb255 = self.__rgb255()
+			if rgb255 is not None:
+				return _rgb255tohsx255(False, rgb255, True)
 		return self.hsv(hmin=0, hmax=360, svmin=0, svmax=255, *args, **kwargs)
 
 	def hsl(self, hsl=None, perceptual=False,
-			hmin=0.0, hmax=360.0, slmin=0.0, slmax=1.0):
+			hmin=0.0, hmax=360.0, slmin=0.0, slmax=1.0, trusted=False):
 		"""
 		Get or set the colour as a 3-tuple of HSL values in a particular range
 
@@ -476,18 +762,24 @@ class Colour:
 		Hues out of the range are accepted since hue is circular.
 		If the perceptual argument is True attempt to preserve the colour's luma 
 		in order to retain the colour's perceived brightness.
+		If trusted is True the values are not checked (see the module's 
+		trusted() function).
 		"""
 		return self.__hsx(True, hsx=hsl, perceptual=perceptual, \
-				hmin=hmin, hmax=hmax, sxmin=slmin, sxmax=slmax)
+				hmin=hmin, hmax=hmax, sxmin=slmin, sxmax=slmax, trusted=trusted)
 	def hsl100(self, *args, **kwargs):
 		"""Same as hsl() with hmin=0, hmax=360, slmin=0, slmax=100"""
 		return self.hsl(hmin=0, hmax=360, slmin=0, slmax=100, *args, **kwargs)
 	def hsl255(self, *args, **kwargs):
 		"""Same as hsl() with hmin=0, hmax=360, slmin=0, slmax=255"""
+		if not args and not kwargs:
+			rgb255 = self.__rgb255()
+			if rgb255 is not None:
+				return _rgb255tohsx255(True, rgb255, True)
 		return self.hsl(hmin=0, hmax=360, slmin=0, slmax=255, *args, **kwargs)
 
 	def yiq(self, yiq=None,
-			ymin=0.0, ymax=1.0, iqmin=-1.0, iqmax=1.0):
+			ymin=0.0, ymax=1.0, iqmin=-1.0, iqmax=1.0, trusted=False):
 		"""
 		Get or set the colour as a 3-tuple of YIQ values in a particular range
 
@@ -498,9 +790,16 @@ class Colour:
 		Called with a 3-tuple, the colour is set to the given colour.
 		Any missing channels (that is, where None is given rather than a number) 
 		are not changed.
+		If trusted is True the values are not checked (see the module's 
+		trusted() function).
 		"""
 		if yiq is None:
-			y, i, q = rgbtoyiq(self.__colour)
+			converted = self.__converted(2)
+			if ymin == 0.0 and ymax == 1.0 and iqmin == -1.0 and iqmax == 1.0 \
+					and isinstance(ymin, float) and isinstance(iqmin, float):
+				# default ranges: no scaling or rounding to do
+				return converted
+			y, i, q = converted
 			if ymin != 0.0 or ymax != 1.0:
 				y = ymin + y * (ymax - ymin)
 			if not isinstance(ymin, float) \
@@ -517,15 +816,19 @@ class Colour:
 				q = int(round(q))
 			return (y, i, q)
 
-		if len(yiq) != 3:
-			raise ValueError("expected a 3-tuple")
+		trusted = trusted or _trust.trusted
+		if not trusted:
+			if len(yiq) != 3:
+				raise ValueError("expected a 3-tuple")
+			y, i, q = yiq
+			if y is not None and (y < ymin or y > ymax):
+				raise ValueError("expected a luma value in the range %s~%s" \
+						% (ymin, ymax))
+			for x in [i, q]:
+				if x is not None and (x < iqmin or x > iqmax):
+					raise ValueError("expected in-phase and quadrature values" \
+							+ " in the range %s~%s" % (iqmin, iqmax))
 		y, i, q = yiq
-		if y is not None and (y < ymin or y > ymax):
-			raise ValueError("expected a luma value in the range %s~%s" % (ymin, ymax))
-		for x in [i, q]:
-			if x is not None and (x < iqmin or x > iqmax):
-				raise ValueError("expected in-phase and quadrature values" \
-						+ " in the range %s~%s" % (iqmin, iqmax))
 
 		oldyiq = self.yiq()
 
@@ -544,7 +847,75 @@ class Colour:
 		elif iqmin != -1.0 or iqmax != 1.0:
 			q = float(q - iqmin) / float(iqmax - iqmin)
 
-		return self.rgb(yiqtorgb((y, i, q)))
+		return self.rgb(yiqtorgb((y, i, q), trusted), trusted=trusted)
+
+	def xyz(self, xyz=None, trusted=False):
+		"""
+		Get or set the colour as a 3-tuple of CIE XYZ values
+
+		Called with no xyz argument, return the object's colour, taking its RGB 
+		values to be sRGB (see rgbtoxyz()).
+
+		Called with a 3-tuple, the colour is set to the given colour, clamped to 
+		the RGB colour cube.
+		Any missing channels (that is, where None is given rather than a number) 
+		are not changed.
+		If trusted is True the values are not checked (see the module's 
+		trusted() function).
+		"""
+		if xyz is None:
+			return self.__converted(3)
+		return self.__cie(3, xyztorgb, xyz, trusted)
+
+	def lab(self, lab=None, trusted=False):
+		"""
+		Get or set the colour as a 3-tuple of CIELAB values
+
+		Called with no lab argument, return the object's colour, taking its RGB 
+		values to be sRGB (see rgbtolab()).
+
+		Called with a 3-tuple, the colour is set to the given colour, clamped to 
+		the RGB colour cube.
+		Any missing channels (that is, where None is given rather than a number) 
+		are not changed.
+		If trusted is True the values are not checked (see the module's 
+		trusted() function).
+		"""
+		if lab is None:
+			return self.__converted(4)
+		return self.__cie(4, labtorgb, lab, trusted)
+
+	def lch(self, lch=None, trusted=False):
+		"""
+		Get or set the colour as a 3-tuple of LCh values, the cylindrical form 
+		of CIELAB
+
+		Called with no lch argument, return the object's colour, taking its RGB 
+		values to be sRGB (see rgbtolch()).
+
+		Called with a 3-tuple, the colour is set to the given colour, clamped to 
+		the RGB colour cube.
+		Any missing channels (that is, where None is given rather than a number) 
+		are not changed.
+		If trusted is True the values are not checked (see the module's 
+		trusted() function).
+		"""
+		if lch is None:
+			return self.__converted(5)
+		return self.__cie(5, lchtorgb, lch, trusted)
+
+	def __cie(self, index, function, values, trusted):
+		"""
+		Internal method, logic behind the xyz(), lab() and lch() setters
+		"""
+		trusted = trusted or _trust.trusted
+		if not trusted and len(values) != 3:
+			raise ValueError("expected a 3-tuple")
+		if values[0] is None or values[1] is None or values[2] is None:
+			old = self.__converted(index)
+			values = tuple(old[x] if values[x] is None else values[x] \
+					for x in range(3))
+		return self.rgb(function(values, trusted), trusted=True)
 
 	# set a colour without individual values for one of the colour models
 	# --------------------------------------------------------------------------
@@ -584,17 +955,25 @@ class Colour:
 		corresponding to the given string.
 		"""
 		if name is None:
-			rgb255 = self.rgb255()
-			for key in CSS3.keys():
-				if rgb255 == Colour(css3=key).rgb255():
-					return key
-			return None
+			return _css3names().get(self.rgb255())
 
 		try:
 			return self.hex(CSS3[name.lower()])
 		except KeyError:
 			raise ValueError("no such CSS3 named colour")
 
+	def nearest_css3(self):
+		"""
+		Find the CSS3 named colour closest to this colour
+
+		Return a 2-tuple of the name of the closest CSS3 named colour and its 
+		distance from this colour, measured as the Euclidean distance between 
+		the two in the RGB colour cube (with channels in the range 0~1). The 
+		distance is 0 if this colour is itself a CSS3 named colour.
+		"""
+		distance, index = _css3tree().nearest(self.__colour)[0]
+		return (_css3tree().names[index], distance)
+
 	def grey(self, i=None, min=0.0, max=1.0):
 		"""
 		Set the colour to a shade of grey with the given intensity, or return 
@@ -617,7 +996,7 @@ class Colour:
 				return int(round(i))
 			return i
 
-		if i < min or i > max:
+		if not _trust.trusted and (i < min or i > max):
 			raise ValueError("expected value in the range %s~%s" % (min, max))
 		if min != 0.0 or max != 0.0:
 			i = (i - min) / (max - min)
@@ -640,36 +1019,18 @@ class Colour:
 		only colours close to grey are disallowed.
 		Pass miny and maxy to constrain the luma. By default anything difficult 
 		to see against black or white is disallowed.
-		"""
-		hash = hashlib.md5(str(tohash).encode('utf-8')).hexdigest()
 
-		if maxh is None or minh is None:
-			maxh = 360
-			minh = 0
-		else:
-			while minh <= -360:
-				minh += 360
-			while minh >= 360:
-				minh -= 360
-			while maxh <= -360:
-				maxh += 360
-			while maxh >= 360:
-				maxh -= 360
-
-		if mins < 0 or mins > 1 or maxs < 0 or maxs > 1 \
-				or miny < 0 or miny > 1 or maxy < 0:
-			raise ValueError(
-					"expected mins, maxs, miny and maxy to be in the range 0~1")
-		if mins > maxs:
-			raise ValueError("expected mins to be less than or equal to maxs")
-		if miny > maxy:
-			raise ValueError("expected miny to be less than or equal to maxy")
-
-		h = minh + (maxh - minh) * int(hash[0:8], 16) / float(16**8)
-		s = mins + (maxs - mins) * int(hash[8:16], 16) / float(16**8)
-		y = miny + (maxy - miny) * int(hash[16:24], 16) / float(16**8)
-
-		return self.hsv((h, s, y)).luma(y)
+		The resulting colour is remembered in hash_cache, so hashing the same 
+		input with the same constraints again is fast.
+		"""
+		string = str(tohash)
+		key = (string, minh, maxh, mins, maxs, miny, maxy)
+		rgb = hash_cache.get(key)
+		if rgb is None:
+			rgb = _hashrgb(string,
+					_hashconstraints(minh, maxh, mins, maxs, miny, maxy))
+			hash_cache.put(key, rgb)
+		return self.rgb(rgb)
 
 	# hue
 	# --------------------------------------------------------------------------
@@ -710,7 +1071,7 @@ class Colour:
 		"""
 		if s is None:
 			return self.hsl()[1] if hsl else self.hsv()[1]
-		if s < 0 or s > 1:
+		if not _trust.trusted and (s < 0 or s > 1):
 			raise ValueError("expected a value in the range 0~1")
 		if hsl:
 			method = self.hsl
@@ -809,7 +1170,7 @@ class Colour:
 		if i is None:
 			return sum(self.rgb()) / 3.0
 
-		if i < 0 or i > 1:
+		if not _trust.trusted and (i < 0 or i > 1):
 			raise ValueError("expected value in the range 0~1")
 
 		if i == 0 or i == 1:
@@ -852,7 +1213,7 @@ class Colour:
 		"""
 		if x is None:
 			return self.hsl()[2] if hsl else self.hsv()[2]
-		if x < 0 or x > 1:
+		if not _trust.trusted and (x < 0 or x > 1):
 			raise ValueError("expected a value in the range 0~1")
 		if hsl:
 			return self.hsl((None, None, x))
@@ -933,9 +1294,9 @@ class Colour:
 		"""
 		if y is None:
 			return self.yiq()[0]
-		if y < 0 or y > 1:
+		if not _trust.trusted and (y < 0 or y > 1):
 			raise ValueError("expected a value in the range 0~1")
-		return self.yiq((y, None, None))
+		return self.rgb(setluma(self.__colour, y, True), trusted=True)
 
 	def shiftluma(self, scale):
 		"""
@@ -974,8 +1335,8 @@ class Colour:
 		change.
 		"""
 		rgb = self.rgb()
-		if not isinstance(colour, self.__class__):
-			colour = self.__class__(colour)
+		if not isinstance(colour, Colour):
+			colour = Colour(colour)
 		colour = colour.rgb()
 		if proportion < 0 or proportion > 1:
 			return ValueError("expected a value in the range 0~1")
@@ -1004,176 +1365,5113 @@ class Colour:
 		The returned element has a CSS class of "swatch" and additionally the 
 		cssclass argument if given. If the cssclass argument was not given the 
 		element also carries styles to set its font family and some padding.
+
+		To write many swatches, SwatchWriter is much faster.
 		"""
-		html = "<span class=\"swatch"
-		if cssclass is not None:
-			html += " %s" % cssclass
-		html += "\" style=\""
+		rgb = self.__colour
+		hex = rgbtohex(rgb)
 		if cssclass is None:
-			html += "font-family: monospace; padding: 0.3em 0.8em; "
-		textcolour = "black" if self.luma() > 0.5 else "white"
-		html += "background-color: %s; color: %s\">" % (self.hex(), textcolour)
-		html += self.hex() if showhex else "&nbsp;" * 7
-		html += "</span>"
-		return html
-
-# static colour conversion functions
-# ------------------------------------------------------------------------------
-
-def _rgbtohsx(hsl, rgb):
-	"""Internal function, logic behind rgbtohsv() and rgbtohsl()"""
-	if len(rgb) != 3:
-		raise ValueError("expected a 3-tuple")
-	for i in rgb:
-		if i < 0 or i > 1:
-			raise ValueError("expected values in the range 0~1")
-	if hsl:
-		hls = colorsys.rgb_to_hls(*rgb)
-		return (hls[0] * 360, hls[2], hls[1])
-	hsv = colorsys.rgb_to_hsv(*rgb)
-	return (hsv[0] * 360, hsv[1], hsv[2])
+			return _SWATCHINLINE % ("", _SWATCHSTYLE, hex, _textcolour(rgb),
+					hex if showhex else _SWATCHBLANK)
+		return _SWATCHINLINE % (" %s" % cssclass, "", hex, _textcolour(rgb),
+				hex if showhex else _SWATCHBLANK)
 
-def rgbtohsv(rgb):
+class FrozenColour(Colour):
 	"""
-	Convert the given colour in RGB space to HSV space
-
-	Argument is a 3-tuple of float RGB values in the range 0~1.
-	Return a 3-tuple of float HSV values in the range (0~360, 0~1, 0~1).
+	An immutable Colour
+
+	FrozenColour objects are made in the same ways as Colour objects and have 
+	the same getters, but once made they cannot be changed: using any method to 
+	set or shift the colour raises a TypeError. In exchange they are hashable, 
+	so they can be used as dictionary keys or set members. Two FrozenColour 
+	objects are equal if their RGB values are equal.
+
+	To make a modified version of a FrozenColour, put it through the Colour 
+	constructor first:
+		gold = FrozenColour("goldenrod")
+		darkgold = Colour(gold).shiftluma(-0.5)
 	"""
-	return _rgbtohsx(False, rgb)
 
-def rgbtohsl(rgb):
-	"""
-	Convert the given colour in RGB space to HSL space
+	__slots__ = ("__frozen",)
 
-	Argument is a 3-tuple of float RGB values in the range 0~1.
-	Return a 3-tuple of float HSV values in the range (0~360, 0~1, 0~1).
-	"""
-	return _rgbtohsx(True, rgb)
+	def __init__(self, *args, **kwargs):
+		"""
+		Constructor
 
-def rgbtoyiq(rgb):
-	"""
-	Convert the given colour in RGB space to YIQ space
+		This takes the same arguments as the Colour constructor.
+		"""
+		Colour.__init__(self, *args, **kwargs)
+		self.__frozen = True
 
-	Argument is a 3-tuple of float RGB values in the range 0~1.
-	Return a 3-tuple of float YIQ values in the range (0~1, -1~1, -1~1).
-	"""
-	if len(rgb) != 3:
-		raise ValueError("expected a 3-tuple")
-	for i in rgb:
-		if i < 0 or i > 1:
-			raise ValueError("expected values in the range 0~1")
-	return colorsys.rgb_to_yiq(*rgb)
+	@classmethod
+	def _fromrgb(cls, rgb):
+		"""
+		Internal method, as Colour._fromrgb() but returning a frozen object
+		"""
+		colour = super(FrozenColour, cls)._fromrgb(rgb)
+		colour.__frozen = True
+		return colour
 
-def _hsxtorgb(hsl, hsx):
-	"""Internal function, logic behind hsvtorgb() and hsltorgb()"""
-	if len(hsx) != 3:
-		raise ValueError("expected a 3-tuple")
-	h, s, x = hsx
-	h = h % 360
-	for i in [s, x]:
-		if i < 0 or i > 1:
-			raise ValueError("expected saturation and value to be in the range 0~1")
-	if hsl:
-		return colorsys.hls_to_rgb(h / 360.0, x, s)
-	return colorsys.hsv_to_rgb(h / 360.0, s, x)
+	def __setstate__(self, state):
+		"""Restore the object's state when it is unpickled"""
+		Colour.__setstate__(self, state)
+		self.__frozen = True
 
-def hsvtorgb(hsv):
-	"""
-	Convert the given colour in HSV space to RGB space
+	def rgb(self, rgb=None, min=0.0, max=1.0, trusted=False):
+		"""
+		Get the colour as a 3-tuple of RGB values in a particular range
 
-	Argument is a 3-tuple of float HSV values in the range (0~360, 0~1, 0~1), 
-	though hues out of the range 0~360 are accepted.
-	Return a 3-tuple of float RGB values in the range 0~1.
+		See Colour.rgb(). Attempting to set the colour raises a TypeError.
+		"""
+		if rgb is not None:
+			try:
+				self.__frozen
+			except AttributeError:
+				# still being constructed
+				pass
+			else:
+				raise TypeError("FrozenColour objects cannot be modified")
+		return Colour.rgb(self, rgb, min=min, max=max, trusted=trusted)
+
+	def __eq__(self, other):
+		"""Return True if the other object is a FrozenColour of the same colour"""
+		if not isinstance(other, FrozenColour):
+			return NotImplemented
+		return self.rgb() == other.rgb()
+
+	def __ne__(self, other):
+		"""Return True if the other object is not an equal FrozenColour"""
+		if not isinstance(other, FrozenColour):
+			return NotImplemented
+		return self.rgb() != other.rgb()
+
+	def __hash__(self):
+		"""Return a hash of the colour's RGB values"""
+		return hash(self.rgb())
+
+class ColourArray(object):
 	"""
-	return _hsxtorgb(False, hsv)
-
-def hsltorgb(hsl):
+	An array of colours, manipulated all at once
+
+	A ColourArray holds any number of colours as an (N, 3) numpy array of float 
+	RGB values and offers vectorized versions of the getters and setters of the 
+	Colour class. It is much faster than looping over Colour objects when 
+	working with large numbers of colours. numpy is required.
+
+	Getters return numpy arrays rather than tuples: (N, 3) arrays where Colour 
+	would return a 3-tuple and length-N arrays where Colour would return a 
+	single number. hex() and css3() return lists of strings.
+
+	Setters take the same arguments as their Colour counterparts, but each 
+	value can be either a single number (applied to every colour) or a 
+	sequence of N numbers (one per colour). Where Colour takes a 3-tuple, a 
+	ColourArray takes either
+		an (N, 3) array or list of rows
+			one 3-tuple per colour
+		a tuple of three channels
+			each being None (channel unchanged), a single number or a sequence 
+			of N numbers
+	Note that a tuple of length 3 is always taken to be channels, so pass 
+	rows as a list or array.
+
+	Results agree with the equivalent Colour methods to within TOLERANCE for 
+	float values. Values rounded to integers (rgb255, hex and so on) are 
+	identical except in the rare case where the unrounded value lies within 
+	TOLERANCE of a rounding boundary.
+
+	Examples:
+		from colour import ColourArray
+
+		# A rainbow of 360 colours, darkened, as hex strings
+		a = ColourArray(hsv=(range(360), 0.8, 0.9))
+		print(a.shiftluma(-0.3).hex())
+
+		# Colour-code a long list of usernames
+		a = ColourArray(hash=usernames)
 	"""
-	Convert the given colour in HSL space to RGB space
 
-	Argument is a 3-tuple of float HSL values in the range (0~360, 0~1, 0~1), 
-	though hues out of the range 0~360 are accepted.
-	Return a 3-tuple of float RGB values in the range 0~1.
-	"""
-	return _hsxtorgb(True, hsl)
+	TOLERANCE = 1e-9
 
-def yiqtorgb(yiq):
-	"""
-	Convert the given colour in YIQ space to RGB space
+	def __init__(self, arg=None,
+			grey=None,
+			rgb=None, rgb100=None, rgb255=None,
+			hsv=None, hsv100=None, hsv255=None,
+			hsl=None, hsl100=None, hsl255=None,
+			yiq=None,
+			hex=None, css3=None, hash=None,
+			colour=None):
+		"""
+		Constructor
 
-	Argument is a 3-tuple of float YIQ values in the range (0~1, -1~1, -1~1).
-	Return a 3-tuple of float RGB values in the range 0~1.
-	"""
-	if len(yiq) != 3:
-		raise ValueError("expected a 3-tuple")
-	if yiq[0] < 0 or yiq[0] > 1:
-		raise ValueError("expected luma value in the range 0~1")
-	for i in yiq[1:]:
-		if i < -1 or i > 1:
-			raise ValueError("expected chrominance values in the range 0~1")
-	return colorsys.yiq_to_rgb(*yiq)
+		This can be called without any arguments, in which case the array is 
+		empty.
 
-def hextorgb(hex):
-	"""
-	Parse the given colour represented by a hex RGB string to RGB values
+		If the first argument is used its type and value are used to choose the 
+		action to take. It can be
+			a sequence of numbers in the range 0~1
+				act as if the grey argument was used
+			an (N, 3) array or list of rows
+				act as if the rgb argument was used
+			a sequence of strings
+				each is taken as a hex RGB string if valid, otherwise as a CSS3 
+				colour name
+			a ColourArray object or a sequence of Colour objects
+				act as if the colour argument was used
 
-	Argument is a string of any of the following forms:
-		#xxx
-		#xxxxxx
-		xxx
-		xxxxxx
-	Where x is a case-insensitive hexadecimal digit.
-	Return a 3-tuple of float RGB values in the range 0~1.
-	"""
-	if not _validhex(hex):
-		raise ValueError("invalid hex string")
-	if hex[0] == "#":
-		hex = hex[1:]
-	if len(hex) == 3:
-		hex = hex[0] * 2 + hex[1] * 2 + hex[2] * 2
-	return tuple(int(hex[x * 2:(x + 1) * 2], 16) / 255.0 for x in range(3))
+		Otherwise exactly one of the other arguments must be used. These are as 
+		for the Colour constructor, but each gives one value per colour (see the 
+		class documentation for accepted shapes). The colour argument can be a 
+		ColourArray object or a sequence of Colour objects.
+		"""
 
-def rgbtohex(rgb, hash=True, allowshort=False, forceshort=False):
-	"""
-	Encode the given colour in RGB form to its hexadecimal representation
+		_requirenumpy()
 
-	Argument is a 3-tuple of float RGB values in the range 0~1.
-	Return a string of the form #xxxxxx, where x is a lowercase hexadecimal 
-	digit, two digits per channel.
-	Pass False as the hash argument to omit the leading hash.
-	The allowshort argument controls whether or not a short (3-digit) version is 
-	used if it can losslessly be.
-	The forceshort argument forces a short (3-digit) hex representation by 
-	snapping to the closest available colour.
-	"""
-	h = "#" if hash else ""
-	if forceshort:
-		rgb = tuple(int(round(x * 15)) for x in rgb)
-		return h + "%s%s%s" % tuple(hex(rgb[x])[2:] for x in range(3))
-	rgb = tuple(int(round(x * 255)) for x in rgb)
-	if allowshort and sum(x % 17 for x in rgb) == 0:
-		return h + "%s%s%s" % tuple(hex(int(rgb[x] / 17))[2:] for x in range(3))
+		# ensure there is at maximum one non-None argument
+		if sum((arg is not None,
+				grey is not None,
+				rgb is not None, rgb100 is not None, rgb255 is not None,
+				hsv is not None, hsv100 is not None, hsv255 is not None,
+				hsl is not None, hsl100 is not None, hsl255 is not None,
+				yiq is not None,
+				hex is not None, css3 is not None, hash is not None,
+				colour is not None,
+				)) > 1:
+			raise ValueError("expected at most one non-None argument")
 
-	return h + "%s%s%s" % tuple(hex(rgb[x])[2:].rjust(2, "0") for x in range(3))
+		self.__colours = numpy.zeros((0, 3))
 
-# input checking
-# ------------------------------------------------------------------------------
+		if arg is not None:
+			# determine what is meant by looking at the type and value
+			if isinstance(arg, ColourArray):
+				colour = arg
+			elif isinstance(arg, numpy.ndarray) and arg.ndim == 1:
+				grey = arg
+			elif isinstance(arg, numpy.ndarray):
+				rgb = arg
+			else:
+				arg = list(arg)
+				if all(isinstance(x, Colour) for x in arg):
+					colour = arg
+				elif all(isinstance(x, string_types) for x in arg):
+					self.__colours = numpy.array([hextorgb(x) if _validhex(x) \
+							else Colour(css3=x).rgb() for x in arg], \
+							dtype=float).reshape(-1, 3)
+					return
+				elif all(not _is_sequence(x) for x in arg):
+					grey = arg
+				else:
+					rgb = arg
+
+		if colour is not None:
+			if isinstance(colour, ColourArray):
+				self.__colours = colour.rgb().copy()
+			else:
+				self.__colours = numpy.array([c.rgb() for c in colour],
+						dtype=float).reshape(-1, 3)
+			return
+		if hash is not None:
+			hash = list(hash)
+			self.__colours = numpy.zeros((len(hash), 3))
+			self.hash(hash)
+			return
+		if grey is not None:
+			self.__colours = numpy.zeros((_arraylength(grey), 3))
+			self.grey(grey)
+			return
+
+		for method, value in (
+				(self.rgb, rgb), (self.rgb100, rgb100), (self.rgb255, rgb255),
+				(self.hsv, hsv), (self.hsv100, hsv100), (self.hsv255, hsv255),
+				(self.hsl, hsl), (self.hsl100, hsl100), (self.hsl255, hsl255),
+				(self.yiq, yiq),
+				(self.hex, hex), (self.css3, css3)):
+			if value is not None:
+				if method in (self.hex, self.css3):
+					value = list(value)
+				self.__colours = numpy.zeros((_arraylength(value), 3))
+				method(value)
+				return
 
-def _validhex(string):
-	"""
-	Return True if the given string is a valid hexadecimal representation of an 
-	RGB colour
+	# container behaviour
+	# --------------------------------------------------------------------------
 
-	Accepts strings of three or six case-insensitive hexadecimal digits, with or 
-	without a leading hash.
-	"""
-	if not isinstance(string, string_types):
-		return False
-	return re.match("^#?([0-9a-f]{3}){1,2}$", string, re.I) is not None
+	def __len__(self):
+		"""Return the number of colours in the array"""
+		return len(self.__colours)
 
-def _is_numeric(f):
-	"""Return True if the argument is of a numeric type"""
+	def __getitem__(self, index):
+		"""
+		Return a Colour object for an integer index, or a new ColourArray for a 
+		slice or any other numpy index
+		"""
+		if isinstance(index, (int, numpy.integer)):
+			return Colour(rgb=tuple(float(x) for x in self.__colours[index]))
+		return ColourArray(rgb=self.__colours[index].reshape(-1, 3))
+
+	def __iter__(self):
+		"""Iterate over the colours as Colour objects"""
+		for x in range(len(self)):
+			yield self[x]
+
+	def colours(self):
+		"""Return a list of Colour objects, one for each colour in the array"""
+		return list(self)
+
+	# internal helpers
+	# --------------------------------------------------------------------------
+
+	def __channels(self, values):
+		"""
+		Internal method, split a setter argument into a list of three channels, 
+		each None or a float array of length N
+		"""
+		n = len(self)
+		if isinstance(values, tuple):
+			if len(values) != 3:
+				raise ValueError("expected a 3-tuple")
+			channels = []
+			for value in values:
+				if value is not None:
+					value = numpy.asarray(value, dtype=float)
+					if value.ndim > 1 or (value.ndim == 1 and len(value) != n):
+						raise ValueError("expected a number or %d values per channel" \
+								% n)
+					value = numpy.broadcast_to(value, (n,))
+				channels.append(value)
+			return channels
+		values = numpy.asarray(values, dtype=float)
+		if values.shape != (n, 3):
+			raise ValueError("expected an array of shape (%d, 3)" % n)
+		return [values[:, x] for x in range(3)]
+
+	def __values(self, value):
+		"""
+		Internal method, broadcast a single number or a sequence of numbers to 
+		a float array of length N
+		"""
+		value = numpy.asarray(value, dtype=float)
+		if value.ndim > 1 or (value.ndim == 1 and len(value) != len(self)):
+			raise ValueError("expected a number or %d values" % len(self))
+		return numpy.broadcast_to(value, (len(self),))
+
+	def __keep(self, unchanged, old):
+		"""
+		Internal method, restore the old colours where the given mask is true
+		"""
+		if unchanged.any():
+			self.__colours[unchanged] = old[unchanged]
+		return self
+
+	def __setluma(self, y):
+		"""
+		Internal method, set the luma of every colour without range checks
+		"""
+		self.__colours = _setluma_array(self.__colours, y)
+		return self
+
+	# base methods for the various colour models
+	# --------------------------------------------------------------------------
+
+	def rgb(self, rgb=None, min=0.0, max=1.0):
+		"""
+		Get or set the colours as RGB values in a particular range
+
+		Called with no rgb argument, return an (N, 3) array of the colours. The 
+		array must not be modified.
+		If both min and max are integer types rather than floats, values are 
+		rounded to the nearest integer.
+
+		Called with RGB values, the colours are set to the given colours.
+		Any missing channels (that is, where None is given rather than values) 
+		are not changed.
+		"""
+
+		if rgb is None:
+			if min == 0.0 and max == 1.0:
+				values = self.__colours.view()
+				values.flags.writeable = False
+				return values
+			values = min + self.__colours * (max - min)
+			if not isinstance(min, float) \
+					and not isinstance(max, float):
+				# round to integers
+				return _roundarray(values)
+			return values
+
+		channels = self.__channels(rgb)
+		for i in channels:
+			if i is not None and _outofrange(i, min, max):
+				raise ValueError("expected values in the range %s~%s" % (min, max))
+
+		newrgb = numpy.empty_like(self.__colours)
+		for x in range(3):
+			if channels[x] is None:
+				newrgb[:, x] = self.__colours[:, x]
+			elif min == 0.0 and max == 1.0:
+				newrgb[:, x] = channels[x]
+			else:
+				newrgb[:, x] = (channels[x] - min) / float(max - min)
+
+		self.__colours = newrgb
+		return self
+	def rgb100(self, *args, **kwargs):
+		"""Same as rgb() with min set to 0 and max to 100"""
+		return self.rgb(min=0, max=100, *args, **kwargs)
+	def rgb255(self, *args, **kwargs):
+		"""Same as rgb() with min set to 0 and max to 255"""
+		return self.rgb(min=0, max=255, *args, **kwargs)
+
+	def __hsx(self, hsl, hsx=None, perceptual=False,
+			hmin=0.0, hmax=360.0, sxmin=0.0, sxmax=1.0):
+		"""
+		Internal method, logic behind hsv() and hsl()
+		"""
+		if hsx is None:
+			values = _rgbtohsx_array(hsl, self.__colours)
+			h, s, x = values[:, 0], values[:, 1], values[:, 2]
+			if hmin != 0.0 or hmax != 360.0:
+				h = hmin + (h / 360.0) * (hmax - hmin)
+			if not isinstance(hmin, float) \
+					and not isinstance(hmax, float):
+				# round to integer
+				h = _roundarray(h)
+
+			if sxmin != 0.0 or sxmax != 1.0:
+				s = sxmin + s * (sxmax - sxmin)
+				x = sxmin + x * (sxmax - sxmin)
+			if not isinstance(sxmin, float) \
+					and not isinstance(sxmax, float):
+				s = _roundarray(s)
+				x = _roundarray(x)
+			return numpy.column_stack((h, s, x))
+
+		h, s, x = self.__channels(hsx)
+		if h is not None:
+			h = (h - hmin) % (hmax - hmin) + hmin
+		for i in [s, x]:
+			if i is not None and _outofrange(i, sxmin, sxmax):
+				raise ValueError(\
+						"expected saturation and %s values in the range %s~%s" \
+						% ("lightness" if hsl else "value", sxmin, sxmax))
+
+		oldhsx = self.__hsx(hsl)
+
+		if h is None:
+			h = oldhsx[:, 0]
+		elif hmin != 0.0 or hmax != 360.0:
+			h = (h - hmin) / float(hmax - hmin)
+
+		if s is None:
+			s = oldhsx[:, 1]
+		elif sxmin != 0.0 or sxmax != 1.0:
+			s = (s - sxmin) / float(sxmax - sxmin)
+
+		if x is None:
+			x = oldhsx[:, 2]
+		elif sxmin != 0.0 or sxmax != 1.0:
+			x = (x - sxmin) / float(sxmax - sxmin)
+
+		if perceptual:
+			oldluma = self.luma()
+
+		self.__colours = _hsxtorgb_array(hsl, numpy.column_stack((h, s, x)))
+
+		if perceptual:
+			self.__setluma(oldluma)
+
+		return self
+
+	def hsv(self, hsv=None, perceptual=False,
+			hmin=0.0, hmax=360.0, svmin=0.0, svmax=1.0):
+		"""
+		Get or set the colours as HSV values in a particular range
+
+		See Colour.hsv(). Called with no hsv argument, return an (N, 3) array.
+		"""
+		return self.__hsx(False, hsx=hsv, perceptual=perceptual, \
+				hmin=hmin, hmax=hmax, sxmin=svmin, sxmax=svmax)
+	def hsv100(self, *args, **kwargs):
+		"""Same as hsv() with hmin=0, hmax=360, svmin=0, svmax=100"""
+		return self.hsv(hmin=0, hmax=360, svmin=0, svmax=100, *args, **kwargs)
+	def hsv255(self, *args, **kwargs):
+		"""Same as hsv() with hmin=0, hmax=360, svmin=0, svmax=255"""
+		return self.hsv(hmin=0, hmax=360, svmin=0, svmax=255, *args, **kwargs)
+
+	def hsl(self, hsl=None, perceptual=False,
+			hmin=0.0, hmax=360.0, slmin=0.0, slmax=1.0):
+		"""
+		Get or set the colours as HSL values in a particular range
+
+		See Colour.hsl(). Called with no hsl argument, return an (N, 3) array.
+		"""
+		return self.__hsx(True, hsx=hsl, perceptual=perceptual, \
+				hmin=hmin, hmax=hmax, sxmin=slmin, sxmax=slmax)
+	def hsl100(self, *args, **kwargs):
+		"""Same as hsl() with hmin=0, hmax=360, slmin=0, slmax=100"""
+		return self.hsl(hmin=0, hmax=360, slmin=0, slmax=100, *args, **kwargs)
+	def hsl255(self, *args, **kwargs):
+		"""Same as hsl() with hmin=0, hmax=360, slmin=0, slmax=255"""
+		return self.hsl(hmin=0, hmax=360, slmin=0, slmax=255, *args, **kwargs)
+
+	def yiq(self, yiq=None,
+			ymin=0.0, ymax=1.0, iqmin=-1.0, iqmax=1.0):
+		"""
+		Get or set the colours as YIQ values in a particular range
+
+		See Colour.yiq(). Called with no yiq argument, return an (N, 3) array.
+		"""
+		if yiq is None:
+			values = _rgbtoyiq_array(self.__colours)
+			y, i, q = values[:, 0], values[:, 1], values[:, 2]
+			if ymin != 0.0 or ymax != 1.0:
+				y = ymin + y * (ymax - ymin)
+			if not isinstance(ymin, float) \
+					and not isinstance(ymax, float):
+				# round to integer
+				y = _roundarray(y)
+
+			if iqmin != -1.0 or iqmax != 1.0:
+				i = iqmin + i * (iqmax - iqmin)
+				q = iqmin + q * (iqmax - iqmin)
+			if not isinstance(iqmin, float) \
+					and not isinstance(iqmax, float):
+				i = _roundarray(i)
+				q = _roundarray(q)
+			return numpy.column_stack((y, i, q))
+
+		y, i, q = self.__channels(yiq)
+		if y is not None and _outofrange(y, ymin, ymax):
+			raise ValueError("expected a luma value in the range %s~%s" % (ymin, ymax))
+		for x in [i, q]:
+			if x is not None and _outofrange(x, iqmin, iqmax):
+				raise ValueError("expected in-phase and quadrature values" \
+						+ " in the range %s~%s" % (iqmin, iqmax))
+
+		oldyiq = self.yiq()
+
+		if y is None:
+			y = oldyiq[:, 0]
+		elif ymin != 0.0 or ymax != 1.0:
+			y = (y - ymin) / float(ymax - ymin)
+
+		if i is None:
+			i = oldyiq[:, 1]
+		elif iqmin != -1.0 or iqmax != 1.0:
+			i = (i - iqmin) / float(iqmax - iqmin)
+
+		if q is None:
+			q = oldyiq[:, 2]
+		elif iqmin != -1.0 or iqmax != 1.0:
+			q = (q - iqmin) / float(iqmax - iqmin)
+
+		if _outofrange(i, -1, 1) or _outofrange(q, -1, 1):
+			raise ValueError("expected chrominance values in the range 0~1")
+		self.__colours = _yiqtorgb_array(numpy.column_stack((y, i, q)))
+		return self
+
+	def xyz(self, xyz=None):
+		"""
+		Get or set the colours as CIE XYZ values
+
+		See Colour.xyz(). Called with no xyz argument, return an (N, 3) array.
+		"""
+		if xyz is None:
+			return _rgbtoxyz_array(self.__colours)
+		xyz = self.__cie(xyz, self.xyz)
+		if _outofrange(xyz, 0, numpy.inf):
+			raise ValueError("expected non-negative XYZ values")
+		self.__colours = _xyztorgb_array(xyz)
+		return self
+
+	def lab(self, lab=None):
+		"""
+		Get or set the colours as CIELAB values
+
+		See Colour.lab(). Called with no lab argument, return an (N, 3) array.
+		"""
+		if lab is None:
+			return _rgbtolab_array(self.__colours)
+		lab = self.__cie(lab, self.lab)
+		if _outofrange(lab[:, 0], 0, 100):
+			raise ValueError("expected lightness values in the range 0~100")
+		self.__colours = _labtorgb_array(lab)
+		return self
+
+	def lch(self, lch=None):
+		"""
+		Get or set the colours as LCh values
+
+		See Colour.lch(). Called with no lch argument, return an (N, 3) array.
+		"""
+		if lch is None:
+			return _rgbtolch_array(self.__colours)
+		lch = self.__cie(lch, self.lch)
+		if _outofrange(lch[:, 0], 0, 100):
+			raise ValueError("expected lightness values in the range 0~100")
+		if _outofrange(lch[:, 1], 0, numpy.inf):
+			raise ValueError("expected non-negative chroma values")
+		self.__colours = _lchtorgb_array(lch)
+		return self
+
+	def __cie(self, values, getter):
+		"""
+		Internal method, return the (N, 3) array of values given to the xyz(), 
+		lab() or lch() setter, with missing channels filled in by the getter
+		"""
+		channels = self.__channels(values)
+		if any(x is None for x in channels):
+			old = getter()
+			channels = [old[:, x] if channels[x] is None else channels[x] \
+					for x in range(3)]
+		return numpy.column_stack(channels)
+
+	# set colours without individual values for one of the colour models
+	# --------------------------------------------------------------------------
+
+	def hex(self, hex=None, hash=True, allowshort=False, forceshort=False):
+		"""
+		Get or set the colours as hex RGB strings, with or without a leading 
+		hash
+
+		Called with no hex argument, return a list of hex strings. See 
+		Colour.hex() for the meaning of the other arguments.
+
+		Called with a sequence of N hex strings, set the colours to the result 
+		of parsing them.
+		"""
+		if hex is None:
+			return _rgbtohex_array(self.__colours, hash=hash,
+					allowshort=allowshort, forceshort=forceshort)
+
+		rgb = hextorgb_many(hex)
+		if len(rgb) != len(self):
+			raise ValueError("expected %d hex strings" % len(self))
+		return self.rgb(numpy.array(rgb, dtype=float).reshape(-1, 3))
+
+	def css3(self, names=None):
+		"""
+		Get or set the colours as CSS3 named colours
+
+		Called with no names argument, return a list containing for each colour 
+		the name of a CSS3 named colour equal to it, or None if there is no 
+		such colour.
+
+		Called with a sequence of N names, set the colours to the corresponding 
+		CSS3 named colours.
+		"""
+		if names is None:
+			index = _css3names()
+			return [index.get(tuple(rgb255)) \
+					for rgb255 in self.rgb255().tolist()]
+
+		names = list(names)
+		if len(names) != len(self):
+			raise ValueError("expected %d names" % len(self))
+		return self.rgb(numpy.array([Colour(css3=x).rgb() for x in names],
+				dtype=float).reshape(-1, 3))
+
+	def nearest_css3(self):
+		"""
+		Find the CSS3 named colours closest to these colours
+
+		Return a 2-tuple of a list of names and an array of distances. See 
+		Colour.nearest_css3().
+		"""
+		tree = _css3tree()
+		names = []
+		distances = numpy.empty(len(self))
+		for x, rgb in enumerate(self.__colours.tolist()):
+			distances[x], index = tree.nearest(rgb)[0]
+			names.append(tree.names[index])
+		return (names, distances)
+
+	def grey(self, i=None, min=0.0, max=1.0):
+		"""
+		Set the colours to shades of grey with the given intensities, or return 
+		the current intensities of those colours which are shades of grey, in a 
+		particular range
+
+		Called with no i argument, return an array of the intensities of the 
+		colours, with NaN for those which are not shades of grey.
+
+		Called with intensities, the colours are set to shades of grey.
+		"""
+		if i is None:
+			i = min + self.intensity() * (max - min)
+			if not isinstance(min, float) \
+					and not isinstance(max, float):
+				# round to integer
+				i = numpy.rint(i)
+			return numpy.where(self.saturation_hsv() != 0, numpy.nan, i)
+
+		i = self.__values(i)
+		if _outofrange(i, min, max):
+			raise ValueError("expected value in the range %s~%s" % (min, max))
+		i = (i - min) / float(max - min)
+
+		return self.rgb(numpy.column_stack((i, i, i)))
+
+	def hash(self, tohash,
+			minh=None, maxh=None, mins=0.2, maxs=1.0, miny=0.3, maxy=0.7):
+		"""
+		Make colours to be associated with the given inputs
+
+		The tohash argument is a sequence of N inputs. See Colour.hash() for 
+		the meaning of the other arguments.
+		"""
+		tohash = list(tohash)
+		if len(tohash) != len(self):
+			raise ValueError("expected %d inputs" % len(self))
+		constraints = _hashconstraints(minh, maxh, mins, maxs, miny, maxy)
+		hsy = numpy.array([_hashhsy(str(x), constraints) for x in tohash],
+				dtype=float).reshape(-1, 3)
+		self.__colours = _hsxtorgb_array(False, hsy)
+		return self.__setluma(hsy[:, 2])
+
+	# hue
+	# --------------------------------------------------------------------------
+
+	def hue(self, h=None, perceptual=False):
+		"""
+		Get or set the hues in degrees
+
+		See Colour.hue(). Called with no h argument, return an array.
+		"""
+		if h is None:
+			return self.hsv()[:, 0]
+		return self.hsv((h, None, None), perceptual=perceptual)
+
+	def shifthue(self, angle, perceptual=False):
+		"""
+		Shift the hues of these colours relatively by the given numbers of 
+		degrees
+
+		See Colour.shifthue().
+		"""
+		angle = self.__values(angle)
+		if not angle.any():
+			return self
+		old = self.__colours
+		self.hue(self.hue() + angle, perceptual=perceptual)
+		return self.__keep(angle == 0, old)
+
+	# saturation of various kinds
+	# --------------------------------------------------------------------------
+
+	def __saturation_hsx(self, hsl, s=None, perceptual=False):
+		"""
+		Internal method, logic behind saturation_hsv() and saturation_hsl()
+		"""
+		if s is None:
+			return self.hsl()[:, 1] if hsl else self.hsv()[:, 1]
+		s = self.__values(s)
+		if _outofrange(s, 0, 1):
+			raise ValueError("expected a value in the range 0~1")
+		if hsl:
+			method = self.hsl
+		else:
+			method = self.hsv
+		return method((None, s, None), perceptual=perceptual)
+
+	def saturation_hsv(self, s=None, perceptual=False):
+		"""
+		Get or set the saturations in HSV space in the range 0~1
+
+		See Colour.saturation_hsv(). Called with no s argument, return an array.
+		"""
+		return self.__saturation_hsx(False, s, perceptual=perceptual)
+
+	def saturation_hsl(self, s=None, perceptual=False):
+		"""
+		Get or set the saturations in HSL space in the range 0~1
+
+		See Colour.saturation_hsl(). Called with no s argument, return an array.
+		"""
+		return self.__saturation_hsx(True, s, perceptual=perceptual)
+
+	def __shiftsaturation_hsx(self, hsl, scale, perceptual=False):
+		"""
+		Internal method, logic behind shiftsaturation_hsv() and 
+		shiftsaturation_hsl()
+		"""
+		scale = self.__values(scale)
+		if not scale.any():
+			return self
+
+		if _outofrange(scale, -1, 1):
+			raise ValueError("expected a value in the range -1~1")
+
+		s = self.saturation_hsl() if hsl else self.saturation_hsv()
+		s = numpy.where(scale > 0, s + (1 - s) * scale, s * (scale + 1))
+		old = self.__colours
+		self.__hsx(hsl, (None, s, None), perceptual=perceptual)
+		return self.__keep(scale == 0, old)
+
+	def shiftsaturation_hsv(self, scale, perceptual=False):
+		"""
+		Shift the saturations of these colours relatively in HSV space
+
+		See Colour.shiftsaturation_hsv().
+		"""
+		return self.__shiftsaturation_hsx(False, scale, perceptual=perceptual)
+
+	def shiftsaturation_hsl(self, scale, perceptual=False):
+		"""
+		Shift the saturations of these colours relatively in HSL space
+
+		See Colour.shiftsaturation_hsl().
+		"""
+		return self.__shiftsaturation_hsx(True, scale, perceptual=perceptual)
+
+	# lightness of various kinds
+	# --------------------------------------------------------------------------
+
+	def intensity(self, i=None):
+		"""
+		Get or set the colours' intensities as floats in the range 0~1
+
+		See Colour.intensity(). Called with no i argument, return an array.
+		"""
+		c = self.__colours
+		if i is None:
+			return (c[:, 0] + c[:, 1] + c[:, 2]) / 3.0
+
+		i = self.__values(i)
+		if _outofrange(i, 0, 1):
+			raise ValueError("expected value in the range 0~1")
+
+		current = self.intensity()
+		diff = i - current
+		with numpy.errstate(divide="ignore", invalid="ignore"):
+			scale = numpy.where(diff > 0, diff / (1 - current), diff / current)
+		target = (diff > 0).astype(float)[:, numpy.newaxis]
+		newrgb = c + (target - c) * numpy.abs(scale)[:, numpy.newaxis]
+
+		ends = (i == 0) | (i == 1)
+		newrgb[ends] = i[ends][:, numpy.newaxis]
+		unchanged = (i == current) & ~ends
+		newrgb[unchanged] = c[unchanged]
+		self.__colours = newrgb
+		return self
+
+	def shiftintensity(self, scale):
+		"""
+		Shift the intensities of these colours relatively towards black or white
+
+		See Colour.shiftintensity().
+		"""
+		scale = self.__values(scale)
+		if not scale.any():
+			return self
+
+		if _outofrange(scale, -1, 1):
+			raise ValueError("expected a value in the range -1~1")
+
+		c = self.__colours
+		target = (scale > 0).astype(float)[:, numpy.newaxis]
+		self.__colours = c + (target - c) * numpy.abs(scale)[:, numpy.newaxis]
+		return self.__keep(scale == 0, c)
+
+	def __value_lightness(self, hsl, x=None):
+		"""
+		Internal method, logic behind value() and lightness()
+		"""
+		if x is None:
+			return self.hsl()[:, 2] if hsl else self.hsv()[:, 2]
+		x = self.__values(x)
+		if _outofrange(x, 0, 1):
+			raise ValueError("expected a value in the range 0~1")
+		if hsl:
+			return self.hsl((None, None, x))
+		return self.hsv((None, None, x))
+
+	def value(self, v=None):
+		"""
+		Get or set the values in HSV space in the range 0~1
+
+		See Colour.value(). Called with no v argument, return an array.
+		"""
+		return self.__value_lightness(False, v)
+
+	def lightness(self, l=None):
+		"""
+		Get or set the lightnesses in HSL space in the range 0~1
+
+		See Colour.lightness(). Called with no l argument, return an array.
+		"""
+		return self.__value_lightness(True, l)
+
+	def __shiftvalue_lightness(self, hsl, scale):
+		"""
+		Internal method, logic behind shiftvalue() and shiftlightness()
+		"""
+		scale = self.__values(scale)
+		if not scale.any():
+			return self
+
+		if _outofrange(scale, -1, 1):
+			raise ValueError("expected a value in the range -1~1")
+
+		x = self.lightness() if hsl else self.value()
+		x = numpy.where(scale > 0, x + (1 - x) * scale, x * (scale + 1))
+		old = self.__colours
+		self.__value_lightness(hsl, x)
+		return self.__keep(scale == 0, old)
+
+	def shiftvalue(self, scale):
+		"""
+		Shift the values of these colours relatively
+
+		See Colour.shiftvalue().
+		"""
+		return self.__shiftvalue_lightness(False, scale)
+
+	def shiftlightness(self, scale):
+		"""
+		Shift the lightnesses of these colours relatively
+
+		See Colour.shiftlightness().
+		"""
+		return self.__shiftvalue_lightness(True, scale)
+
+	def luma(self, y=None):
+		"""
+		Get or set the lumas of the colours in the range 0~1
+
+		See Colour.luma(). Called with no y argument, return an array.
+		"""
+		if y is None:
+			return self.yiq()[:, 0]
+		y = self.__values(y)
+		if _outofrange(y, 0, 1):
+			raise ValueError("expected a value in the range 0~1")
+		return self.__setluma(y)
+
+	def shiftluma(self, scale):
+		"""
+		Shift the lumas of these colours relatively
+
+		See Colour.shiftluma().
+		"""
+		scale = self.__values(scale)
+		if not scale.any():
+			return self
+
+		if _outofrange(scale, -1, 1):
+			raise ValueError("expected a value in the range -1~1")
+
+		y = self.luma()
+		y = numpy.where(scale > 0, y + (1 - y) * scale, y * (scale + 1))
+		old = self.__colours
+		self.luma(y)
+		return self.__keep(scale == 0, old)
+
+	# mix colours
+	# --------------------------------------------------------------------------
+
+	def mix(self, colour, proportion):
+		"""
+		Mix these colours with others
+
+		The colour argument can be a ColourArray of the same length, in which 
+		case each colour is mixed with its counterpart, or a single Colour 
+		object (or anything the Colour constructor accepts) to mix every colour 
+		with.
+		The proportion argument is a number or a sequence of N numbers in the 
+		range 0~1 controlling how far towards the given colours to move.
+		"""
+		rgb = self.__colours
+		if isinstance(colour, ColourArray):
+			if len(colour) != len(self):
+				raise ValueError("expected a ColourArray of length %d" % len(self))
+			colour = colour.rgb()
+		else:
+			if not isinstance(colour, Colour):
+				colour = Colour(colour)
+			colour = numpy.array(colour.rgb(), dtype=float)
+		proportion = self.__values(proportion)
+		if _outofrange(proportion, 0, 1):
+			raise ValueError("expected a value in the range 0~1")
+		self.__colours = rgb + (colour - rgb) * proportion[:, numpy.newaxis]
+		return self
+
+class ColourList(object):
+	"""
+	A list of 8-bit colours stored compactly as packed integers
+
+	Each colour is kept as one 0xRRGGBB integer in an array.array (four bytes 
+	per colour, against well over a hundred for a Colour object), so a 
+	ColourList suits keeping large numbers of colours in memory. Colours with 
+	channels which are not whole numbers of 255ths are rounded to the nearest 
+	on the way in, as rgb255() rounds them.
+
+	A ColourList acts as a mutable sequence. Indexing it gives a ColourView, a 
+	small read-only Colour which reads its values from the list, so all of the 
+	Colour getters work on it without a Colour object being made; slicing it 
+	gives a new ColourList. Colours are set, appended and inserted as Colour 
+	objects (including views) or anything the Colour constructor accepts.
+
+	hex(), rgb255(), rgb() and colours() convert the whole list at once. The 
+	packed values themselves can be shared without copying through 
+	memoryview() (on Python 3), for instance with numpy:
+		packed = numpy.frombuffer(colours.memoryview(), dtype=numpy.uint32)
+	On Python 3.12 and above a ColourList also supports the buffer protocol 
+	itself, so memoryview(colours) and numpy.frombuffer(colours, ...) work 
+	directly. Values are in the machine's native byte order; tobytes() and 
+	frombytes() copy them to and from bytes.
+
+	Examples:
+		from colour import ColourList
+
+		# Colours for a million users at 4MB
+		colours = ColourList(hash_many(ids))
+
+		print(colours[12].hex(), colours[12].hsv())
+		colours[12] = "goldenrod"
+		hexes = colours[1000:2000].hex()
+	"""
+
+	def __init__(self, colours=None):
+		"""
+		Constructor
+
+		The colours argument is an iterable of Colour objects or of anything 
+		the Colour constructor accepts, another ColourList, or a ColourArray. 
+		Without it the list is empty.
+		"""
+		self.__values = array.array(_packedtype())
+		if colours is None:
+			return
+		if isinstance(colours, ColourList):
+			self.__values.extend(colours.__values)
+		elif isinstance(colours, ColourArray):
+			rgb255 = colours.rgb255().astype(numpy.uint32)
+			_frombytes(self.__values, (rgb255[:, 0] << 16 | rgb255[:, 1] << 8 \
+					| rgb255[:, 2]).astype("u%d" % self.__values.itemsize) \
+					.tobytes())
+		else:
+			self.extend(colours)
+
+	@classmethod
+	def _fromvalues(cls, values):
+		"""
+		Internal method, return a new ColourList holding the given array of 
+		packed values, which are not checked or copied
+		"""
+		colours = cls.__new__(cls)
+		colours.__values = values
+		return colours
+
+	@classmethod
+	def from_packed(cls, values):
+		"""
+		Return a new ColourList of the colours packed as the given iterable of 
+		0xRRGGBB integers
+		"""
+		values = array.array(_packedtype(), values)
+		if values and max(values) > 0xffffff:
+			raise ValueError("expected packed values in the range 0~0xffffff")
+		return cls._fromvalues(values)
+
+	@classmethod
+	def frombytes(cls, data):
+		"""
+		Return a new ColourList of the colours packed as 0xRRGGBB integers in 
+		the given bytes (or other buffer), as written by tobytes()
+		"""
+		values = array.array(_packedtype())
+		_frombytes(values, bytes(data))
+		if values and max(values) > 0xffffff:
+			raise ValueError("expected packed values in the range 0~0xffffff")
+		return cls._fromvalues(values)
+
+	# the sequence protocol
+	# --------------------------------------------------------------------------
+
+	def __len__(self):
+		"""Return the number of colours in the list"""
+		return len(self.__values)
+
+	def __getitem__(self, index):
+		"""
+		Return a ColourView for an integer index, or a new ColourList for a 
+		slice
+		"""
+		if isinstance(index, slice):
+			return ColourList._fromvalues(self.__values[index])
+		length = len(self.__values)
+		if index < 0:
+			index += length
+		if index < 0 or index >= length:
+			raise IndexError("ColourList index out of range")
+		return ColourView(self.__values, index)
+
+	def __setitem__(self, index, colour):
+		"""
+		Set the colour at an integer index, or the colours of a slice to those 
+		of an iterable
+		"""
+		if isinstance(index, slice):
+			self.__values[index] = array.array(self.__values.typecode,
+					[_packcolour(x) for x in colour])
+		else:
+			self.__values[index] = _packcolour(colour)
+
+	def __delitem__(self, index):
+		"""Remove the colour at an integer index, or the colours of a slice"""
+		del self.__values[index]
+
+	def __iter__(self):
+		"""Iterate over the colours as ColourViews"""
+		values = self.__values
+		for index in range(len(values)):
+			yield ColourView(values, index)
+
+	def __eq__(self, other):
+		"""Return True if the other object is a ColourList of the same colours"""
+		if not isinstance(other, ColourList):
+			return NotImplemented
+		return self.__values == other.__values
+
+	def __ne__(self, other):
+		"""
+		Return True if the other object is not a ColourList of the same colours
+		"""
+		if not isinstance(other, ColourList):
+			return NotImplemented
+		return self.__values != other.__values
+
+	__hash__ = None
+
+	def append(self, colour):
+		"""Add a colour to the end of the list"""
+		self.__values.append(_packcolour(colour))
+
+	def extend(self, colours):
+		"""Add each of the given colours to the end of the list"""
+		if isinstance(colours, ColourList):
+			self.__values.extend(colours.__values)
+		else:
+			self.__values.extend(array.array(self.__values.typecode,
+					[_packcolour(x) for x in colours]))
+
+	def insert(self, index, colour):
+		"""Insert a colour before the given index"""
+		self.__values.insert(index, _packcolour(colour))
+
+	# bulk conversion
+	# --------------------------------------------------------------------------
+
+	def packed(self, index):
+		"""Return the colour at the given index as a 0xRRGGBB integer"""
+		return self.__values[index]
+
+	def hex(self, hash=True, allowshort=False, forceshort=False):
+		"""
+		Return a list of the colours as hex strings
+
+		See Colour.hex() for the meaning of the arguments.
+		"""
+		if allowshort or forceshort:
+			return rgbtohex_many(self.rgb(), hash=hash, allowshort=allowshort,
+					forceshort=forceshort)
+		format = "#%06x" if hash else "%06x"
+		return [format % x for x in self.__values]
+
+	def rgb255(self):
+		"""
+		Return a list of the colours as 3-tuples of integer RGB values in the 
+		range 0~255
+		"""
+		return [(x >> 16, x >> 8 & 0xff, x & 0xff) for x in self.__values]
+
+	def rgb(self):
+		"""
+		Return a list of the colours as 3-tuples of float RGB values in the 
+		range 0~1
+		"""
+		floats = _BYTEFLOATS
+		return [(floats[x >> 16], floats[x >> 8 & 0xff], floats[x & 0xff]) \
+				for x in self.__values]
+
+	def colours(self):
+		"""
+		Return a list of Colour objects, one for each colour in the list, which 
+		unlike views are independent of it
+		"""
+		return [Colour._fromrgb(rgb) for rgb in self.rgb()]
+
+	# buffer export
+	# --------------------------------------------------------------------------
+
+	def memoryview(self):
+		"""
+		Return a memoryview of the packed values, sharing their memory
+
+		Writes through the memoryview change the list's colours. While it is 
+		held the list cannot change size (changing size raises a BufferError). 
+		Python 3 is required.
+		"""
+		return memoryview(self.__values)
+
+	def __buffer__(self, flags):
+		"""Support the buffer protocol (Python 3.12 and above)"""
+		return memoryview(self.__values)
+
+	def tobytes(self):
+		"""Return a copy of the packed values as bytes"""
+		try:
+			return self.__values.tobytes()
+		except AttributeError:
+			# Python 2
+			return self.__values.tostring()
+
+class ColourView(Colour):
+	"""
+	A read-only view of one colour in a ColourList
+
+	Views are what indexing or iterating over a ColourList gives. They have 
+	the getters of a Colour object, but no colour of their own: each call 
+	reads the packed value at the view's index in the list, so they are small 
+	and cheap to make, and see any change made to the list there. Using any 
+	method to set or shift the colour raises a TypeError; set colours in the 
+	list instead, or put the view through the Colour constructor to make an 
+	independent copy. Copying or pickling a view gives such a copy too.
+
+	A view still has the two slots in which a Colour keeps its values, since 
+	it is a Colour, though it never uses them (they make up 16 of its 64 
+	bytes on 64-bit CPython).
+	"""
+
+	__slots__ = ("__values", "__index")
+
+	def __init__(self, values, index):
+		"""
+		Constructor
+
+		The arguments are the array of packed values of a ColourList and the 
+		index of the colour in it. Views are normally made by the ColourList.
+		"""
+		self.__values = values
+		self.__index = index
+
+	# Colour's methods read the colour from __colour and cache conversions in 
+	# __derived; here the colour comes from the list and nothing is cached
+	@property
+	def _Colour__colour(self):
+		x = self.__values[self.__index]
+		floats = _BYTEFLOATS
+		return (floats[x >> 16], floats[x >> 8 & 0xff], floats[x & 0xff])
+
+	@property
+	def _Colour__derived(self):
+		return None
+
+	@_Colour__derived.setter
+	def _Colour__derived(self, derived):
+		pass
+
+	def _packed(self):
+		"""Internal method, return the colour as a 0xRRGGBB integer"""
+		return self.__values[self.__index]
+
+	def __reduce__(self):
+		"""
+		Return how to copy or pickle the view: as an independent Colour of its 
+		current colour
+		"""
+		return (Colour, (self.rgb(),))
+
+	def rgb(self, rgb=None, min=0.0, max=1.0, trusted=False):
+		"""
+		Get the colour as a 3-tuple of RGB values in a particular range
+
+		See Colour.rgb(). Attempting to set the colour raises a TypeError.
+		"""
+		if rgb is not None:
+			raise TypeError("ColourView objects cannot be modified")
+		return Colour.rgb(self, min=min, max=max)
+
+	def rgb255(self, *args, **kwargs):
+		"""Same as rgb() with min set to 0 and max to 255"""
+		if not args and not kwargs:
+			x = self.__values[self.__index]
+			return (x >> 16, x >> 8 & 0xff, x & 0xff)
+		return Colour.rgb255(self, *args, **kwargs)
+
+	def hex(self, hex=None, hash=True, allowshort=False, forceshort=False):
+		"""
+		Get the colour as a hex RGB string, with or without a leading hash
+
+		See Colour.hex(). Attempting to set the colour raises a TypeError.
+		"""
+		if hex is None and not allowshort and not forceshort:
+			return ("#%06x" if hash else "%06x") % self.__values[self.__index]
+		return Colour.hex(self, hex, hash=hash, allowshort=allowshort,
+				forceshort=forceshort)
+
+def _packedtype():
+	"""
+	Internal function, return the array.array type code of unsigned integers 
+	of four bytes, used for packed colours
+	"""
+	global _PACKEDTYPE
+	if _PACKEDTYPE is None:
+		_PACKEDTYPE = "I" if array.array("I").itemsize == 4 else "L"
+	return _PACKEDTYPE
+
+_PACKEDTYPE = None
+
+def _frombytes(values, data):
+	"""Internal function, append the values in the given bytes to an array"""
+	try:
+		values.frombytes(data)
+	except AttributeError:
+		# Python 2
+		values.fromstring(data)
+
+def _packcolour(colour):
+	"""
+	Internal function, return the given colour, a Colour object or anything 
+	the Colour constructor accepts, as a 0xRRGGBB integer
+	"""
+	if isinstance(colour, ColourView):
+		return colour._packed()
+	if isinstance(colour, Colour):
+		r, g, b = colour.rgb255()
+	else:
+		try:
+			table = _BYTES
+			r, g, b = [table[x] for x in hextorgb(colour)]
+		except ValueError:
+			r, g, b = Colour(colour).rgb255()
+	return r << 16 | g << 8 | b
+
+# the float channel values of the integers 0~255
+_BYTEFLOATS = tuple(x / 255.0 for x in range(256))
+
+class Transform(object):
+	"""
+	A recorded sequence of operations on colours
+
+	Call any of the Colour methods which modify a colour on a Transform object 
+	and, rather than being carried out, the call is recorded. The whole 
+	sequence can then be applied to any number of colours later. Values must be 
+	given as positional arguments, and getter calls (with no value) cannot be 
+	recorded.
+
+	Examples:
+		from colour import Colour, Transform
+
+		# Record some operations
+		t = Transform().shiftluma(0.2).shifthue(30, perceptual=True)
+
+		# Apply them to a Colour object (which is modified and returned)
+		print(t(Colour("goldenrod")))
+
+		# Or to all the colours in a ColourArray
+		print(t(ColourArray(["goldenrod", "slateblue"])).hex())
+
+	Runs of consecutive operations which are affine in RGB space (mixing, 
+	shifting intensity, setting all three RGB values or a grey, and setting or 
+	shifting luma) are merged into a single 3x4 matrix when the transform is 
+	first applied, so they cost one step however many there are. Each run ends 
+	after an operation which clamps its results (setting or shifting luma), 
+	where the results are clamped just as they would be step by step, and at 
+	any other operation, which is carried out as normal. Results agree with 
+	applying the operations one at a time to within rounding error.
+
+	Transform objects can be pickled as long as their arguments can. The 
+	operations attribute should not be modified other than by recording 
+	operations.
+	"""
+
+	def __init__(self, operations=()):
+		"""
+		Constructor
+
+		The optional operations argument is a sequence of 3-tuples of method 
+		name, tuple of positional arguments and dictionary of keyword 
+		arguments, such as the operations attribute of another Transform.
+		"""
+		self.operations = []
+		self.__plan = None
+		for name, args, kwargs in operations:
+			self.__record(name, args, kwargs)
+
+	def __getattr__(self, name):
+		"""
+		Return a function which records a call to the Colour method of the 
+		given name
+		"""
+		if name not in _TRANSFORM_METHODS:
+			raise AttributeError("'%s' is not a Colour method which can be "
+					"recorded" % name)
+		def record(*args, **kwargs):
+			return self.__record(name, args, kwargs)
+		record.__name__ = name
+		return record
+
+	def __record(self, name, args, kwargs):
+		"""
+		Internal method, check and record a call
+		"""
+		if name not in _TRANSFORM_METHODS:
+			raise ValueError("'%s' is not a Colour method which can be "
+					"recorded" % name)
+		if not args or args[0] is None:
+			raise ValueError("expected a value to be given to %s()" % name)
+		self.operations.append((name, tuple(args), dict(kwargs)))
+		return self
+
+	def __len__(self):
+		"""Return the number of operations recorded"""
+		return len(self.operations)
+
+	def __stages(self):
+		"""
+		Internal method, return the operations as a list of stages, each either 
+		an affine transform (see _affine()) standing for one or more 
+		operations, or an operation to carry out as normal
+		"""
+		plan = self.__plan
+		if plan is not None and plan[0] == len(self.operations):
+			return plan[1]
+		stages = []
+		# the operations in the run being merged, and their merged transform
+		run = []
+		pending = None
+		for operation in self.operations + [None]:
+			affine = None if operation is None else _affine(*operation)
+			if affine is not None:
+				step, clamps = affine
+				run.append(operation)
+				pending = step if pending is None \
+						else _affinecompose(pending, step)
+				if not clamps:
+					continue
+			if run:
+				# a lone operation is carried out as normal, since merging 
+				# would gain nothing
+				stages.append(pending if len(run) > 1 else run[0])
+				run = []
+				pending = None
+			if affine is None and operation is not None:
+				stages.append(operation)
+		self.__plan = (len(self.operations), stages)
+		return stages
+
+	def apply(self, colour):
+		"""
+		Apply the recorded operations in order to the given Colour or 
+		ColourArray object, modifying it, and return it
+		"""
+		array = isinstance(colour, ColourArray)
+		for stage in self.__stages():
+			if isinstance(stage[0], string_types):
+				name, args, kwargs = stage
+				getattr(colour, name)(*args, **kwargs)
+			elif array:
+				colour.rgb(_affineapply_array(stage, colour.rgb()))
+			else:
+				colour.rgb(_affineapply(stage, colour.rgb()), trusted=True)
+		return colour
+	__call__ = apply
+
+	def apply_rgb255(self, rgb255):
+		"""
+		Apply the recorded operations to the given 3-tuple of RGB values in the 
+		range 0~255 and return the result as another
+
+		The result is exactly Colour(rgb255=rgb255) after apply(), rounded by 
+		rgb255().
+		"""
+		return self.apply(Colour(rgb255=rgb255)).rgb255()
+
+# the Colour methods which a Transform can record
+_TRANSFORM_METHODS = frozenset([
+		"rgb", "rgb100", "rgb255",
+		"hsv", "hsv100", "hsv255",
+		"hsl", "hsl100", "hsl255",
+		"yiq", "xyz", "lab", "lch",
+		"hex", "css3", "grey", "hash",
+		"hue", "shifthue",
+		"saturation_hsv", "saturation_hsl",
+		"shiftsaturation_hsv", "shiftsaturation_hsl",
+		"intensity", "shiftintensity",
+		"value", "lightness", "shiftvalue", "shiftlightness",
+		"luma", "shiftluma",
+		"mix",
+		])
+
+# the affine transform which does nothing (see _affine())
+_IDENTITY = (1.0, (0.0, 0.0, 0.0), 0.0, (0.0, 0.0, 0.0))
+
+def _affine(name, args, kwargs):
+	"""
+	Internal function, return the effect of an operation as an affine transform 
+	in RGB space and whether the results are then clamped to the range 0~1, or 
+	None if the operation is not affine
+
+	The transforms all have the form
+		rgb' = scale * rgb + (weights . rgb + offset) + shift
+	where scale and offset are numbers, weights and shift are 3-tuples, and the 
+	bracketed number is added to all three channels. They are represented as 
+	4-tuples of scale, weights, offset and shift. This is a 3x4 matrix, but 
+	one which adds exactly the same amount to each channel as the operations 
+	themselves do, so that shades of grey stay exactly grey.
+
+	Arguments are checked as the operation would check them, except that 
+	operations given out-of-range proportions or scales are not treated as 
+	affine, so that they behave as they do on their own (Colour's methods 
+	ignore them while ColourArray's raise a ValueError).
+	"""
+	if kwargs:
+		return None
+	if name == "mix":
+		if len(args) != 2:
+			return None
+		colour, proportion = args
+		if isinstance(colour, Colour) and not isinstance(colour, FrozenColour):
+			# it could change before the transform is next applied
+			return None
+		if not isinstance(colour, Colour):
+			colour = Colour(colour)
+		if proportion < 0 or proportion > 1:
+			return None
+		return ((1.0 - proportion, (0.0, 0.0, 0.0), 0.0,
+				tuple(proportion * x for x in colour.rgb())), False)
+	if len(args) != 1:
+		return None
+	value = args[0]
+	if name == "shiftintensity":
+		if value < -1 or value > 1:
+			return None
+		if value == 0:
+			return (_IDENTITY, False)
+		if value > 0:
+			return _affine("mix", (1, value), {})
+		return _affine("mix", (0, -value), {})
+	if name in ("rgb", "rgb100", "rgb255", "grey"):
+		if name.startswith("rgb") and None in tuple(value):
+			# channels are set separately
+			return None
+		new = getattr(Colour(), name)(value).rgb()
+		return ((0.0, (0.0, 0.0, 0.0), 0.0, new), False)
+	if name == "luma":
+		if not _trust.trusted and (value < 0 or value > 1):
+			raise ValueError("expected a value in the range 0~1")
+		# add the new luma less the old
+		return ((1.0, tuple(-x for x in _LUMA), value, (0.0, 0.0, 0.0)), True)
+	if name == "shiftluma":
+		if value < -1 or value > 1:
+			return None
+		if value == 0:
+			return (_IDENTITY, False)
+		if value > 0:
+			# add scale * (1 - luma)
+			return ((1.0, tuple(-value * x for x in _LUMA), value,
+					(0.0, 0.0, 0.0)), True)
+		# add scale * luma
+		return ((1.0, tuple(value * x for x in _LUMA), 0.0, (0.0, 0.0, 0.0)),
+				True)
+	return None
+
+def _affinecompose(first, second):
+	"""
+	Internal function, return the affine transform (see _affine()) doing what 
+	the first given transform does followed by what the second does
+	"""
+	k1, w1, u1, t1 = first
+	k2, w2, u2, t2 = second
+	total = sum(w2)
+	return (k2 * k1,
+			tuple(k2 * w1[i] + k1 * w2[i] + total * w1[i] for i in range(3)),
+			(k2 + total) * u1 + sum(w2[i] * t1[i] for i in range(3)) + u2,
+			tuple(k2 * t1[i] + t2[i] for i in range(3)))
+
+def _affineapply(transform, rgb):
+	"""
+	Internal function, apply an affine transform (see _affine()) to a 3-tuple 
+	of RGB values and clamp the results to the range 0~1
+	"""
+	k, w, u, t = transform
+	r, g, b = rgb
+	common = w[0] * r + w[1] * g + w[2] * b + u
+	r = k * r + common + t[0]
+	g = k * g + common + t[1]
+	b = k * b + common + t[2]
+	return (0.0 if r < 0.0 else 1.0 if r > 1.0 else r,
+			0.0 if g < 0.0 else 1.0 if g > 1.0 else g,
+			0.0 if b < 0.0 else 1.0 if b > 1.0 else b)
+
+# static colour conversion functions
+# ------------------------------------------------------------------------------
+
+def _rgbtohsx(hsl, rgb, trusted=False):
+	"""Internal function, logic behind rgbtohsv() and rgbtohsl()"""
+	if not (trusted or _trust.trusted):
+		if len(rgb) != 3:
+			raise ValueError("expected a 3-tuple")
+		for i in rgb:
+			if i < 0 or i > 1:
+				raise ValueError("expected values in the range 0~1")
+	if hsl:
+		hls = colorsys.rgb_to_hls(*rgb)
+		return (hls[0] * 360, hls[2], hls[1])
+	hsv = colorsys.rgb_to_hsv(*rgb)
+	return (hsv[0] * 360, hsv[1], hsv[2])
+
+def rgbtohsv(rgb, trusted=False):
+	"""
+	Convert the given colour in RGB space to HSV space
+
+	Argument is a 3-tuple of float RGB values in the range 0~1.
+	Return a 3-tuple of float HSV values in the range (0~360, 0~1, 0~1).
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	return _rgbtohsx(False, rgb, trusted)
+
+def rgbtohsl(rgb, trusted=False):
+	"""
+	Convert the given colour in RGB space to HSL space
+
+	Argument is a 3-tuple of float RGB values in the range 0~1.
+	Return a 3-tuple of float HSV values in the range (0~360, 0~1, 0~1).
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	return _rgbtohsx(True, rgb, trusted)
+
+def rgbtoyiq(rgb, trusted=False):
+	"""
+	Convert the given colour in RGB space to YIQ space
+
+	Argument is a 3-tuple of float RGB values in the range 0~1.
+	Return a 3-tuple of float YIQ values in the range (0~1, -1~1, -1~1).
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		if len(rgb) != 3:
+			raise ValueError("expected a 3-tuple")
+		for i in rgb:
+			if i < 0 or i > 1:
+				raise ValueError("expected values in the range 0~1")
+	return colorsys.rgb_to_yiq(*rgb)
+
+
+def _hsxtorgb(hsl, hsx, trusted=False):
+	"""Internal function, logic behind hsvtorgb() and hsltorgb()"""
+	if not (trusted or _trust.trusted):
+		if len(hsx) != 3:
+			raise ValueError("expected a 3-tuple")
+		for i in hsx[1:]:
+			if i < 0 or i > 1:
+				raise ValueError("expected saturation and value to be in the range 0~1")
+	h, s, x = hsx
+	h = h % 360
+	if hsl:
+		return colorsys.hls_to_rgb(h / 360.0, x, s)
+	return colorsys.hsv_to_rgb(h / 360.0, s, x)
+
+def hsvtorgb(hsv, trusted=False):
+	"""
+	Convert the given colour in HSV space to RGB space
+
+	Argument is a 3-tuple of float HSV values in the range (0~360, 0~1, 0~1), 
+	though hues out of the range 0~360 are accepted.
+	Return a 3-tuple of float RGB values in the range 0~1.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	return _hsxtorgb(False, hsv, trusted)
+
+def hsltorgb(hsl, trusted=False):
+	"""
+	Convert the given colour in HSL space to RGB space
+
+	Argument is a 3-tuple of float HSL values in the range (0~360, 0~1, 0~1), 
+	though hues out of the range 0~360 are accepted.
+	Return a 3-tuple of float RGB values in the range 0~1.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	return _hsxtorgb(True, hsl, trusted)
+
+def yiqtorgb(yiq, trusted=False):
+	"""
+	Convert the given colour in YIQ space to RGB space
+
+	Argument is a 3-tuple of float YIQ values in the range (0~1, -1~1, -1~1).
+	Return a 3-tuple of float RGB values in the range 0~1.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		if len(yiq) != 3:
+			raise ValueError("expected a 3-tuple")
+		if yiq[0] < 0 or yiq[0] > 1:
+			raise ValueError("expected luma value in the range 0~1")
+		for i in yiq[1:]:
+			if i < -1 or i > 1:
+				raise ValueError("expected chrominance values in the range 0~1")
+	return colorsys.yiq_to_rgb(*yiq)
+
+def rgbtoxyz(rgb, trusted=False):
+	"""
+	Convert the given colour in RGB space, taken to be sRGB, to CIE XYZ space
+
+	Argument is a 3-tuple of float RGB values in the range 0~1.
+	Return a 3-tuple of float XYZ values with a D65 white point, scaled so 
+	that Y (relative luminance) is in the range 0~1.
+	Channels which are whole numbers of 255ths, as those of colours made from 
+	rgb255 values or hex strings are, are linearized by table lookup.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		if len(rgb) != 3:
+			raise ValueError("expected a 3-tuple")
+		for i in rgb:
+			if i < 0 or i > 1:
+				raise ValueError("expected values in the range 0~1")
+	r, g, b = rgb
+	table = _LINEAR
+	linear = table.get(r)
+	r = _linearize(r) if linear is None else linear
+	linear = table.get(g)
+	g = _linearize(g) if linear is None else linear
+	linear = table.get(b)
+	b = _linearize(b) if linear is None else linear
+	x, y, z = _XYZMATRIX
+	return (x[0] * r + x[1] * g + x[2] * b,
+			y[0] * r + y[1] * g + y[2] * b,
+			z[0] * r + z[1] * g + z[2] * b)
+
+def rgbtolab(rgb, trusted=False):
+	"""
+	Convert the given colour in RGB space, taken to be sRGB, to CIELAB space
+
+	Argument is a 3-tuple of float RGB values in the range 0~1.
+	Return a 3-tuple of float CIELAB values with a D65 white point: L in the 
+	range 0~100 and a and b roughly in the range -128~128.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	return _xyztolab(rgbtoxyz(rgb, trusted))
+
+def rgbtolch(rgb, trusted=False):
+	"""
+	Convert the given colour in RGB space, taken to be sRGB, to LCh space (the 
+	cylindrical form of CIELAB)
+
+	Argument is a 3-tuple of float RGB values in the range 0~1.
+	Return a 3-tuple of float LCh values: L in the range 0~100 as in CIELAB, 
+	chroma C from 0 (for greys) to about 134 and hue h in degrees in the range 
+	0~360.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	return _labtolch(rgbtolab(rgb, trusted))
+
+def xyztorgb(xyz, trusted=False):
+	"""
+	Convert the given colour in CIE XYZ space to RGB space, taken to be sRGB
+
+	Argument is a 3-tuple of non-negative float XYZ values as returned by 
+	rgbtoxyz().
+	Return a 3-tuple of float RGB values in the range 0~1: colours outside the 
+	RGB colour cube are clamped to it.
+	Results are remembered in inverse_cache.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		if len(xyz) != 3:
+			raise ValueError("expected a 3-tuple")
+		for i in xyz:
+			if i < 0:
+				raise ValueError("expected non-negative XYZ values")
+	return _inverse(_xyztorgb, xyz)
+
+def labtorgb(lab, trusted=False):
+	"""
+	Convert the given colour in CIELAB space to RGB space, taken to be sRGB
+
+	Argument is a 3-tuple of float CIELAB values as returned by rgbtolab(), 
+	with L in the range 0~100.
+	Return a 3-tuple of float RGB values in the range 0~1: colours outside the 
+	RGB colour cube are clamped to it.
+	Results are remembered in inverse_cache.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		if len(lab) != 3:
+			raise ValueError("expected a 3-tuple")
+		if lab[0] < 0 or lab[0] > 100:
+			raise ValueError("expected lightness value in the range 0~100")
+	return _inverse(_labtorgb, lab)
+
+def lchtorgb(lch, trusted=False):
+	"""
+	Convert the given colour in LCh space to RGB space, taken to be sRGB
+
+	Argument is a 3-tuple of float LCh values as returned by rgbtolch(), with 
+	L in the range 0~100 and C non-negative, though hues out of the range 
+	0~360 are accepted.
+	Return a 3-tuple of float RGB values in the range 0~1: colours outside the 
+	RGB colour cube are clamped to it.
+	Results are remembered in inverse_cache.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		if len(lch) != 3:
+			raise ValueError("expected a 3-tuple")
+		if lch[0] < 0 or lch[0] > 100:
+			raise ValueError("expected lightness value in the range 0~100")
+		if lch[1] < 0:
+			raise ValueError("expected a non-negative chroma value")
+	return _inverse(_lchtorgb, lch)
+
+def _linearize(c):
+	"""
+	Internal function, undo the sRGB gamma curve on a channel value in the 
+	range 0~1
+
+	rgbtoxyz() looks whole numbers of 255ths up in _LINEAR instead.
+	"""
+	if c <= 0.04045:
+		return c / 12.92
+	return ((c + 0.055) / 1.055) ** 2.4
+
+def _delinearize(c):
+	"""
+	Internal function, apply the sRGB gamma curve to a linear channel value, 
+	clamping it to the range 0~1
+	"""
+	if c <= 0.0031308:
+		return 0.0 if c <= 0.0 else 12.92 * c
+	if c >= 1.0:
+		return 1.0
+	return min(1.0, 1.055 * c ** (1.0 / 2.4) - 0.055)
+
+def _xyztolab(xyz):
+	"""Internal function, convert a 3-tuple of XYZ values to CIELAB"""
+	x, y, z = xyz
+	x = _labf(x / _WHITE[0])
+	y = _labf(y / _WHITE[1])
+	z = _labf(z / _WHITE[2])
+	return (116.0 * y - 16.0, 500.0 * (x - y), 200.0 * (y - z))
+
+def _labf(t):
+	"""Internal function, the nonlinear part of the XYZ to CIELAB conversion"""
+	if t > _LABEPSILON:
+		return t ** (1.0 / 3.0)
+	return t / _LABKAPPA + 4.0 / 29.0
+
+def _labfinverse(t):
+	"""Internal function, the inverse of _labf()"""
+	if t > 6.0 / 29.0:
+		return t * t * t
+	return _LABKAPPA * (t - 4.0 / 29.0)
+
+def _labtolch(lab):
+	"""Internal function, convert a 3-tuple of CIELAB values to LCh"""
+	l, a, b = lab
+	return (l, math.hypot(a, b), math.degrees(math.atan2(b, a)) % 360.0)
+
+def _xyztorgb(xyz):
+	"""Internal function, xyztorgb() without the checks or the cache"""
+	x, y, z = xyz
+	r, g, b = _RGBMATRIX
+	return (_delinearize(r[0] * x + r[1] * y + r[2] * z),
+			_delinearize(g[0] * x + g[1] * y + g[2] * z),
+			_delinearize(b[0] * x + b[1] * y + b[2] * z))
+
+def _labtorgb(lab):
+	"""Internal function, labtorgb() without the checks or the cache"""
+	l, a, b = lab
+	y = (l + 16.0) / 116.0
+	return _xyztorgb((_WHITE[0] * _labfinverse(y + a / 500.0),
+			_WHITE[1] * _labfinverse(y),
+			_WHITE[2] * _labfinverse(y - b / 200.0)))
+
+def _lchtorgb(lch):
+	"""Internal function, lchtorgb() without the checks or the cache"""
+	l, c, h = lch
+	h = math.radians(h)
+	return _labtorgb((l, c * math.cos(h), c * math.sin(h)))
+
+def _inverse(function, values):
+	"""
+	Internal function, return function(values) for one of the internal 
+	functions converting to RGB, remembering results in inverse_cache
+	"""
+	key = (function, tuple(values))
+	rgb = inverse_cache.get(key)
+	if rgb is None:
+		rgb = function(key[1])
+		inverse_cache.put(key, rgb)
+	return rgb
+
+def _invert3(m):
+	"""Internal function, return the inverse of a 3x3 matrix"""
+	(a, b, c), (d, e, f), (g, h, i) = m
+	det = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+	return (
+			((e * i - f * h) / det, (c * h - b * i) / det, (b * f - c * e) / det),
+			((f * g - d * i) / det, (a * i - c * g) / det, (c * d - a * f) / det),
+			((d * h - e * g) / det, (b * g - a * h) / det, (a * e - b * d) / det),
+			)
+
+# the matrix converting linear sRGB to CIE XYZ, its inverse, its white point 
+# (the XYZ of RGB white, so that white has a and b of exactly 0) and the 
+# constants of the XYZ to CIELAB conversion
+_XYZMATRIX = (
+		(0.4124564, 0.3575761, 0.1804375),
+		(0.2126729, 0.7151522, 0.0721750),
+		(0.0193339, 0.1191920, 0.9503041),
+		)
+_RGBMATRIX = _invert3(_XYZMATRIX)
+_WHITE = tuple(sum(row) for row in _XYZMATRIX)
+_LABEPSILON = (6.0 / 29.0) ** 3
+_LABKAPPA = 3.0 * (6.0 / 29.0) ** 2
+
+# linear values of the sRGB channel values which are whole numbers of 255ths
+_LINEAR = dict((x / 255.0, _linearize(x / 255.0)) for x in range(256))
+
+def setluma(rgb, y, trusted=False):
+	"""
+	Change the luma of the given colour in RGB space, keeping its chrominance
+
+	Arguments are a 3-tuple of float RGB values in the range 0~1 and a luma in 
+	the range 0~1. Since YIQ is a linear transformation of RGB in which luma 
+	contributes equally to each channel, keeping I and Q while setting Y is the 
+	same as adding the change in luma to each of R, G and B; the results are 
+	then clamped to the range 0~1 as in yiqtorgb(). This is what 
+	Colour.luma() and the perceptual options of the Colour methods do, and 
+	gives the same results as converting to YIQ and back to within about 1e-15, 
+	except that greys stay exactly grey. The round trip left greys with 
+	channels differing by about 1e-16, which a later change of saturation or 
+	hue in HSV or HSL then made into a visible colour of some arbitrary hue 
+	(so, for instance, Colour("white").luma(0.3).saturation_hsv(0.8, 
+	perceptual=True) was purple and is now red, as for any exact grey).
+	If trusted is True the arguments are not checked (see trusted()).
+	Return a 3-tuple of float RGB values in the range 0~1.
+	"""
+	if not (trusted or _trust.trusted):
+		if len(rgb) != 3:
+			raise ValueError("expected a 3-tuple")
+		for i in rgb:
+			if i < 0 or i > 1:
+				raise ValueError("expected values in the range 0~1")
+		if y < 0 or y > 1:
+			raise ValueError("expected luma value in the range 0~1")
+	r, g, b = rgb
+	d = y - (_LUMA[0] * r + _LUMA[1] * g + _LUMA[2] * b)
+	r += d
+	g += d
+	b += d
+	return (0.0 if r < 0.0 else 1.0 if r > 1.0 else r,
+			0.0 if g < 0.0 else 1.0 if g > 1.0 else g,
+			0.0 if b < 0.0 else 1.0 if b > 1.0 else b)
+
+def setluma_many(rgbs, y):
+	"""
+	Change the lumas of many colours in RGB space, as setluma()
+
+	The rgbs argument is an iterable of 3-tuples of float RGB values in the 
+	range 0~1, or an (N, 3) numpy array of them. The y argument is a single 
+	luma for all colours or a sequence of one per colour.
+	Return a list of 3-tuples, or an (N, 3) array if an array was given.
+
+	To preserve the lumas of colours through some edit (as the perceptual 
+	options of the Colour methods do), pass the edited colours and the lumas 
+	of the originals.
+	"""
+	if _isarray(rgbs):
+		y = numpy.asarray(y, dtype=float)
+		if _outofrange(rgbs, 0, 1):
+			raise ValueError("expected values in the range 0~1")
+		if _outofrange(y, 0, 1):
+			raise ValueError("expected luma values in the range 0~1")
+		return _setluma_array(rgbs, y)
+	if _is_sequence(y):
+		return [setluma(rgb, x) for rgb, x in zip(rgbs, y)]
+	return [setluma(rgb, y) for rgb in rgbs]
+
+# the conversions cached by Colour objects
+_CONVERTERS = (rgbtohsv, rgbtohsl, rgbtoyiq, rgbtoxyz, rgbtolab, rgbtolch)
+
+# the contributions of red, green and blue to luma
+_LUMA = tuple(colorsys.rgb_to_yiq(*x)[0] \
+		for x in ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)))
+
+def hextorgb(hex):
+	"""
+	Parse the given colour represented by a hex RGB string to RGB values
+
+	Argument is a string of any of the following forms:
+		#xxx
+		#xxxxxx
+		xxx
+		xxxxxx
+	Where x is a case-insensitive hexadecimal digit.
+	Return a 3-tuple of float RGB values in the range 0~1.
+	"""
+	# the lookup tables only contain valid digits, so they do the validation
+	try:
+		if isinstance(hex, string_types):
+			if hex[0] == "#":
+				hex = hex[1:]
+			if len(hex) == 6:
+				return (_HEXPAIRS[hex[0:2]], _HEXPAIRS[hex[2:4]],
+						_HEXPAIRS[hex[4:6]])
+			if len(hex) == 3:
+				return (_HEXDIGITS[hex[0]], _HEXDIGITS[hex[1]],
+						_HEXDIGITS[hex[2]])
+	except (KeyError, IndexError):
+		pass
+	raise ValueError("invalid hex string")
+
+def hextorgb_many(hexes):
+	"""
+	Parse many colours represented by hex RGB strings to RGB values
+
+	Argument is an iterable (such as a list or a numpy array) of strings of the 
+	forms accepted by hextorgb().
+	Return a list of 3-tuples of float RGB values in the range 0~1.
+	"""
+	pairs = _HEXPAIRS
+	digits = _HEXDIGITS
+	result = []
+	append = result.append
+	for hex in hexes:
+		try:
+			if isinstance(hex, string_types):
+				if hex[0] == "#":
+					hex = hex[1:]
+				if len(hex) == 6:
+					append((pairs[hex[0:2]], pairs[hex[2:4]], pairs[hex[4:6]]))
+					continue
+				if len(hex) == 3:
+					append((digits[hex[0]], digits[hex[1]], digits[hex[2]]))
+					continue
+		except (KeyError, IndexError):
+			pass
+		raise ValueError("invalid hex string %r" % (hex,))
+	return result
+
+def rgbtohex(rgb, hash=True, allowshort=False, forceshort=False):
+	"""
+	Encode the given colour in RGB form to its hexadecimal representation
+
+	Argument is a 3-tuple of float RGB values in the range 0~1.
+	Return a string of the form #xxxxxx, where x is a lowercase hexadecimal 
+	digit, two digits per channel.
+	Pass False as the hash argument to omit the leading hash.
+	The allowshort argument controls whether or not a short (3-digit) version is 
+	used if it can losslessly be.
+	The forceshort argument forces a short (3-digit) hex representation by 
+	snapping to the closest available colour.
+	"""
+	h = "#" if hash else ""
+	try:
+		if forceshort:
+			r, g, b = rgb
+			return h + _HEXNIBBLES[int(round(r * 15))] \
+					+ _HEXNIBBLES[int(round(g * 15))] \
+					+ _HEXNIBBLES[int(round(b * 15))]
+		r, g, b = rgb
+		r = int(round(r * 255))
+		g = int(round(g * 255))
+		b = int(round(b * 255))
+		if allowshort and r % 17 == 0 and g % 17 == 0 and b % 17 == 0:
+			return h + _HEXNIBBLES[r // 17] + _HEXNIBBLES[g // 17] \
+					+ _HEXNIBBLES[b // 17]
+		return h + _HEXBYTES[r] + _HEXBYTES[g] + _HEXBYTES[b]
+	except KeyError:
+		raise ValueError("expected values in the range 0~1")
+
+def rgbtohex_many(rgbs, hash=True, allowshort=False, forceshort=False):
+	"""
+	Encode many colours in RGB form to their hexadecimal representations
+
+	Argument is an iterable of 3-tuples of float RGB values in the range 0~1, 
+	or an (N, 3) numpy array of them. The other arguments are as for 
+	rgbtohex().
+	Return a list of strings.
+	"""
+	if _isarray(rgbs):
+		if _outofrange(rgbs, 0, 1):
+			raise ValueError("expected values in the range 0~1")
+		return _rgbtohex_array(rgbs, hash=hash, allowshort=allowshort,
+				forceshort=forceshort)
+	if allowshort or forceshort:
+		return [rgbtohex(rgb, hash=hash, allowshort=allowshort,
+				forceshort=forceshort) for rgb in rgbs]
+	h = "#" if hash else ""
+	table = _HEXBYTES
+	try:
+		return [h + table[int(round(r * 255))] + table[int(round(g * 255))] \
+				+ table[int(round(b * 255))] for r, g, b in rgbs]
+	except KeyError:
+		raise ValueError("expected values in the range 0~1")
+
+# the channel values which are whole numbers of 255ths, mapped to those numbers
+_BYTES = dict((x / 255.0, x) for x in range(256))
+
+# hex lookup tables
+#	_HEXBYTES: integers 0~255 to two lowercase hex digits
+#	_HEXNIBBLES: integers 0~15 to one lowercase hex digit
+#	_HEXPAIRS: pairs of hex digits in any case to float channel values 0~1
+#	_HEXDIGITS: single hex digits in any case to float channel values 0~1 (as 
+#	in short hex strings, where "a" stands for "aa")
+_HEXBYTES = dict((x, "%02x" % x) for x in range(256))
+_HEXNIBBLES = dict((x, "%x" % x) for x in range(16))
+_HEXPAIRS = dict((a + b, int(a + b, 16) / 255.0) \
+		for a in "0123456789abcdefABCDEF" for b in "0123456789abcdefABCDEF")
+_HEXDIGITS = dict((a, int(a * 2, 16) / 255.0) \
+		for a in "0123456789abcdefABCDEF")
+
+# 8-bit colour conversion functions
+# ------------------------------------------------------------------------------
+
+def rgb255tohsv255(rgb255, trusted=False):
+	"""
+	Convert the given colour in 8-bit RGB to 8-bit HSV
+
+	Argument is a 3-tuple of integer RGB values in the range 0~255.
+	Return a 3-tuple of integer HSV values in the range (0~360, 0~255, 0~255).
+	The results are those of Colour.hsv255() (see "8-bit values" in the module 
+	documentation), but are found without converting to floats.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	return _rgb255tohsx255(False, rgb255, trusted)
+
+def rgb255tohsl255(rgb255, trusted=False):
+	"""
+	Convert the given colour in 8-bit RGB to 8-bit HSL
+
+	Argument is a 3-tuple of integer RGB values in the range 0~255.
+	Return a 3-tuple of integer HSL values in the range (0~360, 0~255, 0~255).
+	The results are those of Colour.hsl255() (see "8-bit values" in the module 
+	documentation), but are found without converting to floats.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	return _rgb255tohsx255(True, rgb255, trusted)
+
+def rgb255toyiq255(rgb255, trusted=False):
+	"""
+	Convert the given colour in 8-bit RGB to 8-bit YIQ
+
+	Argument is a 3-tuple of integer RGB values in the range 0~255.
+	Return a 3-tuple of integer YIQ values: rgbtoyiq()'s values multiplied by 
+	255 and rounded, so a luma in the range 0~255 and in-phase and quadrature 
+	values within -255~255 (see "8-bit values" in the module documentation).
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		rgb255 = _rgb255values(rgb255)
+	r, g, b = rgb255
+	(yr, yg, yb), (ir, ig, ib), (qr, qg, qb) = _YIQFIXED
+	y = _fixedround(yr * r + yg * g + yb * b)
+	i = _fixedround(ir * r + ig * g + ib * b)
+	q = _fixedround(qr * r + qg * g + qb * b)
+	if y is None or i is None or q is None:
+		# too close to half way to be sure which way floats would round
+		return tuple(int(round(x * 255)) \
+				for x in rgbtoyiq((r / 255.0, g / 255.0, b / 255.0), True))
+	return (y, i, q)
+
+def hsv255torgb255(hsv255, trusted=False):
+	"""
+	Convert the given colour in 8-bit HSV to 8-bit RGB
+
+	Argument is a 3-tuple of integer HSV values in the range (0~360, 0~255, 
+	0~255), though hues out of the range 0~360 are accepted.
+	Return a 3-tuple of integer RGB values in the range 0~255.
+	The results are those of setting a colour with Colour.hsv255() and getting 
+	it with Colour.rgb255() (see "8-bit values" in the module documentation), 
+	but are found without converting to floats.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		hsv255 = _hsx255values(False, hsv255)
+	h, s, v = hsv255
+	# the values of colorsys.hsv_to_rgb(), times 255 * 15300
+	i, f = divmod(h % 360, 60)
+	p = v * (255 - s) * 60
+	q = v * (15300 - s * f)
+	t = v * (15300 - s * (60 - f))
+	v *= 15300
+	rgb = ((v, t, p), (q, v, p), (p, v, t), (p, q, v), (t, p, v), (v, p, q))[i]
+	return _roundrgb255(rgb, hsvtorgb, hsv255)
+
+def hsl255torgb255(hsl255, trusted=False):
+	"""
+	Convert the given colour in 8-bit HSL to 8-bit RGB
+
+	Argument is a 3-tuple of integer HSL values in the range (0~360, 0~255, 
+	0~255), though hues out of the range 0~360 are accepted.
+	Return a 3-tuple of integer RGB values in the range 0~255.
+	The results are those of setting a colour with Colour.hsl255() and getting 
+	it with Colour.rgb255() (see "8-bit values" in the module documentation), 
+	but are found without converting to floats.
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		hsl255 = _hsx255values(True, hsl255)
+	h, s, l = hsl255
+	# m1 and m2 of colorsys.hls_to_rgb(), times 255 * 255
+	if 2 * l <= 255:
+		m2 = l * (255 + s)
+	else:
+		m2 = 255 * (l + s) - l * s
+	m1 = 510 * l - m2
+	h %= 360
+	rgb = (_hlschannel(m1, m2, (h + 120) % 360), _hlschannel(m1, m2, h),
+			_hlschannel(m1, m2, (h + 240) % 360))
+	return _roundrgb255(rgb, hsltorgb, hsl255)
+
+def yiq255torgb255(yiq255, trusted=False):
+	"""
+	Convert the given colour in 8-bit YIQ to 8-bit RGB
+
+	Argument is a 3-tuple of integer YIQ values as returned by 
+	rgb255toyiq255(): a luma in the range 0~255 and in-phase and quadrature 
+	values in the range -255~255.
+	Return a 3-tuple of integer RGB values in the range 0~255: those of 
+	yiqtorgb() (which clamps them) given the values divided by 255, multiplied 
+	by 255 and rounded (see "8-bit values" in the module documentation).
+	If trusted is True the argument is not checked (see trusted()).
+	"""
+	if not (trusted or _trust.trusted):
+		if len(yiq255) != 3:
+			raise ValueError("expected a 3-tuple")
+		y, i, q = yiq255
+		if _BYTEVALUES.get(y) is None:
+			raise ValueError("expected an integer luma value in the range 0~255")
+		for x in (i, q):
+			if x != int(x) or x < -255 or x > 255:
+				raise ValueError("expected integer chrominance values in the " \
+						+ "range -255~255")
+		yiq255 = (int(y), int(i), int(q))
+	y, i, q = yiq255
+	(ry, ri, rq), (gy, gi, gq), (by, bi, bq) = _RGBFIXED
+	r = ry * y + ri * i + rq * q
+	g = gy * y + gi * i + gq * q
+	b = by * y + bi * i + bq * q
+	# clamped as yiqtorgb() clamps
+	top = 255 << 20
+	r = _fixedround(0 if r < 0 else top if r > top else r)
+	g = _fixedround(0 if g < 0 else top if g > top else g)
+	b = _fixedround(0 if b < 0 else top if b > top else b)
+	if r is None or g is None or b is None:
+		# too close to half way to be sure which way floats would round
+		return tuple(int(round(c * 255)) \
+				for c in yiqtorgb((y / 255.0, i / 255.0, q / 255.0), True))
+	return (r, g, b)
+
+def rgb255tohsv255_many(rgb255s):
+	"""
+	Convert many colours in 8-bit RGB to 8-bit HSV, as rgb255tohsv255()
+
+	Argument is an iterable of 3-tuples of integer RGB values in the range 
+	0~255, or an (N, 3) numpy array of them.
+	Return a list of 3-tuples, or an (N, 3) array if an array was given.
+	"""
+	if _isarray(rgb255s):
+		return _rgb255tohsx255_array(False, _rgb255array(rgb255s))
+	return _many255(rgb255tohsv255, rgb255s)
+
+def rgb255tohsl255_many(rgb255s):
+	"""
+	Convert many colours in 8-bit RGB to 8-bit HSL, as rgb255tohsl255()
+
+	Argument is an iterable of 3-tuples of integer RGB values in the range 
+	0~255, or an (N, 3) numpy array of them.
+	Return a list of 3-tuples, or an (N, 3) array if an array was given.
+	"""
+	if _isarray(rgb255s):
+		return _rgb255tohsx255_array(True, _rgb255array(rgb255s))
+	return _many255(rgb255tohsl255, rgb255s)
+
+def rgb255toyiq255_many(rgb255s):
+	"""
+	Convert many colours in 8-bit RGB to 8-bit YIQ, as rgb255toyiq255()
+
+	Argument is an iterable of 3-tuples of integer RGB values in the range 
+	0~255, or an (N, 3) numpy array of them.
+	Return a list of 3-tuples, or an (N, 3) array if an array was given.
+	"""
+	if _isarray(rgb255s):
+		return _rgb255toyiq255_array(_rgb255array(rgb255s))
+	return _many255(rgb255toyiq255, rgb255s)
+
+def hsv255torgb255_many(hsv255s):
+	"""
+	Convert many colours in 8-bit HSV to 8-bit RGB, as hsv255torgb255()
+
+	Argument is an iterable of 3-tuples of integer HSV values in the range 
+	(0~360, 0~255, 0~255), or an (N, 3) numpy array of them.
+	Return a list of 3-tuples, or an (N, 3) array if an array was given.
+	"""
+	if _isarray(hsv255s):
+		if _outofrange(hsv255s[:, 1:], 0, 255):
+			raise ValueError(\
+					"expected saturation and value values in the range 0~255")
+		return _hsv255torgb255_array(_intarray(hsv255s))
+	return _many255(hsv255torgb255, hsv255s)
+
+def hsl255torgb255_many(hsl255s):
+	"""
+	Convert many colours in 8-bit HSL to 8-bit RGB, as hsl255torgb255()
+
+	Argument is an iterable of 3-tuples of integer HSL values in the range 
+	(0~360, 0~255, 0~255), or an (N, 3) numpy array of them.
+	Return a list of 3-tuples, or an (N, 3) array if an array was given.
+	"""
+	if _isarray(hsl255s):
+		if _outofrange(hsl255s[:, 1:], 0, 255):
+			raise ValueError("expected saturation and lightness values in " \
+					+ "the range 0~255")
+		return _hsl255torgb255_array(_intarray(hsl255s))
+	return _many255(hsl255torgb255, hsl255s)
+
+def yiq255torgb255_many(yiq255s):
+	"""
+	Convert many colours in 8-bit YIQ to 8-bit RGB, as yiq255torgb255()
+
+	Argument is an iterable of 3-tuples of integer YIQ values as accepted by 
+	yiq255torgb255(), or an (N, 3) numpy array of them.
+	Return a list of 3-tuples, or an (N, 3) array if an array was given.
+	"""
+	if _isarray(yiq255s):
+		if _outofrange(yiq255s[:, 0], 0, 255):
+			raise ValueError("expected luma values in the range 0~255")
+		if _outofrange(yiq255s[:, 1:], -255, 255):
+			raise ValueError("expected chrominance values in the range -255~255")
+		return _yiq255torgb255_array(_intarray(yiq255s))
+	return _many255(yiq255torgb255, yiq255s)
+
+def _rgb255tohsx255(hsl, rgb255, trusted=False):
+	"""Internal function, logic behind rgb255tohsv255() and rgb255tohsl255()"""
+	if not (trusted or _trust.trusted):
+		rgb255 = _rgb255values(rgb255)
+	r, g, b = rgb255
+	maxc = max(r, g, b)
+	minc = min(r, g, b)
+	index = maxc << 8 | minc
+	tables = _bytetablelist or _bytetables()
+	if hsl:
+		s = tables[1][index]
+		x = tables[2][index]
+	else:
+		s = tables[0][index]
+		x = maxc
+	if maxc == minc:
+		return (0, s, x)
+
+	# the hue is 60 times a fraction with denominator d, offset by a multiple 
+	# of 120 and taken modulo 360, rounded
+	d = maxc - minc
+	if r == maxc:
+		h, remainder = divmod(120 * (g - b) + d, 2 * d)
+		if g < b:
+			h += 360
+	elif g == maxc:
+		h, remainder = divmod(120 * (b - r) + d, 2 * d)
+		h += 120
+	else:
+		h, remainder = divmod(120 * (r - g) + d, 2 * d)
+		h += 240
+	if remainder == 0:
+		# exactly half way: round as the float conversion does
+		h = int(round(_rgbtohsx(hsl, (r / 255.0, g / 255.0, b / 255.0),
+				True)[0]))
+	return (h, s, x)
+
+def _hlschannel(m1, m2, h):
+	"""
+	Internal function, return the value of colorsys.hls_to_rgb()'s _v() for 
+	the given m1 and m2 (times 255 * 255) and hue in integer degrees, times 
+	255 * 15300
+	"""
+	if h < 60:
+		return m1 * 60 + (m2 - m1) * h
+	if h < 180:
+		return m2 * 60
+	if h < 240:
+		return m1 * 60 + (m2 - m1) * (240 - h)
+	return m1 * 60
+
+def _roundrgb255(rgb, function, hsx255):
+	"""
+	Internal function, divide the given RGB values (times 255 * 15300) by 
+	15300 and round them, unless any is exactly half way, in which case 
+	convert the given 8-bit HSV or HSL values with the given float function 
+	and round its results instead
+	"""
+	r, rr = divmod(2 * rgb[0] + 15300, 30600)
+	g, rg = divmod(2 * rgb[1] + 15300, 30600)
+	b, rb = divmod(2 * rgb[2] + 15300, 30600)
+	if rr == 0 or rg == 0 or rb == 0:
+		h, s, x = hsx255
+		return tuple(int(round(c * 255)) \
+				for c in function((h, s / 255.0, x / 255.0), True))
+	return (r, g, b)
+
+def _fixedround(x):
+	"""
+	Internal function, round a fixed-point value with 20 fractional bits to the 
+	nearest integer, or return None if it is within 2 ** -10 of half way 
+	between two
+
+	Twenty bits keep the values of the 8-bit YIQ conversions within a single 
+	digit of a Python int, which makes them quick to work with, while the 
+	errors in the coefficients (see _fixedmatrix()) add up to less than half 
+	of 2 ** -10.
+	"""
+	x += 1 << 19
+	fraction = x & 0xfffff
+	if fraction < 0x400 or fraction > 0xffc00:
+		return None
+	return x >> 20
+
+def _rgb255values(rgb255):
+	"""
+	Internal function, return the given 3-tuple of integer RGB values in the 
+	range 0~255 as Python ints, raising ValueError if it is not one
+	"""
+	if len(rgb255) != 3:
+		raise ValueError("expected a 3-tuple")
+	try:
+		return (_BYTEVALUES[rgb255[0]], _BYTEVALUES[rgb255[1]],
+				_BYTEVALUES[rgb255[2]])
+	except (KeyError, TypeError):
+		raise ValueError("expected integer values in the range 0~255")
+
+def _hsx255values(hsl, hsx255):
+	"""
+	Internal function, return the given 3-tuple of an integer hue and integer 
+	saturation and value (or lightness, if hsl is True) values in the range 
+	0~255 as Python ints, raising ValueError if it is not one
+	"""
+	if len(hsx255) != 3:
+		raise ValueError("expected a 3-tuple")
+	h, s, x = hsx255
+	if h != int(h):
+		raise ValueError("expected an integer hue")
+	try:
+		return (int(h), _BYTEVALUES[s], _BYTEVALUES[x])
+	except (KeyError, TypeError):
+		raise ValueError("expected integer saturation and %s values in the " \
+				"range 0~255" % ("lightness" if hsl else "value"))
+
+# the integers 0~255, for checking and normalizing 8-bit values (a float or 
+# numpy integer equal to one of them finds it)
+_BYTEVALUES = dict((x, x) for x in range(256))
+
+def _many255(function, values):
+	"""
+	Internal function, apply an 8-bit conversion function to each of the given 
+	3-tuples, converting each distinct colour only once
+	"""
+	memo = {}
+	result = []
+	append = result.append
+	for value in values:
+		value = tuple(value)
+		converted = memo.get(value)
+		if converted is None:
+			converted = memo[value] = function(value)
+		append(converted)
+	return result
+
+_bytetablelist = None
+def _bytetables():
+	"""
+	Internal function, return lookup tables of HSV saturation, HSL saturation 
+	and HSL lightness values in the range 0~255, indexed by the maximum RGB 
+	channel value (0~255) times 256 plus the minimum
+
+	The values are found with colorsys and rounded exactly as the Colour 
+	getters round them, which when they are half way between two integers 
+	depends on floating point error. The tables are built on first use.
+	"""
+	global _bytetablelist
+	if _bytetablelist is None:
+		tables = [array.array("B", bytearray(65536)) for x in range(3)]
+		for maxc in range(256):
+			x = maxc / 255.0
+			for minc in range(maxc + 1):
+				n = minc / 255.0
+				index = maxc << 8 | minc
+				tables[0][index] = int(round(colorsys.rgb_to_hsv(x, n, n)[1] \
+						* 255))
+				h, l, s = colorsys.rgb_to_hls(x, n, n)
+				tables[1][index] = int(round(s * 255))
+				tables[2][index] = int(round(l * 255))
+		_bytetablelist = tables
+	return _bytetablelist
+
+def _fixedmatrix(function, origin, step):
+	"""
+	Internal function, return the coefficients of a linear colour conversion 
+	function as fixed-point integers with 20 fractional bits, in rows of 
+	output channels
+
+	The coefficients are measured by stepping each input channel away from the 
+	given origin (where the function must not clamp) by the given step, so as 
+	to match the function whatever constants its Python version uses.
+	"""
+	base = function(*origin)
+	columns = []
+	for channel in range(3):
+		point = list(origin)
+		point[channel] += step
+		columns.append([int(round((x - y) / step * (1 << 20))) \
+				for x, y in zip(function(*point), base)])
+	return list(zip(*columns))
+
+# the RGB to YIQ and YIQ to RGB conversions of colorsys as fixed-point 
+# matrices, for the 8-bit YIQ functions
+_YIQFIXED = _fixedmatrix(colorsys.rgb_to_yiq, (0.5, 0.5, 0.5), 2 ** -8)
+_RGBFIXED = _fixedmatrix(colorsys.yiq_to_rgb, (0.5, 0.0, 0.0), 2 ** -8)
+
+# vectorized colour conversion functions (these require numpy)
+# ------------------------------------------------------------------------------
+
+def _requirenumpy():
+	"""
+	Internal function, import numpy if that has not yet been done, raising 
+	ImportError if it is not available
+	"""
+	_import("numpy")
+
+def _hasnumpy():
+	"""
+	Internal function, return True if numpy is available, importing it if that 
+	has not yet been done
+	"""
+	try:
+		_import("numpy")
+	except ImportError:
+		return False
+	return True
+
+def _isarray(value):
+	"""
+	Internal function, return True if the value is a numpy array
+
+	This never imports numpy: if nothing else has, the value cannot be an 
+	array.
+	"""
+	module = sys.modules.get("numpy")
+	return module is not None and isinstance(value, module.ndarray)
+
+def _arraylength(values):
+	"""
+	Internal function, return the number of colours described by a setter 
+	argument for a ColourArray (see the ColourArray class documentation)
+	"""
+	if isinstance(values, tuple):
+		lengths = [len(x) for x in values if x is not None and _is_sequence(x)]
+		return max(lengths) if lengths else 1
+	return len(values)
+
+def _outofrange(values, min, max):
+	"""
+	Internal function, return True if any of the given values are outside the 
+	given range
+	"""
+	return bool(numpy.any((values < min) | (values > max)))
+
+def _roundarray(values):
+	"""
+	Internal function, round an array of floats to integers in the same way 
+	round() does
+	"""
+	return numpy.rint(values).astype(int)
+
+_yiqmatrices = None
+def _yiqmatrix(inverse=False):
+	"""
+	Internal function, return the matrix converting RGB to YIQ, or its inverse
+
+	The coefficients are taken from colorsys so as to match the scalar 
+	functions.
+	"""
+	global _yiqmatrices
+	if _yiqmatrices is None:
+		matrix = numpy.array([colorsys.rgb_to_yiq(*x) for x in numpy.eye(3)]).T
+		_yiqmatrices = (matrix, numpy.linalg.inv(matrix))
+	return _yiqmatrices[1 if inverse else 0]
+
+def _rgbtohsx_array(hsl, rgb):
+	"""
+	Internal function, vectorized logic behind rgbtohsv() and rgbtohsl()
+
+	Argument is an (N, 3) array of RGB values in the range 0~1. Return an 
+	(N, 3) array of HSV or HSL values in the range (0~360, 0~1, 0~1).
+	"""
+	r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+	maxc = rgb.max(axis=1)
+	minc = rgb.min(axis=1)
+	rangec = maxc - minc
+	grey = minc == maxc
+	with numpy.errstate(divide="ignore", invalid="ignore"):
+		rc = (maxc - r) / rangec
+		gc = (maxc - g) / rangec
+		bc = (maxc - b) / rangec
+		h = numpy.where(r == maxc, bc - gc,
+				numpy.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+		h = (h / 6.0) % 1.0
+		if hsl:
+			x = (maxc + minc) / 2.0
+			s = numpy.where(x <= 0.5, rangec / (maxc + minc),
+					rangec / (2.0 - maxc - minc))
+		else:
+			x = maxc
+			s = rangec / maxc
+	h[grey] = 0.0
+	s[grey] = 0.0
+	return numpy.column_stack((h * 360, s, x))
+
+def _hsxtorgb_array(hsl, hsx):
+	"""
+	Internal function, vectorized logic behind hsvtorgb() and hsltorgb()
+
+	Argument is an (N, 3) array of HSV or HSL values in the range 
+	(0~360, 0~1, 0~1), though hues out of the range 0~360 are accepted. Return 
+	an (N, 3) array of RGB values in the range 0~1.
+	"""
+	h = hsx[:, 0] % 360 / 360.0
+	s, x = hsx[:, 1], hsx[:, 2]
+	if hsl:
+		m2 = numpy.where(x <= 0.5, x * (1.0 + s), x + s - (x * s))
+		m1 = 2.0 * x - m2
+		def channel(hue):
+			hue = hue % 1.0
+			return numpy.where(hue < 1.0 / 6.0, m1 + (m2 - m1) * hue * 6.0,
+					numpy.where(hue < 0.5, m2,
+					numpy.where(hue < 2.0 / 3.0,
+						m1 + (m2 - m1) * (2.0 / 3.0 - hue) * 6.0, m1)))
+		rgb = numpy.column_stack((channel(h + 1.0 / 3.0), channel(h),
+				channel(h - 1.0 / 3.0)))
+	else:
+		i = numpy.floor(h * 6.0)
+		f = (h * 6.0) - i
+		p = x * (1.0 - s)
+		q = x * (1.0 - s * f)
+		t = x * (1.0 - s * (1.0 - f))
+		i = i.astype(int) % 6
+		rgb = numpy.column_stack((
+				numpy.choose(i, (x, q, p, p, t, x)),
+				numpy.choose(i, (t, x, x, q, p, p)),
+				numpy.choose(i, (p, p, t, x, x, q))))
+	grey = s == 0.0
+	rgb[grey] = x[grey][:, numpy.newaxis]
+	return rgb
+
+def _rgbtoyiq_array(rgb):
+	"""
+	Internal function, vectorized version of rgbtoyiq() without range checks
+	"""
+	return rgb.dot(_yiqmatrix().T)
+
+def _yiqtorgb_array(yiq):
+	"""
+	Internal function, vectorized version of yiqtorgb() without range checks
+
+	As with yiqtorgb(), results are clamped to the range 0~1.
+	"""
+	return numpy.clip(yiq.dot(_yiqmatrix(inverse=True).T), 0.0, 1.0)
+
+def _rgbtoxyz_array(rgb):
+	"""
+	Internal function, vectorized version of rgbtoxyz() without range checks, 
+	for an array of RGB values whose last axis has length 3
+	"""
+	linear = numpy.where(rgb <= 0.04045, rgb / 12.92,
+			((rgb + 0.055) / 1.055) ** 2.4)
+	return linear.dot(numpy.array(_XYZMATRIX).T)
+
+def _xyztorgb_array(xyz):
+	"""
+	Internal function, vectorized version of xyztorgb() without range checks
+
+	As with xyztorgb(), results are clamped to the range 0~1.
+	"""
+	linear = numpy.clip(xyz.dot(numpy.array(_RGBMATRIX).T), 0.0, 1.0)
+	return numpy.clip(numpy.where(linear <= 0.0031308, 12.92 * linear,
+			1.055 * linear ** (1.0 / 2.4) - 0.055), 0.0, 1.0)
+
+def _rgbtolab_array(rgb):
+	"""
+	Internal function, vectorized version of rgbtolab() without range checks, 
+	for an array of RGB values whose last axis has length 3
+	"""
+	xyz = _rgbtoxyz_array(rgb) / _WHITE
+	f = numpy.where(xyz > _LABEPSILON, numpy.cbrt(xyz),
+			xyz / _LABKAPPA + 4.0 / 29.0)
+	x, y, z = f[..., 0], f[..., 1], f[..., 2]
+	return numpy.stack((116.0 * y - 16.0, 500.0 * (x - y), 200.0 * (y - z)),
+			axis=-1)
+
+def _labtorgb_array(lab):
+	"""
+	Internal function, vectorized version of labtorgb() without range checks
+	"""
+	y = (lab[..., 0] + 16.0) / 116.0
+	f = numpy.stack((y + lab[..., 1] / 500.0, y, y - lab[..., 2] / 200.0),
+			axis=-1)
+	xyz = numpy.where(f > 6.0 / 29.0, f ** 3, _LABKAPPA * (f - 4.0 / 29.0))
+	return _xyztorgb_array(xyz * _WHITE)
+
+def _rgbtolch_array(rgb):
+	"""
+	Internal function, vectorized version of rgbtolch() without range checks
+	"""
+	lab = _rgbtolab_array(rgb)
+	return numpy.stack((lab[..., 0], numpy.hypot(lab[..., 1], lab[..., 2]),
+			numpy.degrees(numpy.arctan2(lab[..., 2], lab[..., 1])) % 360.0),
+			axis=-1)
+
+def _lchtorgb_array(lch):
+	"""
+	Internal function, vectorized version of lchtorgb() without range checks
+	"""
+	h = numpy.radians(lch[..., 2])
+	return _labtorgb_array(numpy.stack((lch[..., 0],
+			lch[..., 1] * numpy.cos(h), lch[..., 1] * numpy.sin(h)), axis=-1))
+
+def _affineapply_array(transform, rgb):
+	"""
+	Internal function, vectorized version of _affineapply()
+	"""
+	k, w, u, t = transform
+	common = rgb.dot(w) + u
+	return numpy.clip(k * rgb + common[:, numpy.newaxis] + t, 0.0, 1.0)
+
+def _setluma_array(rgb, y):
+	"""
+	Internal function, vectorized version of setluma() without range checks
+
+	The y argument is a single luma or an array of one per colour.
+	"""
+	d = y - rgb.dot(_LUMA)
+	return numpy.clip(rgb + numpy.reshape(d, (-1, 1)), 0.0, 1.0)
+
+def _rgbtohex_array(rgb, hash=True, allowshort=False, forceshort=False):
+	"""
+	Internal function, vectorized version of rgbtohex() returning a list of 
+	strings
+	"""
+	h = "#" if hash else ""
+	if forceshort:
+		table = _HEXNIBBLES
+		return [h + table[r] + table[g] + table[b] \
+				for r, g, b in _roundarray(rgb * 15).tolist()]
+	values = _roundarray(rgb * 255)
+	table = _HEXBYTES
+	strings = [h + table[r] + table[g] + table[b] \
+			for r, g, b in values.tolist()]
+	if allowshort:
+		table = _HEXNIBBLES
+		short = numpy.flatnonzero((values % 17 == 0).all(axis=1))
+		for i, (r, g, b) in zip(short.tolist(), (values[short] // 17).tolist()):
+			strings[i] = h + table[r] + table[g] + table[b]
+	return strings
+
+def _intarray(values):
+	"""
+	Internal function, return an array of whole numbers as 64-bit integers, 
+	raising ValueError if any are not whole
+	"""
+	if not numpy.issubdtype(values.dtype, numpy.integer) \
+			and numpy.any(values != numpy.round(values)):
+		raise ValueError("expected integer values")
+	return values.astype(numpy.int64)
+
+def _rgb255array(values):
+	"""
+	Internal function, check an array of integer RGB values in the range 0~255 
+	and return it as 64-bit integers
+	"""
+	if _outofrange(values, 0, 255):
+		raise ValueError("expected values in the range 0~255")
+	return _intarray(values)
+
+def _rgb255tohsx255_array(hsl, rgb):
+	"""
+	Internal function, vectorized logic behind rgb255tohsv255_many() and 
+	rgb255tohsl255_many()
+
+	Argument is an (N, 3) array of 64-bit integer RGB values in the range 
+	0~255. Return an (N, 3) array of integer HSV or HSL values.
+	"""
+	r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+	maxc = numpy.maximum(numpy.maximum(r, g), b)
+	minc = numpy.minimum(numpy.minimum(r, g), b)
+	index = maxc << 8 | minc
+	tables = [numpy.frombuffer(x, dtype=numpy.uint8) for x in _bytetables()]
+	if hsl:
+		s = tables[1][index]
+		x = tables[2][index]
+	else:
+		s = tables[0][index]
+		x = maxc
+	d = maxc - minc
+	grey = d == 0
+	d[grey] = 1
+	rmax = r == maxc
+	gmax = ~rmax & (g == maxc)
+	h, remainder = numpy.divmod(120 * numpy.where(rmax, g - b,
+			numpy.where(gmax, b - r, r - g)) + d, 2 * d)
+	h += numpy.where(rmax, numpy.where(g < b, 360, 0),
+			numpy.where(gmax, 120, 240))
+	h[grey] = 0
+	ties = (remainder == 0) & ~grey
+	if ties.any():
+		# exactly half way: round as the float conversion does
+		h[ties] = _roundarray(_rgbtohsx_array(hsl, rgb[ties] / 255.0)[:, 0])
+	return numpy.column_stack((h, s, x))
+
+def _rgb255toyiq255_array(rgb):
+	"""
+	Internal function, vectorized logic behind rgb255toyiq255_many()
+	"""
+	return _fixedarray(rgb, _YIQFIXED, rgb255toyiq255)
+
+def _yiq255torgb255_array(yiq):
+	"""
+	Internal function, vectorized logic behind yiq255torgb255_many()
+	"""
+	return _fixedarray(yiq, _RGBFIXED, yiq255torgb255, 0, 255)
+
+def _fixedarray(values, matrix, function, min=None, max=None):
+	"""
+	Internal function, multiply an (N, 3) array of 64-bit integers by a matrix 
+	of fixed-point coefficients (see _fixedmatrix()), clip the results to the 
+	given range if any and round them as _fixedround() does
+
+	Rows with any value too close to half way to round are passed to the given 
+	scalar function instead.
+	"""
+	a, b, c = values[:, 0], values[:, 1], values[:, 2]
+	x = numpy.column_stack([ca * a + cb * b + cc * c for ca, cb, cc in matrix])
+	if min is not None:
+		x = numpy.clip(x, min << 20, max << 20)
+	x += 1 << 19
+	fraction = x & 0xfffff
+	result = x >> 20
+	ties = ((fraction < 0x400) | (fraction > 0xffc00)).any(axis=1)
+	if ties.any():
+		result[ties] = [function(tuple(row), True) \
+				for row in values[ties].tolist()]
+	return result
+
+def _hsv255torgb255_array(hsv):
+	"""
+	Internal function, vectorized logic behind hsv255torgb255_many()
+	"""
+	h, s, v = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+	i, f = numpy.divmod(h % 360, 60)
+	p = v * (255 - s) * 60
+	q = v * (15300 - s * f)
+	t = v * (15300 - s * (60 - f))
+	v = v * 15300
+	rgb = numpy.column_stack((
+			numpy.choose(i, (v, q, p, p, t, v)),
+			numpy.choose(i, (t, v, v, q, p, p)),
+			numpy.choose(i, (p, p, t, v, v, q))))
+	return _roundrgb255_array(False, rgb, hsv)
+
+def _hsl255torgb255_array(hsl):
+	"""
+	Internal function, vectorized logic behind hsl255torgb255_many()
+	"""
+	h, s, l = hsl[:, 0] % 360, hsl[:, 1], hsl[:, 2]
+	m2 = numpy.where(2 * l <= 255, l * (255 + s), 255 * (l + s) - l * s)
+	m1 = 510 * l - m2
+	def channel(hue):
+		return numpy.where(hue < 60, m1 * 60 + (m2 - m1) * hue,
+				numpy.where(hue < 180, m2 * 60,
+				numpy.where(hue < 240, m1 * 60 + (m2 - m1) * (240 - hue),
+					m1 * 60)))
+	rgb = numpy.column_stack((channel((h + 120) % 360), channel(h),
+			channel((h + 240) % 360)))
+	return _roundrgb255_array(True, rgb, hsl)
+
+def _roundrgb255_array(hsl, rgb, hsx):
+	"""
+	Internal function, vectorized version of _roundrgb255() for HSV or HSL 
+	values
+	"""
+	rgb, remainder = numpy.divmod(2 * rgb + 15300, 30600)
+	ties = (remainder == 0).any(axis=1)
+	if ties.any():
+		hsx = hsx[ties]
+		rgb[ties] = _roundarray(_hsxtorgb_array(hsl, numpy.column_stack((
+				hsx[:, 0], hsx[:, 1] / 255.0, hsx[:, 2] / 255.0))) * 255)
+	return rgb
+
+# colour sequences
+# ------------------------------------------------------------------------------
+
+def hue_cycle(colour, step=30, count=None, perceptual=False, hex=False,
+		chunksize=None):
+	"""
+	Generate colours stepping around the colour wheel from a starting colour
+
+	The colour argument is a Colour object or anything the Colour constructor 
+	accepts. The xth colour generated (counting from 0) is the starting colour 
+	with its hue shifted by x * step degrees, exactly as 
+	Colour(colour).shifthue(x * step, perceptual=perceptual) would give.
+	The count argument is the number of colours to generate; by default the 
+	sequence never ends.
+
+	See _sequence() for the hex and chunksize arguments.
+	"""
+	counter = itertools.count() if count is None else range(count)
+	return _sequence(colour, (x * step for x in counter), "shifthue",
+			{"perceptual": perceptual}, hex, chunksize)
+
+def luma_ramp(colour, count, start=0.0, stop=1.0, hex=False, chunksize=None):
+	"""
+	Generate shades of a colour with evenly spaced lumas
+
+	The colour argument is a Colour object or anything the Colour constructor 
+	accepts. The given number of colours are generated, with lumas running 
+	evenly from start to stop inclusive, exactly as Colour(colour).luma(y) 
+	would give for each luma y.
+
+	See _sequence() for the hex and chunksize arguments.
+	"""
+	return _sequence(colour, _ramp(count, start, stop), "luma", {}, hex,
+			chunksize)
+
+def saturation_ramp(colour, count, start=0.0, stop=1.0, hsl=False,
+		perceptual=False, hex=False, chunksize=None):
+	"""
+	Generate versions of a colour with evenly spaced saturations
+
+	The colour argument is a Colour object or anything the Colour constructor 
+	accepts. The given number of colours are generated, with saturations 
+	running evenly from start to stop inclusive, exactly as 
+	Colour(colour).saturation_hsv(s, perceptual=perceptual) (or 
+	saturation_hsl() if the hsl argument is True) would give for each 
+	saturation s.
+
+	See _sequence() for the hex and chunksize arguments.
+	"""
+	return _sequence(colour, _ramp(count, start, stop),
+			"saturation_hsl" if hsl else "saturation_hsv",
+			{"perceptual": perceptual}, hex, chunksize)
+
+def _ramp(count, start, stop):
+	"""
+	Internal function, return a generator of count numbers running evenly from 
+	start to stop inclusive
+
+	The count is checked straight away rather than when the generator is 
+	first used.
+	"""
+	if count < 0:
+		raise ValueError("expected a non-negative count")
+	if count == 1:
+		return (start for x in range(1))
+	return (start + (stop - start) * x / float(count - 1) for x in range(count))
+
+def _sequence(colour, values, method, kwargs, hex, chunksize):
+	"""
+	Internal function, logic behind hue_cycle(), luma_ramp() and 
+	saturation_ramp()
+
+	Return a generator which, for each of the given values, generates the 
+	given colour as modified by calling the named Colour method with the value 
+	and keyword arguments. The arguments are checked straight away, so errors 
+	are raised here rather than when the generator is first used.
+
+	Colours are generated one at a time as 3-tuples of RGB values, or as hex 
+	strings if the hex argument is True. Only one Colour object is used 
+	however long the sequence is.
+
+	If chunksize is given, colours are instead calculated in blocks of that 
+	many with ColourArray (so numpy is required) and each block is generated 
+	as an (N, 3) array of RGB values or a list of hex strings. Results then 
+	agree with the one-at-a-time ones to within ColourArray.TOLERANCE.
+	"""
+	if not isinstance(colour, Colour):
+		colour = Colour(colour)
+	rgb = colour.rgb()
+	if chunksize is None:
+		return _sequenceone(rgb, values, method, kwargs, hex)
+	_requirenumpy()
+	if chunksize < 1:
+		raise ValueError("expected a positive chunk size")
+	return _sequencechunks(rgb, values, method, kwargs, hex, chunksize)
+
+def _sequenceone(rgb, values, method, kwargs, hex):
+	"""
+	Internal generator, the work of _sequence() one colour at a time
+	"""
+	scratch = Colour()
+	for value in values:
+		getattr(scratch.rgb(rgb), method)(value, **kwargs)
+		yield scratch.hex() if hex else scratch.rgb()
+
+def _sequencechunks(rgb, values, method, kwargs, hex, chunksize):
+	"""
+	Internal generator, the work of _sequence() in blocks of chunksize colours
+	"""
+	while True:
+		block = list(itertools.islice(values, chunksize))
+		if not block:
+			return
+		colours = ColourArray(rgb=numpy.tile(rgb, (len(block), 1)))
+		getattr(colours, method)(block, **kwargs)
+		yield colours.hex() if hex else colours.rgb()
+
+# HTML swatches
+# ------------------------------------------------------------------------------
+
+class SwatchWriter(object):
+	"""
+	Write HTML colour swatches to a file-like object
+
+	Swatches are the same as those of Colour.swatch() with the same showhex and 
+	cssclass arguments, but are rendered from a precompiled template, with each 
+	colour's hex string and text colour worked out only once, and written to 
+	the output in chunks of chunksize swatches rather than built up as one 
+	string.
+
+	If the classes argument is True, swatches instead refer to a table of short 
+	CSS class names, one per distinct colour, which is written out in <style> 
+	elements: before each chunk, the rules for any colours the chunk uses for 
+	the first time. The first of these also holds a rule for the "swatch" class 
+	giving the font family and padding, unless cssclass is given. Where 
+	colours repeat this makes the output much smaller.
+
+	Examples:
+		# A report of many colours, written to standard output as it goes
+		with SwatchWriter(sys.stdout, classes=True) as writer:
+			for username in usernames:
+				writer.write(Colour(hash=username))
+
+		# Swatches for a whole ColourArray at once
+		SwatchWriter(f).writemany(ColourArray(hsv=(range(360), 0.8, 0.9))) \
+				.close()
+	"""
+
+	def __init__(self, out, showhex=True, cssclass=None, classes=False,
+			chunksize=1024):
+		"""
+		Constructor
+
+		The out argument is a file-like object with a write() method taking 
+		strings. See the class documentation for the others.
+		"""
+		if chunksize < 1:
+			raise ValueError("expected a positive chunk size")
+		self.out = out
+		self.showhex = showhex
+		self.cssclass = cssclass
+		self.classes = classes
+		self.chunksize = chunksize
+		self.count = 0
+		self.__parts = []
+		self.__rules = []
+		self.__names = {}
+		# the template is itself a format string, so escape the class
+		extra = "" if cssclass is None \
+				else (" %s" % cssclass).replace("%", "%%")
+		if classes:
+			self.__template = "<span class=\"swatch%s %%s\">%%s</span>" \
+					% extra
+			if cssclass is None:
+				self.__rules.append(_SWATCHRULE)
+		else:
+			self.__template = _SWATCHINLINE % (extra,
+					_SWATCHSTYLE if cssclass is None else "",
+					"%s", "%s", "%s")
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def __add(self, hex, textcolour):
+		"""
+		Internal method, queue a swatch of the given hex string and text colour
+		"""
+		label = hex if self.showhex else _SWATCHBLANK
+		if self.classes:
+			key = (hex, textcolour)
+			name = self.__names.get(key)
+			if name is None:
+				name = self.__names[key] = "c%x" % len(self.__names)
+				self.__rules.append(".%s{background-color:%s;color:%s}" \
+						% (name, hex, textcolour))
+			self.__parts.append(self.__template % (name, label))
+		else:
+			self.__parts.append(self.__template % (hex, textcolour, label))
+		self.count += 1
+		if len(self.__parts) >= self.chunksize:
+			self.flush()
+
+	def write(self, colour):
+		"""
+		Write a swatch of the given colour, a Colour object or anything the 
+		Colour constructor accepts
+		"""
+		if not isinstance(colour, Colour):
+			colour = Colour(colour)
+		rgb = colour.rgb()
+		self.__add(rgbtohex(rgb), _textcolour(rgb))
+		return self
+
+	def writemany(self, colours):
+		"""
+		Write swatches of each of the given colours
+
+		The argument is an iterable of anything write() accepts, or a 
+		ColourArray, whose hex strings and text colours are then worked out all 
+		at once.
+		"""
+		if isinstance(colours, ColourArray):
+			rgb = colours.rgb()
+			# summed in the same order as _textcolour(), so as to agree exactly
+			black = _LUMA[0] * rgb[:, 0] + _LUMA[1] * rgb[:, 1] \
+					+ _LUMA[2] * rgb[:, 2] > 0.5
+			for hex, b in zip(_rgbtohex_array(rgb), black.tolist()):
+				self.__add(hex, "black" if b else "white")
+			return self
+		for colour in colours:
+			self.write(colour)
+		return self
+
+	def flush(self):
+		"""
+		Write out any waiting swatches, preceded by any new CSS rules
+		"""
+		if self.__rules:
+			self.out.write("<style type=\"text/css\">%s</style>\n" \
+					% "".join(self.__rules))
+			self.__rules = []
+		if self.__parts:
+			self.out.write("\n".join(self.__parts) + "\n")
+			self.__parts = []
+
+	def close(self):
+		"""
+		Write out any waiting swatches
+
+		The output file is not closed.
+		"""
+		self.flush()
+
+def _textcolour(rgb):
+	"""
+	Internal function, return the text colour, black or white, to use on a 
+	swatch of the given colour (a 3-tuple of float RGB values in the range 0~1)
+	"""
+	r, g, b = rgb
+	return "black" \
+			if _LUMA[0] * r + _LUMA[1] * g + _LUMA[2] * b > 0.5 else "white"
+
+# swatch templates
+#	_SWATCHINLINE: a swatch with inline styles, with places for any extra CSS 
+#	class (with a leading space), the font styles, the hex string, the text 
+#	colour and the label
+#	_SWATCHSTYLE: the font styles of a swatch with no extra CSS class
+#	_SWATCHRULE: the same as a CSS rule, for SwatchWriter's class table
+#	_SWATCHBLANK: the label of a swatch without its hex string
+_SWATCHINLINE = "<span class=\"swatch%s\" " \
+		"style=\"%sbackground-color: %s; color: %s\">%s</span>"
+_SWATCHSTYLE = "font-family: monospace; padding: 0.3em 0.8em; "
+_SWATCHRULE = ".swatch{font-family:monospace;padding:0.3em 0.8em}"
+_SWATCHBLANK = "&nbsp;" * 7
+
+# image recolouring
+# ------------------------------------------------------------------------------
+
+def recolour(source, transform, destination=None, format=None,
+		bandsize=1 << 20, cachesize=1 << 16):
+	"""
+	Apply a transform to every pixel of an 8-bit RGB image file
+
+	The source argument is the path of either a binary PPM file (type P6 with a 
+	maximum value of 255) or a raw file of 8-bit RGB triples. The format 
+	argument can be "ppm" or "raw"; by default a file starting with "P6" is 
+	taken to be a PPM file and anything else raw.
+	The transform argument is a Transform object, or anything else with an 
+	apply_rgb255() method mapping a 3-tuple of RGB values in the range 0~255 to 
+	another. If numpy is available and the transform also has an 
+	apply_rgb255_many() method taking an (N, 3) array of them (as a LUT does), 
+	that is given each band's pixels at once instead.
+	If the destination argument is given the result is written to a file at 
+	that path (including any PPM header); otherwise the source file is 
+	modified in place.
+
+	The files are accessed through mmap and processed in bands of about 
+	bandsize bytes (whole rows for PPM files), and the results for at most 
+	about cachesize distinct pixel values are remembered at any time (unless 
+	apply_rgb255_many() is used), so memory use is bounded however large the 
+	image. Each pixel gets exactly the 
+	value the transform gives for it.
+
+	Return the number of pixels processed.
+	"""
+	with open(source, "rb" if destination is not None else "r+b") as f:
+		size = os.fstat(f.fileno()).st_size
+		if format is None:
+			format = "ppm" if f.read(2) == b"P6" else "raw"
+		if format == "ppm":
+			f.seek(0)
+			offset, width = _ppmheader(f)
+			# whole rows per band
+			rowsize = width * 3
+			bandsize = max(rowsize, bandsize - bandsize % rowsize)
+		elif format == "raw":
+			offset = 0
+			bandsize = max(3, bandsize - bandsize % 3)
+		else:
+			raise ValueError("expected format to be \"ppm\" or \"raw\"")
+		if (size - offset) % 3:
+			raise ValueError("expected a whole number of RGB pixels")
+
+		output = None
+		if destination is not None:
+			f.seek(0)
+			output = open(destination, "w+b")
+		try:
+			if output is not None:
+				output.write(f.read(offset))
+				output.truncate(size)
+			if size == offset:
+				return 0
+
+			if output is None:
+				inmap = outmap = mmap.mmap(f.fileno(), 0,
+						access=mmap.ACCESS_WRITE)
+			else:
+				inmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+				outmap = mmap.mmap(output.fileno(), 0, access=mmap.ACCESS_WRITE)
+			try:
+				many = getattr(transform, "apply_rgb255_many", None) \
+						if _hasnumpy() else None
+				cache = _PixelCache(transform)
+				for start in range(offset, size, bandsize):
+					end = min(start + bandsize, size)
+					if many is not None:
+						outmap[start:end] = _recolourband_many(inmap[start:end],
+								many)
+						continue
+					outmap[start:end] = _recolourband(inmap[start:end], cache)
+					if len(cache) > cachesize:
+						cache.clear()
+				outmap.flush()
+			finally:
+				if outmap is not inmap:
+					outmap.close()
+				inmap.close()
+		finally:
+			if output is not None:
+				output.close()
+	return (size - offset) // 3
+
+class _PixelCache(dict):
+	"""
+	Internal class, a dictionary of pixel values to the bytes of their 
+	transformed values, filling itself on lookups
+
+	Keys are pixels packed into integers as 0xRRGGBB.
+	"""
+
+	def __init__(self, transform):
+		dict.__init__(self)
+		self.transform = transform
+
+	def __missing__(self, key):
+		rgb255 = self.transform.apply_rgb255(
+				(key >> 16, (key >> 8) & 0xff, key & 0xff))
+		value = self[key] = bytes(bytearray(rgb255))
+		return value
+
+def _recolourband(data, cache):
+	"""
+	Internal function, return the bytes of a band of RGB pixels with each pixel 
+	replaced by its value in the given _PixelCache
+	"""
+	if _hasnumpy():
+		pixels = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, 3)
+		packed = (pixels[:, 0].astype(numpy.uint32) << 16) \
+				| (pixels[:, 1].astype(numpy.uint32) << 8) | pixels[:, 2]
+		unique, inverse = numpy.unique(packed, return_inverse=True)
+		values = numpy.frombuffer(b"".join(map(cache.__getitem__,
+				unique.tolist())), dtype=numpy.uint8).reshape(-1, 3)
+		return values[inverse.reshape(-1)].tobytes()
+	data = bytearray(data)
+	return b"".join(map(cache.__getitem__,
+			[(data[x] << 16) | (data[x + 1] << 8) | data[x + 2] \
+				for x in range(0, len(data), 3)]))
+
+def _recolourband_many(data, function):
+	"""
+	Internal function, return the bytes of a band of RGB pixels with each pixel 
+	replaced by its value given by the given apply_rgb255_many() method, which 
+	is given all of the pixels at once
+	"""
+	pixels = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, 3)
+	return function(pixels).astype(numpy.uint8).tobytes()
+
+def _ppmheader(f):
+	"""
+	Internal function, read the header of a binary PPM file from the given file 
+	object
+
+	Return a 2-tuple of the offset of the pixel data and the image width.
+	"""
+	header = f.read(1024)
+	fields = []
+	position = 2
+	if header[:2] != b"P6":
+		raise ValueError("expected a binary (P6) PPM file")
+	while len(fields) < 3:
+		match = _regex(_PPMFIELD).match(header, position)
+		if match is None:
+			raise ValueError("invalid PPM header")
+		fields.append(int(match.group(1)))
+		position = match.end()
+	width, height, maxval = fields
+	if maxval != 255:
+		raise ValueError("only PPM files with a maximum value of 255 are "
+				"supported")
+	# exactly one whitespace character separates the header from the data
+	if not header[position:position + 1].isspace():
+		raise ValueError("invalid PPM header")
+	return (position + 1, width)
+
+# whitespace and comments, then a number, in a PPM header
+_PPMFIELD = b"(?:\\s|#[^\\n]*\\n)*([0-9]+)"
+
+# lookup tables
+# ------------------------------------------------------------------------------
+
+class LUT(object):
+	"""
+	A transform compiled into a 3D lookup table
+
+	The transform (usually a Transform object) is evaluated once for each point 
+	of an evenly spaced size*size*size grid over the RGB cube. The result is 
+	then found for any colour in constant time by interpolating between the 
+	eight grid points around it, either trilinearly or, by default, 
+	tetrahedrally (which uses only four of them and keeps greys grey).
+
+	A size of 256 is special: the grid then holds every 8-bit colour, the 
+	results are stored as 8-bit values (in about 48MB) and apply_rgb255() gives 
+	exactly the value the transform itself would.
+
+	Examples:
+		from colour import Colour, ColourArray, Transform, LUT, recolour
+
+		# Compile a transform into a 33*33*33 table
+		lut = LUT(Transform().shiftluma(0.2).shifthue(30, perceptual=True))
+
+		# Apply it to a Colour object (which is modified and returned)
+		print(lut(Colour("goldenrod")))
+
+		# Or to all the colours of a ColourArray at once, or look up an 
+		# (N, 3) array of RGB values (numpy is required for both)
+		print(lut(ColourArray(["goldenrod", "slateblue"])).hex())
+		rgb = lut.lookup_many(rgb)
+
+		# Or to every pixel of an image
+		recolour("photo.ppm", lut)
+
+		# Save it to an Adobe/Resolve .cube file and load it again
+		lut.tocube("warm.cube")
+		lut = LUT.fromcube("warm.cube")
+	"""
+
+	def __init__(self, transform, size=33, interpolation="tetrahedral",
+			processes=None):
+		"""
+		Constructor
+
+		The transform argument is a Transform object or anything else with an 
+		apply() method which modifies a Colour object in place. If processes is 
+		anything other than 1 the grid is evaluated in parallel by that many 
+		worker processes (by default one per CPU), in which case the transform 
+		must be picklable.
+		"""
+		if size < 2 or size > 256:
+			raise ValueError("expected a size in the range 2~256")
+		exhaustive = size == 256
+		tasks = [(transform, size, blue, exhaustive) for blue in range(size)]
+		if processes == 1:
+			planes = map(_lutplane, tasks)
+			table = self.__compile(planes, exhaustive)
+		else:
+			pool = multiprocessing.Pool(processes)
+			try:
+				table = self.__compile(pool.imap(_lutplane, tasks), exhaustive)
+			finally:
+				pool.close()
+				pool.join()
+		self.__setup(size, table, interpolation)
+
+	@classmethod
+	def fromcube(cls, path, interpolation="tetrahedral"):
+		"""
+		Load a lookup table from a .cube file at the given path
+
+		Only 3D tables over the default domain of 0~1 are supported.
+		"""
+		size = None
+		table = array.array("d")
+		with open(path, "r") as f:
+			for line in f:
+				fields = line.split()
+				if not fields or fields[0].startswith("#"):
+					continue
+				keyword = fields[0].upper()
+				if keyword == "LUT_3D_SIZE":
+					size = int(fields[1])
+				elif keyword == "DOMAIN_MIN" or keyword == "DOMAIN_MAX":
+					expected = 0.0 if keyword == "DOMAIN_MIN" else 1.0
+					if [float(x) for x in fields[1:]] != [expected] * 3:
+						raise ValueError("only .cube files with the domain "
+								"0~1 are supported")
+				elif keyword == "TITLE" or keyword.startswith("LUT_3D_"):
+					continue
+				elif keyword.startswith("LUT_1D_"):
+					raise ValueError("only 3D .cube files are supported")
+				elif len(fields) == 3:
+					table.extend(float(x) for x in fields)
+				else:
+					raise ValueError("invalid .cube line: %r" % line.strip())
+		if size is None or size < 2 or size > 256:
+			raise ValueError("expected a LUT_3D_SIZE in the range 2~256")
+		if len(table) != 3 * size ** 3:
+			raise ValueError("expected %d entries in the .cube file, found %d" \
+					% (size ** 3, len(table) // 3))
+		lut = cls.__new__(cls)
+		lut.__setup(size, table, interpolation)
+		return lut
+
+	def __compile(self, planes, exhaustive):
+		"""
+		Internal method, join the results of _lutplane() into a table
+		"""
+		table = bytearray() if exhaustive else array.array("d")
+		for plane in planes:
+			table.extend(plane)
+		return table
+
+	def __setup(self, size, table, interpolation):
+		"""
+		Internal method, set up the object given its size, table of values and 
+		interpolation method
+		"""
+		if interpolation not in ("tetrahedral", "trilinear"):
+			raise ValueError("expected interpolation to be \"tetrahedral\" or "
+					"\"trilinear\"")
+		self.size = size
+		self.interpolation = interpolation
+		self.__table = table
+		# 8-bit tables hold values 0~255, others 0~1
+		self.__scale = 1.0 / 255 if isinstance(table, bytearray) else 1.0
+
+	def __entry(self, r, g, b):
+		"""
+		Internal method, return the table's raw value for the given grid point
+		"""
+		index = 3 * ((b * self.size + g) * self.size + r)
+		return self.__table[index:index + 3]
+
+	def lookup(self, rgb):
+		"""
+		Return the result for the given 3-tuple of RGB values in the range 0~1 
+		as another
+		"""
+		if len(rgb) != 3:
+			raise ValueError("expected a 3-tuple")
+		for i in rgb:
+			if i < 0 or i > 1:
+				raise ValueError("expected RGB values in the range 0.0~1.0")
+
+		last = self.size - 1
+		cell = []
+		fractions = []
+		for i in rgb:
+			position = i * last
+			index = min(int(position), last - 1)
+			cell.append(index)
+			fractions.append(position - index)
+		r, g, b = cell
+		fr, fg, fb = fractions
+		c000 = self.__entry(r, g, b)
+		c111 = self.__entry(r + 1, g + 1, b + 1)
+
+		if self.interpolation == "trilinear":
+			c100 = self.__entry(r + 1, g, b)
+			c010 = self.__entry(r, g + 1, b)
+			c001 = self.__entry(r, g, b + 1)
+			c110 = self.__entry(r + 1, g + 1, b)
+			c101 = self.__entry(r + 1, g, b + 1)
+			c011 = self.__entry(r, g + 1, b + 1)
+			weights = (
+					((1 - fr) * (1 - fg) * (1 - fb), c000),
+					(fr * (1 - fg) * (1 - fb), c100),
+					((1 - fr) * fg * (1 - fb), c010),
+					((1 - fr) * (1 - fg) * fb, c001),
+					(fr * fg * (1 - fb), c110),
+					(fr * (1 - fg) * fb, c101),
+					((1 - fr) * fg * fb, c011),
+					(fr * fg * fb, c111),
+					)
+		else:
+			# split the cell into six tetrahedra along its grey diagonal and 
+			# interpolate between the four corners of the one containing the 
+			# colour
+			if fr > fg:
+				if fg > fb:
+					weights = ((1 - fr, c000),
+							(fr - fg, self.__entry(r + 1, g, b)),
+							(fg - fb, self.__entry(r + 1, g + 1, b)), (fb, c111))
+				elif fr > fb:
+					weights = ((1 - fr, c000),
+							(fr - fb, self.__entry(r + 1, g, b)),
+							(fb - fg, self.__entry(r + 1, g, b + 1)), (fg, c111))
+				else:
+					weights = ((1 - fb, c000),
+							(fb - fr, self.__entry(r, g, b + 1)),
+							(fr - fg, self.__entry(r + 1, g, b + 1)), (fg, c111))
+			else:
+				if fb > fg:
+					weights = ((1 - fb, c000),
+							(fb - fg, self.__entry(r, g, b + 1)),
+							(fg - fr, self.__entry(r, g + 1, b + 1)), (fr, c111))
+				elif fb > fr:
+					weights = ((1 - fg, c000),
+							(fg - fb, self.__entry(r, g + 1, b)),
+							(fb - fr, self.__entry(r, g + 1, b + 1)), (fr, c111))
+				else:
+					weights = ((1 - fg, c000),
+							(fg - fr, self.__entry(r, g + 1, b)),
+							(fr - fb, self.__entry(r + 1, g + 1, b)), (fb, c111))
+
+		scale = self.__scale
+		return tuple(_clamp(scale * sum(w * c[i] for w, c in weights)) \
+				for i in range(3))
+
+	def lookup_many(self, rgbs):
+		"""
+		Return the results for many colours
+
+		Argument is an iterable of 3-tuples of RGB values in the range 0~1, in 
+		which case a list of what lookup() would return for each is returned, 
+		or an (N, 3) numpy array of them, in which case the results are worked 
+		out all at once, exactly as lookup() works them out, and returned as 
+		an array.
+		"""
+		if not _isarray(rgbs):
+			return [self.lookup(rgb) for rgb in rgbs]
+		rgbs = numpy.asarray(rgbs, dtype=float).reshape(-1, 3)
+		if _outofrange(rgbs, 0, 1):
+			raise ValueError("expected RGB values in the range 0.0~1.0")
+		return self.__lookup_array(rgbs)
+
+	def __lookup_array(self, rgb):
+		"""
+		Internal method, vectorized version of lookup() for an (N, 3) array of 
+		RGB values, which are not checked
+
+		The arithmetic is done in the same order as in lookup(), so results 
+		are identical.
+		"""
+		grid = self.__grid()
+		size = self.size
+		last = size - 1
+		position = rgb * last
+		cell = numpy.minimum(position.astype(numpy.intp), last - 1)
+		fractions = position - cell
+		fr, fg, fb = fractions[:, 0], fractions[:, 1], fractions[:, 2]
+		base = (cell[:, 2] * size + cell[:, 1]) * size + cell[:, 0]
+		# the offsets in the grid of the next entries in each channel
+		dr, dg, db = 1, size, size * size
+		c000 = grid[base]
+		c111 = grid[base + (dr + dg + db)]
+
+		if self.interpolation == "trilinear":
+			total = ((1 - fr) * (1 - fg) * (1 - fb))[:, numpy.newaxis] * c000 \
+					+ (fr * (1 - fg) * (1 - fb))[:, numpy.newaxis] \
+						* grid[base + dr] \
+					+ ((1 - fr) * fg * (1 - fb))[:, numpy.newaxis] \
+						* grid[base + dg] \
+					+ ((1 - fr) * (1 - fg) * fb)[:, numpy.newaxis] \
+						* grid[base + db] \
+					+ (fr * fg * (1 - fb))[:, numpy.newaxis] \
+						* grid[base + (dr + dg)] \
+					+ (fr * (1 - fg) * fb)[:, numpy.newaxis] \
+						* grid[base + (dr + db)] \
+					+ ((1 - fr) * fg * fb)[:, numpy.newaxis] \
+						* grid[base + (dg + db)] \
+					+ (fr * fg * fb)[:, numpy.newaxis] * c111
+		else:
+			# the six tetrahedra of lookup(), in the same order, each giving 
+			# the weight of c000, the offset and weight of the two corners 
+			# between and the weight of c111
+			rg, gb, rb = fr > fg, fg > fb, fr > fb
+			bg, br = fb > fg, fb > fr
+			cases = [rg & gb, rg & ~gb & rb, rg & ~gb & ~rb,
+					~rg & bg, ~rg & ~bg & br, ~rg & ~bg & ~br]
+			def choose(*choices):
+				return numpy.select(cases, choices)
+			w0 = choose(1 - fr, 1 - fr, 1 - fb, 1 - fb, 1 - fg, 1 - fg)
+			o1 = choose(dr, dr, db, db, dg, dg)
+			w1 = choose(fr - fg, fr - fb, fb - fr, fb - fg, fg - fb, fg - fr)
+			o2 = choose(dr + dg, dr + db, dr + db, dg + db, dg + db, dr + dg)
+			w2 = choose(fg - fb, fb - fg, fr - fg, fg - fr, fb - fr, fr - fb)
+			w3 = choose(fb, fg, fg, fr, fr, fb)
+			total = w0[:, numpy.newaxis] * c000 \
+					+ w1[:, numpy.newaxis] * grid[base + o1] \
+					+ w2[:, numpy.newaxis] * grid[base + o2] \
+					+ w3[:, numpy.newaxis] * c111
+
+		return numpy.clip(self.__scale * total, 0.0, 1.0)
+
+	def __grid(self):
+		"""
+		Internal method, return the table as an array of rows of 3 values, 
+		sharing its memory, in .cube order
+		"""
+		try:
+			return self.__array
+		except AttributeError:
+			dtype = numpy.uint8 if isinstance(self.__table, bytearray) \
+					else numpy.float64
+			self.__array = numpy.frombuffer(self.__table, dtype=dtype) \
+					.reshape(-1, 3)
+			return self.__array
+
+	def apply(self, colour):
+		"""
+		Set the given Colour object, or all the colours of the given 
+		ColourArray object at once, to the table's results for them, and 
+		return it
+		"""
+		if isinstance(colour, ColourArray):
+			return colour.rgb(self.__lookup_array(colour.rgb()))
+		return colour.rgb(self.lookup(colour.rgb()))
+	__call__ = apply
+
+	def apply_rgb255(self, rgb255):
+		"""
+		Return the result for the given 3-tuple of RGB values in the range 0~255 
+		as another
+
+		For a table of size 256 this is a single lookup.
+		"""
+		if self.size == 256:
+			for i in rgb255:
+				if i < 0 or i > 255:
+					raise ValueError("expected RGB values in the range 0~255")
+			values = self.__entry(*rgb255)
+			if isinstance(values, bytearray):
+				return tuple(values)
+			return tuple(int(round(255 * _clamp(x))) for x in values)
+		return tuple(int(round(255 * x)) \
+				for x in self.lookup(tuple(i / 255.0 for i in rgb255)))
+
+	def apply_rgb255_many(self, rgb255s):
+		"""
+		Return the results for many colours in 8-bit RGB
+
+		Argument is an iterable of 3-tuples of integer RGB values in the range 
+		0~255, in which case a list of what apply_rgb255() would return for 
+		each is returned, or an (N, 3) numpy array of them, in which case the 
+		results are worked out all at once, exactly as apply_rgb255() works 
+		them out, and returned as an array.
+		"""
+		if not _isarray(rgb255s):
+			return [self.apply_rgb255(rgb255) for rgb255 in rgb255s]
+		rgb255s = _rgb255array(numpy.asarray(rgb255s).reshape(-1, 3))
+		if self.size == 256:
+			values = self.__grid()[(rgb255s[:, 2] * 256 + rgb255s[:, 1]) * 256 \
+					+ rgb255s[:, 0]]
+			if isinstance(self.__table, bytearray):
+				return values.astype(int)
+			return _roundarray(255 * numpy.clip(values, 0.0, 1.0))
+		return _roundarray(255 * self.__lookup_array(rgb255s / 255.0))
+
+	def tocube(self, path, title=None):
+		"""
+		Save the lookup table to a .cube file at the given path
+		"""
+		scale = self.__scale
+		table = self.__table
+		with open(path, "w") as f:
+			if title is not None:
+				f.write("TITLE \"%s\"\n" % title)
+			f.write("LUT_3D_SIZE %d\n" % self.size)
+			f.write("DOMAIN_MIN 0.0 0.0 0.0\n")
+			f.write("DOMAIN_MAX 1.0 1.0 1.0\n")
+			for i in range(0, len(table), 3):
+				f.write("%.6f %.6f %.6f\n" % (scale * table[i],
+						scale * table[i + 1], scale * table[i + 2]))
+
+def _lutplane(args):
+	"""
+	Internal function, evaluate a transform at one blue plane of a lookup 
+	table's grid
+
+	The argument is a 4-tuple of the transform, the table size, the blue index 
+	and whether results should be 8-bit (in which case the grid points are 
+	exactly the 8-bit colours). Return the results in .cube order (red varying 
+	fastest).
+	"""
+	transform, size, blue, exhaustive = args
+	colour = Colour()
+	values = []
+	if exhaustive:
+		for green in range(256):
+			for red in range(256):
+				values.extend(transform.apply(
+						colour.rgb255((red, green, blue))).rgb255())
+		return bytearray(values)
+	last = float(size - 1)
+	for green in range(size):
+		for red in range(size):
+			values.extend(transform.apply(
+					colour.rgb((red / last, green / last, blue / last))).rgb())
+	return values
+
+def _clamp(value):
+	"""Internal function, clamp a value to the range 0~1"""
+	return 0.0 if value < 0.0 else 1.0 if value > 1.0 else value
+
+# hashing
+# ------------------------------------------------------------------------------
+
+def _hashconstraints(minh, maxh, mins, maxs, miny, maxy):
+	"""
+	Internal function, check and normalize the constraint arguments of 
+	Colour.hash()
+
+	Return a 6-tuple of the normalized constraints, ready for _hashhsy().
+	"""
+	if maxh is None or minh is None:
+		maxh = 360
+		minh = 0
+	else:
+		while minh <= -360:
+			minh += 360
+		while minh >= 360:
+			minh -= 360
+		while maxh <= -360:
+			maxh += 360
+		while maxh >= 360:
+			maxh -= 360
+
+	if mins < 0 or mins > 1 or maxs < 0 or maxs > 1 \
+			or miny < 0 or miny > 1 or maxy < 0:
+		raise ValueError(
+				"expected mins, maxs, miny and maxy to be in the range 0~1")
+	if mins > maxs:
+		raise ValueError("expected mins to be less than or equal to maxs")
+	if miny > maxy:
+		raise ValueError("expected miny to be less than or equal to maxy")
+
+	return (minh, maxh, mins, maxs, miny, maxy)
+
+def _hashhsy(string, constraints):
+	"""
+	Internal function, hash the given string and return a 3-tuple of hue, 
+	saturation and luma within the given normalized constraints
+	"""
+	minh, maxh, mins, maxs, miny, maxy = constraints
+	hash = hashlib.md5(string.encode('utf-8')).hexdigest()
+	h = minh + (maxh - minh) * int(hash[0:8], 16) / float(16**8)
+	s = mins + (maxs - mins) * int(hash[8:16], 16) / float(16**8)
+	y = miny + (maxy - miny) * int(hash[16:24], 16) / float(16**8)
+	return (h, s, y)
+
+def _hashrgb(string, constraints):
+	"""
+	Internal function, hash the given string and return a 3-tuple of RGB values 
+	for it within the given normalized constraints
+
+	The result is exactly that of setting the hue, saturation and value with 
+	Colour.hsv() and then the luma with Colour.luma().
+	"""
+	h, s, y = _hashhsy(string, constraints)
+	# as in Colour.hsv(), where the luma is first used as the value
+	if y > 1:
+		raise ValueError(
+				"expected saturation and value values in the range 0.0~1.0")
+	rgb = hsvtorgb(((h - 0.0) % 360.0 + 0.0, s, y))
+	# as in Colour.luma()
+	yiq = rgbtoyiq(rgb)
+	return yiqtorgb((y, yiq[1], yiq[2]))
+
+def hash_many(iterable,
+		minh=None, maxh=None, mins=0.2, maxs=1.0, miny=0.3, maxy=0.7):
+	"""
+	Make colours to be associated with each of the given inputs
+
+	The constraint arguments are as for Colour.hash(), and are checked only 
+	once for the whole batch.
+	Return a list of 3-tuples of float RGB values in the range 0~1, exactly as 
+	Colour().hash(x, ...).rgb() would give for each input x. Like 
+	Colour.hash(), this uses and fills hash_cache.
+	"""
+	constraints = None
+	cache = hash_cache
+	result = []
+	append = result.append
+	for tohash in iterable:
+		string = str(tohash)
+		key = (string, minh, maxh, mins, maxs, miny, maxy)
+		rgb = cache.get(key)
+		if rgb is None:
+			if constraints is None:
+				constraints = _hashconstraints(minh, maxh, mins, maxs, miny,
+						maxy)
+			rgb = _hashrgb(string, constraints)
+			cache.put(key, rgb)
+		append(rgb)
+	return result
+
+class LRUCache(object):
+	"""
+	A bounded mapping which forgets its least recently used entries
+
+	Used for hash_cache, the memo of Colour.hash() results. The maxsize 
+	attribute is the most entries kept: None means no limit and 0 disables the 
+	cache. Use resize() to change it.
+
+	The hits, misses and evictions attributes count lookups which found an 
+	entry, lookups which did not and entries dropped to keep within maxsize.
+	"""
+
+	def __init__(self, maxsize=4096):
+		self.maxsize = maxsize
+		self.__entries = OrderedDict()
+		self.__lock = _thread.allocate_lock()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def __len__(self):
+		"""Return the number of entries"""
+		return len(self.__entries)
+
+	def __contains__(self, key):
+		"""Return True if there is an entry for the given key"""
+		return key in self.__entries
+
+	def get(self, key, default=None):
+		"""
+		Return the value stored for the given key, marking it as the most 
+		recently used, or default if there is none
+		"""
+		with self.__lock:
+			try:
+				value = self.__entries.pop(key)
+			except KeyError:
+				self.misses += 1
+				return default
+			self.__entries[key] = value
+			self.hits += 1
+			return value
+
+	def put(self, key, value):
+		"""
+		Store a value for the given key, evicting the least recently used 
+		entries if the cache is full
+		"""
+		if self.maxsize == 0:
+			return
+		with self.__lock:
+			self.__entries.pop(key, None)
+			self.__entries[key] = value
+			self.__evict()
+
+	def resize(self, maxsize):
+		"""
+		Change the maximum number of entries, evicting the least recently used 
+		entries if there are now too many
+		"""
+		with self.__lock:
+			self.maxsize = maxsize
+			self.__evict()
+
+	def clear(self):
+		"""Remove all entries and reset the statistics"""
+		with self.__lock:
+			self.__entries.clear()
+			self.hits = self.misses = self.evictions = 0
+
+	def info(self):
+		"""
+		Return a dictionary of statistics: hits, misses, evictions, size and 
+		maxsize
+		"""
+		return {
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"size": len(self.__entries),
+				"maxsize": self.maxsize,
+				}
+
+	def __evict(self):
+		"""Internal method, drop entries until there are no more than maxsize"""
+		if self.maxsize is None:
+			return
+		while len(self.__entries) > self.maxsize:
+			self.__entries.popitem(last=False)
+			self.evictions += 1
+
+# the memo of Colour.hash() results
+hash_cache = LRUCache()
+
+# the memo of xyztorgb(), labtorgb() and lchtorgb() results, and so of the 
+# xyz(), lab() and lch() setters
+inverse_cache = LRUCache()
+
+# parallel batches
+# ------------------------------------------------------------------------------
+
+def hash_parallel(iterable,
+		minh=None, maxh=None, mins=0.2, maxs=1.0, miny=0.3, maxy=0.7,
+		convert=None, processes=None, chunksize=10000):
+	"""
+	Make colours to be associated with each of the given inputs, using a pool 
+	of worker processes
+
+	The constraint arguments are as for Colour.hash(). If a convert function 
+	is given (such as rgbtohex or rgbtohsv) it is applied to each colour in 
+	the workers. This is a generator: results are yielded in the same order 
+	as the inputs, and are exactly those of hash_many() (after the convert 
+	function if any).
+
+	Inputs are converted to strings in this process (so objects whose string 
+	representations vary between processes still give the same colours as 
+	Colour.hash() would), then sent to the workers in chunks of chunksize. At 
+	most two chunks per worker are in progress at once, so memory use is 
+	bounded however many inputs there are, as long as the results are 
+	consumed as they are yielded. The processes argument is the number of 
+	workers, by default one per CPU; 1 does the work in this process. The 
+	convert function must be picklable (any module-level function is).
+
+	Unlike hash_many() this does not use hash_cache.
+
+	Example:
+		with open("ids.txt") as ids, open("colours.txt", "w") as out:
+			for hex in hash_parallel((line.strip() for line in ids), 
+					convert=rgbtohex):
+				out.write(hex + "\\n")
+	"""
+	constraints = _hashconstraints(minh, maxh, mins, maxs, miny, maxy)
+	_checkparallel(processes, chunksize)
+	chunks = ((_hashchunk, (chunk, constraints, convert)) \
+			for chunk in _chunks((str(x) for x in iterable), chunksize))
+	return _parallel(chunks, processes)
+
+def convert_parallel(function, iterable, processes=None, chunksize=10000,
+		**kwargs):
+	"""
+	Apply a conversion function to each of the given inputs, using a pool of 
+	worker processes
+
+	The function is one of the module's conversion functions (such as 
+	rgbtohex or hsvtorgb) or any other picklable function of one argument, 
+	and any keyword arguments are passed to it. This is a generator, yielding 
+	the results in the same order as the inputs. The other arguments are as 
+	for hash_parallel().
+	"""
+	_checkparallel(processes, chunksize)
+	chunks = ((_convertchunk, (chunk, function, kwargs)) \
+			for chunk in _chunks(iterable, chunksize))
+	return _parallel(chunks, processes)
+
+def _checkparallel(processes, chunksize):
+	"""
+	Internal function, raise ValueError if the processes or chunksize 
+	argument of hash_parallel() or convert_parallel() is out of range
+
+	Called before the generator is made, so mistakes show up where the 
+	function is called rather than where its results are first used.
+	"""
+	if processes is not None and processes < 1:
+		raise ValueError("expected at least one process")
+	if chunksize < 1:
+		raise ValueError("expected a positive chunk size")
+
+def _chunks(iterable, size):
+	"""
+	Internal generator, yield lists of up to the given number of items from 
+	the given iterable
+	"""
+	iterator = iter(iterable)
+	while True:
+		chunk = list(itertools.islice(iterator, size))
+		if not chunk:
+			return
+		yield chunk
+
+def _parallel(tasks, processes):
+	"""
+	Internal generator, carry out the given (function, argument) tasks, each 
+	giving a list of results, in a pool of the given number of processes, and 
+	yield the results in order
+
+	Only a few tasks are taken from the given iterable ahead of the results 
+	being consumed.
+	"""
+	if processes == 1:
+		for function, argument in tasks:
+			for result in function(argument):
+				yield result
+		return
+	pool = multiprocessing.Pool(processes)
+	try:
+		window = 2 * (processes or multiprocessing.cpu_count())
+		pending = deque()
+		for function, argument in tasks:
+			pending.append(pool.apply_async(function, (argument,)))
+			if len(pending) >= window:
+				for result in pending.popleft().get():
+					yield result
+		while pending:
+			for result in pending.popleft().get():
+				yield result
+	finally:
+		# also stops any work left if the generator is abandoned
+		pool.terminate()
+		pool.join()
+
+def _hashchunk(args):
+	"""
+	Internal function, the work done by hash_parallel() on a chunk of strings
+	"""
+	strings, constraints, convert = args
+	colours = [_hashrgb(string, constraints) for string in strings]
+	if convert is None:
+		return colours
+	return [convert(rgb) for rgb in colours]
+
+def _convertchunk(args):
+	"""
+	Internal function, the work done by convert_parallel() on a chunk of inputs
+	"""
+	items, function, kwargs = args
+	return [function(item, **kwargs) for item in items]
+
+# distinct hash colours
+# ------------------------------------------------------------------------------
+
+class HashAssigner(object):
+	"""
+	Colours for a changing set of inputs, made as Colour.hash() makes them but 
+	kept apart from each other
+
+	Colour.hash() colours each input on its own, so two inputs shown together 
+	(two series on a chart, say) can get colours too alike to tell apart. An 
+	assigner gives each input added to it the colour Colour.hash() would, 
+	unless that is closer than threshold to the colour of an input already 
+	added, in which case it tries further colours made from the input in a 
+	fixed sequence and takes the first far enough from the rest. If none of 
+	the first few (the attempts argument) is, as happens when there are too 
+	many inputs for the threshold, the one furthest from its nearest 
+	neighbour is taken. An input keeps its colour until it is removed, 
+	however many others come and go.
+
+	Distances are Euclidean in the colour space named by the space argument, 
+	one of the keys of PALETTE_SPACES, so the threshold is in that space's 
+	units: by default CIELAB, where a difference of about 2.3 is just 
+	noticeable and of 10 is plain to see. The assigned colours are kept in a 
+	grid of cells of the threshold's size, so adding, finding and removing an 
+	input take constant time on average however many are assigned. Choose the 
+	threshold to suit how many inputs there are at once: with the default 
+	constraints, a threshold of 10 has room for about a hundred and one of 1 
+	for tens of thousands.
+
+	The other constraint arguments are as for Colour.hash(), and inputs are 
+	converted to strings in the same way. Which colour an input gets depends 
+	only on its string and on the colours already assigned, so adding the 
+	same inputs in the same order always gives the same colours. To carry 
+	colours over exactly whatever the order, save state(), a dictionary of 
+	plain strings and numbers which can be stored as JSON, and pass it as the 
+	state argument of the next assigner with the same settings.
+
+	An assigner acts as a container of the strings of its inputs.
+
+	Example:
+		assigner = HashAssigner(threshold=15)
+		for series in active:
+			plot(series, colour=assigner.colour(series.name).hex())
+		assigner.remove(old.name)
+	"""
+
+	def __init__(self, threshold=10.0, space="lab", attempts=16, state=None,
+			minh=None, maxh=None, mins=0.2, maxs=1.0, miny=0.3, maxy=0.7):
+		"""
+		Constructor
+		"""
+		if space not in PALETTE_SPACES:
+			raise ValueError("unknown colour space %r" % space)
+		if not threshold > 0:
+			raise ValueError("expected a positive threshold")
+		if attempts < 1:
+			raise ValueError("expected at least one attempt")
+		self.threshold = float(threshold)
+		self.space = space
+		self.attempts = attempts
+		self.__constraints = _hashconstraints(minh, maxh, mins, maxs, miny,
+				maxy)
+		self.__topoint = PALETTE_SPACES[space] or tuple
+		self.__assigned = {} # string: (attempt, rgb, point, cell)
+		self.__grid = {} # cell: list of points
+		if state is not None:
+			for string in sorted(state):
+				attempt = state[string]
+				if attempt < 0:
+					raise ValueError("expected non-negative attempt numbers")
+				self.__add(string, attempt, self.__candidate(string, attempt))
+
+	def rgb(self, tohash):
+		"""
+		Return the colour assigned to the given input as a 3-tuple of float RGB 
+		values in the range 0~1, assigning it one first if it has none
+		"""
+		string = str(tohash)
+		assigned = self.__assigned.get(string)
+		if assigned is not None:
+			return assigned[1]
+		best = None
+		for attempt in range(self.attempts):
+			rgb, point = self.__candidate(string, attempt)
+			nearest = self.__nearest(point, best and best[0])
+			if nearest is None:
+				return self.__add(string, attempt, (rgb, point))
+			if best is None or nearest > best[0]:
+				best = (nearest, attempt, (rgb, point))
+		return self.__add(string, best[1], best[2])
+
+	def colour(self, tohash):
+		"""
+		Return the colour assigned to the given input as a FrozenColour, 
+		assigning it one first if it has none
+		"""
+		return FrozenColour._fromrgb(self.rgb(tohash))
+
+	def rgb_many(self, iterable):
+		"""
+		Return the colours assigned to each of the given inputs, in order, as a 
+		list of 3-tuples of RGB values, assigning colours to those which have 
+		none
+		"""
+		return [self.rgb(x) for x in iterable]
+
+	def remove(self, tohash):
+		"""
+		Remove the given input, freeing its colour for others
+
+		Raise KeyError if it has no colour assigned.
+		"""
+		attempt, rgb, point, cell = self.__assigned.pop(str(tohash))
+		points = self.__grid[cell]
+		points.remove(point)
+		if not points:
+			del self.__grid[cell]
+
+	def discard(self, tohash):
+		"""Remove the given input if it has a colour assigned"""
+		if str(tohash) in self.__assigned:
+			self.remove(tohash)
+
+	def state(self):
+		"""
+		Return a dictionary mapping the strings of the inputs with colours 
+		assigned to the numbers of the attempts which made them, for the state 
+		argument of the constructor
+		"""
+		return dict((string, assigned[0]) \
+				for string, assigned in self.__assigned.items())
+
+	def __contains__(self, tohash):
+		"""Return True if the given input has a colour assigned"""
+		return str(tohash) in self.__assigned
+
+	def __len__(self):
+		"""Return the number of inputs with colours assigned"""
+		return len(self.__assigned)
+
+	def __iter__(self):
+		"""Iterate over the strings of the inputs with colours assigned"""
+		return iter(list(self.__assigned))
+
+	def __candidate(self, string, attempt):
+		"""
+		Internal method, return the RGB values of the given attempt at a colour 
+		for the given string and the point in the assigner's space
+
+		The first attempt is the colour Colour.hash() gives; later ones hash 
+		the string with the attempt number appended.
+		"""
+		if attempt:
+			string = "%s\0%d" % (string, attempt)
+		rgb = _hashrgb(string, self.__constraints)
+		return (rgb, tuple(self.__topoint(rgb)))
+
+	def __cell(self, point):
+		"""Internal method, return the grid cell containing the given point"""
+		threshold = self.threshold
+		return (int(math.floor(point[0] / threshold)),
+				int(math.floor(point[1] / threshold)),
+				int(math.floor(point[2] / threshold)))
+
+	def __nearest(self, point, floor=None):
+		"""
+		Internal method, return the distance to the nearest assigned colour 
+		closer than the threshold to the given point, or None if there is none
+
+		Any such colour is in the cell containing the point or one of the 26 
+		around it. These are searched nearest first, skipping those which are 
+		further from the point than the nearest colour found so far. If a floor 
+		is given the search stops at the first colour closer than it, whose 
+		distance is returned.
+		"""
+		grid = self.__grid
+		threshold = self.threshold
+		x, y, z = cell = self.__cell(point)
+		px, py, pz = point
+		# the squared distances from the point to the cells either side on 
+		# each axis, indexed by offset
+		gaps = []
+		for axis in range(3):
+			gap = point[axis] - cell[axis] * threshold
+			gaps.append((0.0, (threshold - gap) ** 2, gap * gap))
+		gx, gy, gz = gaps
+		nearest = threshold * threshold
+		floor = -1.0 if floor is None else floor * floor
+		found = False
+		for i, j, k in _NEIGHBOURS:
+			if gx[i] + gy[j] + gz[k] >= nearest:
+				continue
+			for other in grid.get((x + i, y + j, z + k), ()):
+				d = (other[0] - px) ** 2 + (other[1] - py) ** 2 \
+						+ (other[2] - pz) ** 2
+				if d < nearest:
+					nearest = d
+					found = True
+					if d < floor:
+						return math.sqrt(d)
+		return math.sqrt(nearest) if found else None
+
+	def __add(self, string, attempt, candidate):
+		"""
+		Internal method, assign the given candidate (RGB values and point) as 
+		the given attempt to the given string and return its RGB values
+		"""
+		rgb, point = candidate
+		cell = self.__cell(point)
+		self.__assigned[string] = (attempt, rgb, point, cell)
+		self.__grid.setdefault(cell, []).append(point)
+		return rgb
+
+# the offsets of a grid cell and the 26 cells around it, nearest first
+_NEIGHBOURS = sorted(itertools.product((-1, 0, 1), repeat=3),
+		key=lambda offset: sum(x * x for x in offset))
+
+# named colour lookup
+# ------------------------------------------------------------------------------
+
+class _KDTree(object):
+	"""
+	Internal class, a static k-d tree of three-dimensional points for nearest 
+	neighbour queries
+
+	Queries take logarithmic time on average in the number of points.
+	"""
+
+	def __init__(self, points):
+		self.points = [tuple(float(x) for x in point) for point in points]
+		self.root = self.__build(list(range(len(self.points))), 0)
+
+	def __build(self, indices, axis):
+		"""
+		Internal method, build a subtree from the points with the given indices 
+		and return its root node, a 4-tuple of (index, axis, left, right)
+		"""
+		if not indices:
+			return None
+		indices.sort(key=lambda i: self.points[i][axis])
+		median = len(indices) // 2
+		return (indices[median], axis,
+				self.__build(indices[:median], (axis + 1) % 3),
+				self.__build(indices[median + 1:], (axis + 1) % 3))
+
+	def nearest(self, point, k=1):
+		"""
+		Return a list of up to k 2-tuples of (distance, index) for the points 
+		closest to the given point, closest first
+
+		Ties are broken in favour of the lowest index.
+		"""
+		point = tuple(point)
+		best = [] # heap of (-squared distance, -index)
+		stack = [self.root]
+		while stack:
+			node = stack.pop()
+			if node is None:
+				continue
+			index, axis, left, right = node
+			candidate = self.points[index]
+			d = (candidate[0] - point[0]) ** 2 \
+					+ (candidate[1] - point[1]) ** 2 \
+					+ (candidate[2] - point[2]) ** 2
+			if len(best) < k:
+				heapq.heappush(best, (-d, -index))
+			elif (-d, -index) > best[0]:
+				heapq.heapreplace(best, (-d, -index))
+			diff = point[axis] - candidate[axis]
+			near, far = (left, right) if diff < 0 else (right, left)
+			# visit the near side first; only visit the far side if the 
+			# splitting plane is no further away than the current kth best
+			if len(best) < k or diff * diff <= -best[0][0]:
+				stack.append(far)
+			stack.append(near)
+		return [(math.sqrt(-d), -index) for d, index in sorted(best, reverse=True)]
+
+_css3index = None
+def _css3names():
+	"""
+	Internal function, return a dictionary mapping 3-tuples of RGB values in 
+	the range 0~255 to CSS3 colour names
+
+	Where several names share a colour the first in alphabetical order is used.
+	The dictionary is built on first use.
+	"""
+	global _css3index
+	if _css3index is None:
+		index = {}
+		for name in sorted(CSS3.keys()):
+			hex = CSS3[name]
+			index.setdefault(tuple(int(hex[x:x + 2], 16) for x in (0, 2, 4)),
+					name)
+		_css3index = index
+	return _css3index
+
+_css3kdtree = None
+def _css3tree():
+	"""
+	Internal function, return a _KDTree of the distinct CSS3 named colours in 
+	RGB space with channels in the range 0~1, with their names in its names 
+	attribute
+
+	The tree is built on first use.
+	"""
+	global _css3kdtree
+	if _css3kdtree is None:
+		items = sorted((name, rgb255) for rgb255, name in _css3names().items())
+		tree = _KDTree([tuple(x / 255.0 for x in rgb255) \
+				for name, rgb255 in items])
+		tree.names = [name for name, rgb255 in items]
+		_css3kdtree = tree
+	return _css3kdtree
+
+# colour differences
+# ------------------------------------------------------------------------------
+
+def distance(a, b, metric="rgb"):
+	"""
+	Return the distance between two colours, each a Colour object or anything 
+	the Colour constructor accepts
+
+	The metric is one of
+		rgb
+			Euclidean distance in the RGB colour cube with channels in the 
+			range 0~1 (as used by Colour.nearest_css3())
+		yiq
+			Euclidean distance in YIQ space, which weights luma differences more 
+			heavily than RGB does
+		cie76
+			Euclidean distance in CIELAB, taking RGB values to be sRGB with a 
+			D65 white point; a difference of about 2.3 is just noticeable
+		ciede2000
+			the CIEDE2000 colour difference, which corrects CIE76 for the 
+			ways in which CIELAB is perceptually uneven
+	"""
+	points = _distancepoints(metric)
+	if not isinstance(a, Colour):
+		a = Colour(a)
+	if not isinstance(b, Colour):
+		b = Colour(b)
+	p, q = points(a.rgb()), points(b.rgb())
+	if metric == "ciede2000":
+		return _ciede2000(p, q)
+	return math.sqrt((p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 \
+			+ (p[2] - q[2]) ** 2)
+
+def distance_many(colour, colours, metric="rgb"):
+	"""
+	Return the distances between one colour and each of many others
+
+	The colour argument is a Colour object or anything the Colour constructor 
+	accepts. The colours argument is an iterable of the same, in which case a 
+	list is returned, or a ColourArray or an (N, 3) numpy array of RGB values 
+	in the range 0~1, in which case the distances are worked out all at once 
+	and an array is returned. See distance() for the metrics.
+	"""
+	if isinstance(colours, ColourArray) or _isarray(colours):
+		if not isinstance(colour, Colour):
+			colour = Colour(colour)
+		return _distance_array(
+				_distancepoints_array(numpy.array(colour.rgb()), metric),
+				_distancepoints_array(_rgbrows(colours), metric), metric)
+	if not isinstance(colour, Colour):
+		colour = Colour(colour)
+	return [distance(colour, x, metric) for x in colours]
+
+def distance_matrix(colours, metric="rgb", blocksize=512, out=None,
+		dtype=float):
+	"""
+	Return the distances between every pair of the given colours as a 
+	condensed distance matrix (numpy is required)
+
+	The colours argument is a ColourArray, an (N, 3) numpy array of RGB values 
+	in the range 0~1 or an iterable of anything the Colour constructor 
+	accepts. See distance() for the metrics.
+
+	The result is a one-dimensional array of the N * (N - 1) / 2 distances, in 
+	the same layout as scipy.spatial.distance.pdist(): the distance between 
+	colours i and j, for i < j, is at index N * i - i * (i + 1) / 2 + j - i - 1.
+
+	Distances are worked out in square blocks of blocksize colours, so the 
+	memory needed beyond the result does not grow with N. The result is 
+	written to out if given, which can be a numpy.memmap for matrices too big 
+	for memory (50,000 colours make 1.25 billion distances); otherwise an 
+	array of the given dtype is made. For just the close pairs, see 
+	close_pairs().
+	"""
+	_requirenumpy()
+	points = _rgbrows(colours)
+	n = len(points)
+	size = n * (n - 1) // 2
+	if out is None:
+		out = numpy.empty(size, dtype=dtype)
+	elif out.shape != (size,):
+		raise ValueError("expected out to have shape (%d,)" % size)
+	for i, j, d in _distanceblocks(points, metric, blocksize):
+		out[n * i - i * (i + 1) // 2 + j - i - 1] = d
+	return out
+
+def close_pairs(colours, epsilon, metric="rgb", blocksize=512):
+	"""
+	Find the pairs of the given colours which are closer than epsilon (numpy 
+	is required)
+
+	The arguments are as for distance_matrix(), and distances are worked out 
+	in blocks in the same way, so only the pairs found are kept in memory.
+
+	Return a 3-tuple of arrays: the indices i and j of each pair, with i < j, 
+	and their distance. Pairs are in order of i then j.
+	"""
+	_requirenumpy()
+	points = _rgbrows(colours)
+	found = ([], [], [])
+	for i, j, d in _distanceblocks(points, metric, blocksize):
+		close = d < epsilon
+		if close.any():
+			found[0].append(i[close])
+			found[1].append(j[close])
+			found[2].append(d[close])
+	if not found[0]:
+		return (numpy.empty(0, dtype=int), numpy.empty(0, dtype=int),
+				numpy.empty(0))
+	i, j, d = [numpy.concatenate(x) for x in found]
+	order = numpy.lexsort((j, i))
+	return (i[order], j[order], d[order])
+
+def _distancepoints(metric):
+	"""
+	Internal function, return the function converting 3-tuples of RGB values 
+	to points in the space of the given metric
+	"""
+	try:
+		return _DISTANCEPOINTS[metric]
+	except KeyError:
+		raise ValueError("unknown distance metric %r" % metric)
+
+def _rgbrows(colours):
+	"""
+	Internal function, return an (N, 3) array of the RGB values of a 
+	ColourArray, an array of RGB values or an iterable of anything the Colour 
+	constructor accepts
+	"""
+	if isinstance(colours, ColourArray):
+		return colours.rgb()
+	if _isarray(colours):
+		rgb = numpy.asarray(colours, dtype=float).reshape(-1, 3)
+		if _outofrange(rgb, 0, 1):
+			raise ValueError("expected values in the range 0~1")
+		return rgb
+	return numpy.array([(x if isinstance(x, Colour) else Colour(x)).rgb() \
+			for x in colours], dtype=float).reshape(-1, 3)
+
+def _distancepoints_array(rgb, metric):
+	"""
+	Internal function, vectorized version of the functions returned by 
+	_distancepoints(), for an array of RGB values whose last axis has length 3
+	"""
+	_distancepoints(metric)
+	if metric == "yiq":
+		return _rgbtoyiq_array(rgb)
+	if metric in ("cie76", "ciede2000"):
+		return _rgbtolab_array(rgb)
+	return rgb
+
+def _distance_array(p, q, metric):
+	"""
+	Internal function, return the distances between arrays of points p and q 
+	in the space of the given metric, broadcast against each other, with the 
+	last axis of each having length 3
+	"""
+	if metric == "ciede2000":
+		return _ciede2000_array(p, q)
+	return numpy.sqrt(((p - q) ** 2).sum(axis=-1))
+
+def _distanceblocks(rgb, metric, blocksize):
+	"""
+	Internal function, generate the distances between each pair of rows i < j 
+	of an (N, 3) array of RGB values, in square blocks of up to blocksize rows 
+	by blocksize columns
+
+	Each block is generated as a 3-tuple of flat arrays of i, j and the 
+	distance. The points in the metric's space are worked out once up front.
+	"""
+	if blocksize < 1:
+		raise ValueError("expected a positive block size")
+	points = _distancepoints_array(rgb, metric)
+	n = len(points)
+	for start in range(0, n, blocksize):
+		stop = min(start + blocksize, n)
+		rows = numpy.arange(start, stop)
+		for first in range(start, n, blocksize):
+			last = min(first + blocksize, n)
+			i, j = numpy.meshgrid(rows, numpy.arange(first, last), indexing="ij")
+			d = _distance_array(points[start:stop, numpy.newaxis],
+					points[numpy.newaxis, first:last], metric)
+			if first == start:
+				upper = j > i
+				yield (i[upper], j[upper], d[upper])
+			else:
+				yield (i.reshape(-1), j.reshape(-1), d.reshape(-1))
+
+def _ciede2000(lab1, lab2):
+	"""
+	Internal function, return the CIEDE2000 colour difference between two 
+	3-tuples of CIELAB values
+
+	This follows Sharma, Wu and Dalal, "The CIEDE2000 color-difference 
+	formula: implementation notes, supplementary test data, and mathematical 
+	observations" (2005), with the parametric factors all 1.
+	"""
+	l1, a1, b1 = lab1
+	l2, a2, b2 = lab2
+	c7 = ((math.hypot(a1, b1) + math.hypot(a2, b2)) / 2.0) ** 7
+	g = 0.5 * (1.0 - math.sqrt(c7 / (c7 + 25.0 ** 7)))
+	a1 *= 1.0 + g
+	a2 *= 1.0 + g
+	c1 = math.hypot(a1, b1)
+	c2 = math.hypot(a2, b2)
+	h1 = math.degrees(math.atan2(b1, a1)) % 360.0 if b1 or a1 else 0.0
+	h2 = math.degrees(math.atan2(b2, a2)) % 360.0 if b2 or a2 else 0.0
+
+	dl = l2 - l1
+	dc = c2 - c1
+	if c1 * c2 == 0.0:
+		dh = 0.0
+		h = h1 + h2
+	else:
+		dh = h2 - h1
+		if dh > 180.0:
+			dh -= 360.0
+		elif dh < -180.0:
+			dh += 360.0
+		h = (h1 + h2) / 2.0
+		if abs(h1 - h2) > 180.0:
+			h += 180.0 if h < 180.0 else -180.0
+	dh = 2.0 * math.sqrt(c1 * c2) * math.sin(math.radians(dh / 2.0))
+
+	l = (l1 + l2) / 2.0 - 50.0
+	c = (c1 + c2) / 2.0
+	c7 = c ** 7
+	t = 1.0 - 0.17 * math.cos(math.radians(h - 30.0)) \
+			+ 0.24 * math.cos(math.radians(2.0 * h)) \
+			+ 0.32 * math.cos(math.radians(3.0 * h + 6.0)) \
+			- 0.20 * math.cos(math.radians(4.0 * h - 63.0))
+	sl = 1.0 + 0.015 * l * l / math.sqrt(20.0 + l * l)
+	sc = 1.0 + 0.045 * c
+	sh = 1.0 + 0.015 * c * t
+	rt = -2.0 * math.sqrt(c7 / (c7 + 25.0 ** 7)) \
+			* math.sin(math.radians(60.0 * math.exp(-((h - 275.0) / 25.0) ** 2)))
+	dl /= sl
+	dc /= sc
+	dh /= sh
+	return math.sqrt(dl * dl + dc * dc + dh * dh + rt * dc * dh)
+
+def _ciede2000_array(lab1, lab2):
+	"""
+	Internal function, vectorized version of _ciede2000() for arrays of CIELAB 
+	values, broadcast against each other, with the last axis of each having 
+	length 3
+	"""
+	l1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+	l2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+	c7 = ((numpy.hypot(a1, b1) + numpy.hypot(a2, b2)) / 2.0) ** 7
+	g = 0.5 * (1.0 - numpy.sqrt(c7 / (c7 + 25.0 ** 7)))
+	a1 = a1 * (1.0 + g)
+	a2 = a2 * (1.0 + g)
+	c1 = numpy.hypot(a1, b1)
+	c2 = numpy.hypot(a2, b2)
+	# atan2(0, 0) is 0, as wanted
+	h1 = numpy.degrees(numpy.arctan2(b1, a1)) % 360.0
+	h2 = numpy.degrees(numpy.arctan2(b2, a2)) % 360.0
+
+	dl = l2 - l1
+	dc = c2 - c1
+	grey = c1 * c2 == 0.0
+	dh = h2 - h1
+	dh = numpy.where(dh > 180.0, dh - 360.0,
+			numpy.where(dh < -180.0, dh + 360.0, dh))
+	dh = numpy.where(grey, 0.0, dh)
+	h = (h1 + h2) / 2.0
+	h = numpy.where(numpy.abs(h1 - h2) > 180.0,
+			numpy.where(h < 180.0, h + 180.0, h - 180.0), h)
+	h = numpy.where(grey, h1 + h2, h)
+	dh = 2.0 * numpy.sqrt(c1 * c2) * numpy.sin(numpy.radians(dh / 2.0))
+
+	l = (l1 + l2) / 2.0 - 50.0
+	c = (c1 + c2) / 2.0
+	c7 = c ** 7
+	t = 1.0 - 0.17 * numpy.cos(numpy.radians(h - 30.0)) \
+			+ 0.24 * numpy.cos(numpy.radians(2.0 * h)) \
+			+ 0.32 * numpy.cos(numpy.radians(3.0 * h + 6.0)) \
+			- 0.20 * numpy.cos(numpy.radians(4.0 * h - 63.0))
+	sl = 1.0 + 0.015 * l * l / numpy.sqrt(20.0 + l * l)
+	sc = 1.0 + 0.045 * c
+	sh = 1.0 + 0.015 * c * t
+	rt = -2.0 * numpy.sqrt(c7 / (c7 + 25.0 ** 7)) \
+			* numpy.sin(numpy.radians(60.0 * numpy.exp(-((h - 275.0) / 25.0) ** 2)))
+	dl = dl / sl
+	dc = dc / sc
+	dh = dh / sh
+	return numpy.sqrt(dl * dl + dc * dc + dh * dh + rt * dc * dh)
+
+# the distance metrics, mapped to functions converting 3-tuples of RGB values 
+# to points in their spaces
+_DISTANCEPOINTS = {
+		"rgb": tuple,
+		"yiq": rgbtoyiq,
+		"cie76": rgbtolab,
+		"ciede2000": rgbtolab,
+		}
+
+# palettes
+# ------------------------------------------------------------------------------
+
+class Palette(object):
+	"""
+	A fixed set of colours, indexed for finding the entries nearest to any 
+	colour
+
+	Distances are Euclidean in the colour space named by the space argument, 
+	one of the keys of PALETTE_SPACES:
+		rgb
+			the RGB colour cube, with channels in the range 0~1 (as used by 
+			Colour.nearest_css3())
+		yiq
+			YIQ space, where luma differences count for more than in RGB
+		lab
+			CIELAB, which is roughly perceptually uniform (so distances are 
+			those of the cie76 metric of distance())
+	The entries are held in a k-d tree in that space, so finding the nearest 
+	takes logarithmic time on average in the number of entries rather than 
+	linear.
+
+	A palette acts as a sequence of its entries, as FrozenColour objects. The 
+	names attribute is a list of their names, or None.
+
+	Examples:
+		brand = Palette(["#00263e", "#d50032", "#ffb81c", "white"],
+				names=["navy", "red", "gold", "white"])
+
+		# Snap a colour to the brand palette
+		print(brand.snap("#c01040"))
+
+		# The names of the three CSS3 colours closest to a colour, in YIQ
+		css3 = Palette.css3(space="yiq")
+		print([css3.names[i] for i, d in css3.nearest("#c01040", k=3)])
+	"""
+
+	def __init__(self, colours, names=None, space="rgb"):
+		"""
+		Constructor
+
+		The colours argument is a sequence of Colour objects or anything the 
+		Colour constructor accepts, or a ColourArray. The names argument, if 
+		given, is a sequence of the same length.
+		"""
+		if space not in PALETTE_SPACES:
+			raise ValueError("unknown colour space %r" % space)
+		self.entries = [FrozenColour(x) if not isinstance(x, FrozenColour) \
+				else x for x in colours]
+		if not self.entries:
+			raise ValueError("expected at least one colour")
+		if names is not None:
+			names = list(names)
+			if len(names) != len(self.entries):
+				raise ValueError("expected %d names" % len(self.entries))
+		self.names = names
+		self.space = space
+		self.__convert = PALETTE_SPACES[space]
+		self.__tree = _KDTree([self.__point(x.rgb()) for x in self.entries])
+
+	@classmethod
+	def css3(cls, space="rgb"):
+		"""
+		Return a palette of the distinct CSS3 named colours, in alphabetical 
+		order of name
+
+		Where several names share a colour (such as aqua and cyan) only the 
+		first in alphabetical order is included, as for Colour.css3().
+		"""
+		items = sorted((name, rgb255) for rgb255, name in _css3names().items())
+		return cls([Colour.from_rgb255(rgb255) for name, rgb255 in items],
+				names=[name for name, rgb255 in items], space=space)
+
+	def __len__(self):
+		"""Return the number of entries"""
+		return len(self.entries)
+
+	def __getitem__(self, index):
+		"""Return the entry with the given index"""
+		return self.entries[index]
+
+	def __iter__(self):
+		"""Iterate over the entries"""
+		return iter(self.entries)
+
+	def __point(self, rgb):
+		"""
+		Internal method, return the point in the palette's colour space of a 
+		3-tuple of RGB values
+		"""
+		return rgb if self.__convert is None else self.__convert(rgb)
+
+	def __query(self, rgb, k):
+		"""
+		Internal method, return what nearest() does for a 3-tuple of RGB 
+		values
+		"""
+		if k is None:
+			distance, index = self.__tree.nearest(self.__point(rgb))[0]
+			return (index, distance)
+		return [(index, distance) for distance, index \
+				in self.__tree.nearest(self.__point(rgb), k)]
+
+	def nearest(self, colour, k=None):
+		"""
+		Find the entry nearest to the given colour, a Colour object or anything 
+		the Colour constructor accepts
+
+		Return a 2-tuple of its index and its distance from the colour or, if k 
+		is given, a list of such 2-tuples for the k nearest entries (or all of 
+		them if there are fewer), nearest first. Ties are broken in favour of 
+		the lowest index.
+		"""
+		if k is not None and k < 1:
+			raise ValueError("expected a positive k")
+		if not isinstance(colour, Colour):
+			colour = Colour(colour)
+		return self.__query(colour.rgb(), k)
+
+	def nearest_many(self, colours, k=None):
+		"""
+		Find the entries nearest to each of the given colours
+
+		The colours argument is an iterable of anything nearest() accepts, in 
+		which case a list of what nearest() would return for each is returned, 
+		or a ColourArray or an (N, 3) numpy array of RGB values in the range 
+		0~1, in which case a 2-tuple is returned of an array of indices and an 
+		array of distances: of length N or, if k is given, of shape (N, k) 
+		(with k reduced to the number of entries if there are fewer).
+
+		Repeated colours are only looked up once.
+		"""
+		if k is not None and k < 1:
+			raise ValueError("expected a positive k")
+		if isinstance(colours, ColourArray) or _isarray(colours):
+			rgbs = colours.rgb() if isinstance(colours, ColourArray) \
+					else numpy.asarray(colours, dtype=float).reshape(-1, 3)
+			if _outofrange(rgbs, 0, 1):
+				raise ValueError("expected values in the range 0~1")
+			width = 1 if k is None else min(k, len(self))
+			indices = numpy.empty((len(rgbs), width), dtype=int)
+			distances = numpy.empty((len(rgbs), width))
+			results = {}
+			for x, rgb in enumerate(map(tuple, rgbs.tolist())):
+				result = results.get(rgb)
+				if result is None:
+					result = results[rgb] = self.__query(rgb, width)
+				indices[x] = [index for index, distance in result]
+				distances[x] = [distance for index, distance in result]
+			if k is None:
+				return (indices[:, 0], distances[:, 0])
+			return (indices, distances)
+
+		results = {}
+		output = []
+		for colour in colours:
+			if not isinstance(colour, Colour):
+				colour = Colour(colour)
+			rgb = colour.rgb()
+			result = results.get(rgb)
+			if result is None:
+				result = results[rgb] = self.__query(rgb, k)
+			output.append(result)
+		return output
+
+	def snap(self, colour):
+		"""
+		Return the entry nearest to the given colour, a Colour object or 
+		anything the Colour constructor accepts
+		"""
+		return self.entries[self.nearest(colour)[0]]
+
+# the colour spaces a Palette can measure distances in, mapped to functions 
+# converting 3-tuples of RGB values to points in them (or None for RGB itself)
+PALETTE_SPACES = {
+		"rgb": None,
+		"yiq": rgbtoyiq,
+		"lab": rgbtolab,
+		}
+
+# gradients
+# ------------------------------------------------------------------------------
+
+class Gradient(object):
+	"""
+	A gradient of colours through any number of stops
+
+	Positions along the gradient run from 0 to 1. The stops argument is a 
+	sequence of colours (Colour objects or anything the Colour constructor 
+	accepts), which are spread evenly from 0 to 1, or of 2-tuples of a 
+	position and a colour, with positions in the range 0~1 in non-decreasing 
+	order. Two stops at the same position make a sharp edge. Before the first 
+	stop and after the last the colour is that of the stop.
+
+	Between stops, colours are interpolated in a straight line in the colour 
+	space named by the space argument, one of the keys of GRADIENT_SPACES:
+		rgb
+			the RGB colour cube, as Colour.mix() does
+		hsv, hsl
+			HSV or HSL, with hue taking the shorter way round the colour 
+			wheel
+		yiq
+			YIQ
+		lab
+			CIELAB, which is roughly perceptually uniform, so that the 
+			colours change at an even rate to the eye
+		lch
+			LCh, which is as CIELAB but keeps chroma and hue changing evenly 
+			(taking the shorter way round), like HSV and HSL
+	In the spaces with a hue, a grey stop takes the hue of the stop at the 
+	other end of the segment, so fading to grey, white or black does not pass 
+	through other hues. Colours outside the RGB colour cube are clamped to it.
+
+	rgb() and colour() give the colour at one position. For many positions at 
+	once, rgb_many() works out each exactly, in one vectorized pass for a 
+	numpy array, and sample() gives evenly spaced colours as a ColourArray. 
+	lookup() instead picks the nearest of a table of evenly spaced colours, 
+	which is worked out once and kept, so repeated lookups, or lookups of very 
+	many positions, cost little more than indexing.
+
+	The stops attribute is a list of 2-tuples of position and FrozenColour.
+
+	Examples:
+		heat = Gradient(["black", "red", "yellow", "white"], space="lab")
+
+		# The colour half way along
+		print(heat.colour(0.5))
+
+		# Colour a grid of values in the range 0~1 (a numpy array of any 
+		# shape), giving an array of RGB values with one more axis
+		rgb = heat.lookup(values, size=1024)
+
+		# A sharp edge at 0.5
+		flag = Gradient([(0, "navy"), (0.5, "navy"), (0.5, "gold"),
+				(1, "gold")])
+	"""
+
+	def __init__(self, stops, space="rgb"):
+		"""
+		Constructor
+		"""
+		if space not in GRADIENT_SPACES:
+			raise ValueError("unknown colour space %r" % space)
+		stops = list(stops)
+		if not stops:
+			raise ValueError("expected at least one stop")
+		if all(_is_sequence(x) and not isinstance(x, Colour) and len(x) == 2 \
+				for x in stops):
+			positions = [float(x[0]) for x in stops]
+			colours = [x[1] for x in stops]
+		else:
+			positions = [x / float(len(stops) - 1) if len(stops) > 1 else 0.0 \
+					for x in range(len(stops))]
+			colours = stops
+		for x, position in enumerate(positions):
+			if position < 0 or position > 1:
+				raise ValueError("expected stop positions in the range 0~1")
+			if x and position < positions[x - 1]:
+				raise ValueError("expected stop positions in non-decreasing " \
+						+ "order")
+		colours = [x if isinstance(x, FrozenColour) else FrozenColour(x) \
+				for x in colours]
+		self.stops = list(zip(positions, colours))
+		self.space = space
+
+		tospace, self.__torgb, self.__torgb_array, hue = GRADIENT_SPACES[space]
+		points = [x.rgb() if tospace is None else tospace(x.rgb(), True) \
+				for x in colours]
+		if len(points) == 1:
+			positions = positions * 2
+			points = points * 2
+
+		# the ends of each segment, with hues adjusted to interpolate the 
+		# shorter way round
+		segments = []
+		for start, end in zip(points, points[1:]):
+			if hue is not None:
+				start = list(start)
+				end = list(end)
+				# a grey takes the hue of the other end (saturation or chroma 
+				# is the channel before the hue or, for HSV and HSL, after)
+				chroma = 1 if hue == 0 else hue - 1
+				if start[chroma] < _GREY:
+					start[hue] = end[hue]
+				elif end[chroma] < _GREY:
+					end[hue] = start[hue]
+				end[hue] = start[hue] \
+						+ (end[hue] - start[hue] + 180.0) % 360.0 - 180.0
+			segments.append((tuple(start), tuple(end)))
+		self.__positions = positions
+		self.__segments = segments
+		self.__tables = {}
+
+	def rgb(self, position):
+		"""
+		Return the colour at the given position as a 3-tuple of float RGB 
+		values in the range 0~1
+		"""
+		positions = self.__positions
+		last = len(positions) - 2
+		x = bisect.bisect_right(positions, position) - 1
+		x = 0 if x < 0 else last if x > last else x
+		width = positions[x + 1] - positions[x]
+		f = (position - positions[x]) / width if width > 0 else 1.0
+		f = 0.0 if f < 0.0 else 1.0 if f > 1.0 else f
+		start, end = self.__segments[x]
+		point = tuple(a + (b - a) * f for a, b in zip(start, end))
+		return point if self.__torgb is None else self.__torgb(point)
+
+	def colour(self, position):
+		"""Return the colour at the given position as a Colour object"""
+		return Colour._fromrgb(self.rgb(position))
+
+	def rgb_many(self, positions):
+		"""
+		Return the colours at many positions
+
+		The positions argument is an iterable of positions, in which case a 
+		list of what rgb() would return for each is returned, or a numpy array 
+		of positions of any shape, in which case the colours are worked out in 
+		one vectorized pass and returned as an array of RGB values with an 
+		extra axis of length 3 (so (N, 3) for N positions). Array results 
+		agree with rgb() to within ColourArray.TOLERANCE.
+		"""
+		if not _isarray(positions):
+			return [self.rgb(x) for x in positions]
+		positions = numpy.asarray(positions, dtype=float)
+		stops = numpy.array(self.__positions)
+		x = numpy.clip(numpy.searchsorted(stops, positions, side="right") - 1,
+				0, len(stops) - 2)
+		width = stops[x + 1] - stops[x]
+		f = numpy.clip((positions - stops[x]) / numpy.where(width > 0, width,
+				1.0), 0.0, 1.0)
+		f[width <= 0] = 1.0
+		starts = numpy.array([start for start, end in self.__segments])[x]
+		ends = numpy.array([end for start, end in self.__segments])[x]
+		points = starts + (ends - starts) * f[..., numpy.newaxis]
+		if self.__torgb_array is None:
+			return points
+		return self.__torgb_array(points)
+
+	def sample(self, count):
+		"""
+		Return a ColourArray of the given number of colours evenly spaced 
+		along the gradient, from 0 to 1 inclusive
+
+		numpy is required.
+		"""
+		_requirenumpy()
+		if count < 0:
+			raise ValueError("expected a non-negative count")
+		return ColourArray(rgb=self.rgb_many(numpy.linspace(0.0, 1.0,
+				count)).reshape(-1, 3))
+
+	def table(self, size=256, hex=False):
+		"""
+		Return a tuple of the given number of colours evenly spaced along the 
+		gradient, from 0 to 1 inclusive, as 3-tuples of RGB values or, if hex 
+		is True, as hex strings
+
+		Tables are worked out once for each size and kept.
+		"""
+		return self.__table(size, hex, False)
+
+	def lookup(self, positions, size=256, hex=False):
+		"""
+		Look up the colours at one or many positions in a table of evenly 
+		spaced colours (see table())
+
+		Each position gives the table entry nearest to it: within half of 
+		1 / (size - 1) of the position, so the table's size sets how closely 
+		the colours follow the gradient. The positions argument is a single 
+		position, in which case a 3-tuple of RGB values (or a hex string) is 
+		returned; a numpy array of any shape, in which case an array of RGB 
+		values with an extra axis of length 3 (or an array of hex strings of 
+		the same shape) is returned; or any other iterable, in which case a 
+		list is returned.
+		"""
+		last = size - 1
+		if _isarray(positions):
+			table = self.__table(size, hex, True)
+			x = numpy.clip(numpy.floor(numpy.asarray(positions, dtype=float) \
+					* last + 0.5), 0, last).astype(int)
+			return table[x]
+		table = self.__table(size, hex, False)
+		if not _is_sequence(positions):
+			x = int(math.floor(positions * last + 0.5))
+			return table[0 if x < 0 else last if x > last else x]
+		result = []
+		for position in positions:
+			x = int(math.floor(position * last + 0.5))
+			result.append(table[0 if x < 0 else last if x > last else x])
+		return result
+
+	def __table(self, size, hex, array):
+		"""
+		Internal method, return the table of the given size of RGB values (or 
+		hex strings), as a tuple or, if array is True, a numpy array
+		"""
+		key = (size, hex, array)
+		table = self.__tables.get(key)
+		if table is not None:
+			return table
+		if size < 2:
+			raise ValueError("expected a table size of at least 2")
+		if array:
+			table = numpy.array(self.__table(size, hex, False))
+			table.flags.writeable = False
+		else:
+			last = float(size - 1)
+			table = [self.rgb(x / last) for x in range(size)]
+			if hex:
+				table = rgbtohex_many(table)
+			table = tuple(table)
+		self.__tables[key] = table
+		return table
+
+def _hsvtorgb(hsv):
+	"""Internal function, hsvtorgb() without the checks"""
+	return _hsxtorgb(False, hsv, True)
+
+def _hsltorgb(hsl):
+	"""Internal function, hsltorgb() without the checks"""
+	return _hsxtorgb(True, hsl, True)
+
+def _yiqtorgb(yiq):
+	"""Internal function, yiqtorgb() without the checks"""
+	return yiqtorgb(yiq, True)
+
+def _hsvtorgb_array(hsv):
+	"""
+	Internal function, vectorized version of hsvtorgb() without range checks, 
+	for an array of HSV values whose last axis has length 3
+	"""
+	return _hsxtorgb_array(False, hsv.reshape(-1, 3)).reshape(hsv.shape)
+
+def _hsltorgb_array(hsl):
+	"""
+	Internal function, vectorized version of hsltorgb() without range checks, 
+	for an array of HSL values whose last axis has length 3
+	"""
+	return _hsxtorgb_array(True, hsl.reshape(-1, 3)).reshape(hsl.shape)
+
+# the colour spaces a Gradient can interpolate in, mapped to 4-tuples of 
+# functions converting a 3-tuple of RGB values to the space and back and an 
+# array of values back (or None for RGB itself), and the index of the hue 
+# channel (or None)
+GRADIENT_SPACES = {
+		"rgb": (None, None, None, None),
+		"hsv": (rgbtohsv, _hsvtorgb, _hsvtorgb_array, 0),
+		"hsl": (rgbtohsl, _hsltorgb, _hsltorgb_array, 0),
+		"yiq": (rgbtoyiq, _yiqtorgb, _yiqtorgb_array, None),
+		"lab": (rgbtolab, _labtorgb, _labtorgb_array, None),
+		"lch": (rgbtolch, _lchtorgb, _lchtorgb_array, 2),
+		}
+
+# the saturation or chroma below which a gradient stop counts as grey (the LCh 
+# chroma of greys is only zero to within rounding error)
+_GREY = 1e-9
+
+# input checking
+# ------------------------------------------------------------------------------
+
+def _validhex(string):
+	"""
+	Return True if the given string is a valid hexadecimal representation of an 
+	RGB colour
+
+	Accepts strings of three or six case-insensitive hexadecimal digits, with or 
+	without a leading hash.
+	"""
+	if not isinstance(string, string_types):
+		return False
+	return _regex(_HEXRE).match(string) is not None
+
+_HEXRE = "(?i)^#?([0-9a-f]{3}){1,2}$"
+
+def _regex(pattern):
+	"""
+	Internal function, return the given regular expression compiled, compiling 
+	it only the first time it is needed
+	"""
+	try:
+		return _REGEXES[pattern]
+	except KeyError:
+		compiled = _REGEXES[pattern] = re.compile(pattern)
+		return compiled
+
+# the regular expressions compiled so far by _regex()
+_REGEXES = {}
+
+def _is_numeric(f):
+	"""Return True if the argument is of a numeric type"""
 	return isinstance(f, int, long, float, complex)
 
 def _is_sequence(arg):
@@ -1181,6 +6479,75 @@ def _is_sequence(arg):
 	return not hasattr(arg, 'strip') and \
 			(hasattr(arg, '__getitem__') or hasattr(arg, '__iter__'))
 
+# trusted mode
+# ------------------------------------------------------------------------------
+
+class _TrustState(_thread._local):
+	"""
+	Internal class, whether input checks are currently skipped
+
+	The class attribute is the module-wide setting made by set_trusted(); 
+	trusted() overrides it for the current thread only by setting the instance 
+	attribute. The saved attribute is the current thread's stack of the 
+	overrides replaced by the trusted() blocks it is inside.
+	"""
+	trusted = False
+
+	def __init__(self):
+		self.saved = []
+
+_trust = _TrustState()
+
+def set_trusted(trusted=True):
+	"""
+	Switch trusted mode on or off for the whole module
+
+	In trusted mode the methods of Colour objects and the conversion functions 
+	skip the checks they normally make on their arguments' lengths and ranges. 
+	This saves time where values are already known to be valid, but invalid 
+	values then give wrong results or unexpected exceptions rather than a 
+	ValueError. Other input, such as hex strings and CSS3 names, is still 
+	checked.
+
+	Trusted mode is off by default. It can also be switched on for one thread 
+	with trusted(), or for one call with the trusted argument of the 
+	conversion functions and of Colour's rgb(), hsv(), hsl(), yiq() and from_ 
+	methods.
+	"""
+	_TrustState.trusted = bool(trusted)
+
+def trusted(trusted=True):
+	"""
+	Return a context manager which switches trusted mode on (or, given False, 
+	off) in the current thread for the duration of a with block
+
+	See set_trusted() for what trusted mode does.
+
+	Example:
+		with colour.trusted():
+			colours = [Colour.from_rgb(row) for row in validated_rows]
+	"""
+	return _TrustedBlock(trusted)
+
+class _TrustedBlock(object):
+	"""
+	Internal class, the context manager returned by trusted()
+	"""
+
+	def __init__(self, trusted):
+		self.trusted = bool(trusted)
+
+	def __enter__(self):
+		_trust.saved.append(_trust.__dict__.get("trusted"))
+		_trust.trusted = self.trusted
+
+	def __exit__(self, *exc):
+		previous = _trust.saved.pop()
+		if previous is None:
+			del _trust.trusted
+		else:
+			_trust.trusted = previous
+
 # CSS3 colours (from <http://www.w3.org/TR/css3-color/#svg-color>)
 # ------------------------------------------------------------------------------
 CSS3 = {
@@ -0,0 +1,457 @@
+"""
+colourd
+https://github.com/tremby/py-colour
+licensed under the Gnu GPL version 3
+
+A small colour service built on the colour module: an asyncio server which
+answers hash, conversion and CSS3 naming requests for any number of local
+clients, and an asyncio client for it. Needs Python 3.7 or later and nothing
+outside the standard library apart from the colour module itself.
+
+The server listens on a Unix socket or a TCP port on localhost. Requests
+arriving within a short window of each other (2ms by default) are answered as
+one batch: identical requests are worked out only once, hash requests with the
+same constraints go through colour.hash_many() together, and the work is done
+in a thread so the server keeps accepting requests meanwhile. Results are kept
+in a cache shared by all clients.
+
+Examples:
+	# Run a server
+	python colourd.py --unix /tmp/colourd.sock
+
+	# Use it
+	import asyncio
+	import colourd
+
+	async def main():
+		client = await colourd.connect(path="/tmp/colourd.sock")
+		print(await client.hash("user-42"))
+		print(await client.css3("#daa520"))
+		print(await client.convert("rgbtohsv", (0.2, 0.8, 0)))
+		await client.close()
+
+	asyncio.run(main())
+
+Protocol
+--------
+
+Clients and server exchange JSON objects, one per line. A request is
+	{"id": n, "op": name, "params": {...}}
+and its response is
+	{"id": n, "result": value}
+or, if the request could not be carried out,
+	{"id": n, "error": message}
+Responses can arrive in a different order from their requests.
+
+The operations are
+	hash
+		params "key" (converted to a string) and optionally any of the
+		constraint arguments of Colour.hash(); result the hex string of
+		Colour(hash=key) with those constraints
+	css3
+		params "colour", anything accepted by the Colour constructor (with
+		lists standing for tuples); result the CSS3 name of the colour or null
+	nearest_css3
+		params as for css3; result a list of the name of the nearest CSS3
+		colour and its distance
+	convert
+		params "function", the name of one of the module's conversion
+		functions (see CONVERSIONS), "value", its argument, and optionally
+		"options", a dictionary of keyword arguments; result as the function
+		returns it, with tuples as lists
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+import colour
+
+# the conversion functions the convert operation may use
+CONVERSIONS = frozenset([
+		"rgbtohsv", "rgbtohsl", "rgbtoyiq",
+		"hsvtorgb", "hsltorgb", "yiqtorgb",
+		"rgbtohex", "hextorgb",
+		"setluma",
+		])
+
+# the constraint arguments of Colour.hash()
+_HASHCONSTRAINTS = ("minh", "maxh", "mins", "maxs", "miny", "maxy")
+
+# stands for a missing cache entry, since None is a valid result
+_MISSING = object()
+
+# server
+# ------------------------------------------------------------------------------
+
+class Server(object):
+	"""
+	The colour service
+
+	Batches are answered when window seconds have passed since the first
+	request in them arrived or they reach maxbatch distinct requests,
+	whichever comes first. Up to cachesize results are remembered.
+
+	The hits, batches and computed attributes count requests answered from
+	the cache or by joining an identical request already waiting, batches
+	worked out, and distinct requests worked out.
+	"""
+
+	def __init__(self, window=0.002, maxbatch=1024, cachesize=65536):
+		"""Constructor"""
+		self.window = window
+		self.maxbatch = maxbatch
+		self.cache = colour.LRUCache(cachesize)
+		self.hits = 0
+		self.batches = 0
+		self.computed = 0
+		self.__pending = {}
+		self.__batch = []
+		self.__timer = None
+
+	async def serve(self, path=None, host="127.0.0.1", port=7047):
+		"""
+		Listen on the Unix socket at the given path or, if no path is given,
+		the given TCP host and port, and serve until cancelled
+		"""
+		if path is not None:
+			server = await asyncio.start_unix_server(self.handle, path=path)
+		else:
+			server = await asyncio.start_server(self.handle, host=host,
+					port=port)
+		async with server:
+			await server.serve_forever()
+
+	async def handle(self, reader, writer):
+		"""
+		Serve one client connection, answering its requests concurrently
+		"""
+		tasks = set()
+		try:
+			while True:
+				line = await reader.readline()
+				if not line:
+					break
+				task = asyncio.ensure_future(self.__respond(line, writer))
+				tasks.add(task)
+				task.add_done_callback(tasks.discard)
+			if tasks:
+				await asyncio.wait(tasks)
+		finally:
+			writer.close()
+
+	async def __respond(self, line, writer):
+		"""
+		Internal method, answer a single request line
+		"""
+		id = None
+		try:
+			message = json.loads(line)
+			if not isinstance(message, dict):
+				raise TypeError("expected a request object")
+			id = message.get("id")
+			result = await self.request(message["op"],
+					message.get("params", {}))
+			response = {"id": id, "result": result}
+		except KeyError as e:
+			response = {"id": id, "error": "missing parameter %s" % e}
+		except (ValueError, TypeError) as e:
+			response = {"id": id, "error": str(e) or e.__class__.__name__}
+		except Exception as e:
+			# anything else still gets a reply, so no client is left waiting
+			response = {"id": id, "error": "%s: %s" % (e.__class__.__name__,
+					e)}
+		writer.write(json.dumps(response).encode("utf-8") + b"\n")
+		await writer.drain()
+
+	def request(self, op, params):
+		"""
+		Return an awaitable giving the result of the given operation (see the
+		module documentation)
+
+		This is how requests from clients are answered, and can also be used
+		directly.
+		"""
+		if op not in _OPERATIONS:
+			raise ValueError("unknown operation %r" % op)
+		if not isinstance(params, dict):
+			raise TypeError("expected params to be an object")
+		loop = asyncio.get_event_loop()
+		key = (op, json.dumps(params, sort_keys=True))
+
+		result = self.cache.get(key, _MISSING)
+		if result is not _MISSING:
+			self.hits += 1
+			future = loop.create_future()
+			future.set_result(result)
+			return future
+
+		future = self.__pending.get(key)
+		if future is not None:
+			self.hits += 1
+			return future
+
+		future = self.__pending[key] = loop.create_future()
+		self.__batch.append((key, op, params))
+		if len(self.__batch) >= self.maxbatch:
+			self.__flush()
+		elif self.__timer is None:
+			self.__timer = loop.call_later(self.window, self.__flush)
+		return future
+
+	def __flush(self):
+		"""
+		Internal method, start working out the waiting batch
+		"""
+		if self.__timer is not None:
+			self.__timer.cancel()
+			self.__timer = None
+		batch, self.__batch = self.__batch, []
+		if batch:
+			asyncio.ensure_future(self.__run(batch))
+
+	async def __run(self, batch):
+		"""
+		Internal method, work out a batch in a thread and deliver its results
+		"""
+		loop = asyncio.get_event_loop()
+		self.batches += 1
+		self.computed += len(batch)
+		try:
+			results = await loop.run_in_executor(None, _compute,
+					[(op, params) for key, op, params in batch])
+		except Exception as e:
+			results = [(False, e)] * len(batch)
+		for (key, op, params), (ok, value) in zip(batch, results):
+			future = self.__pending.pop(key)
+			if ok:
+				self.cache.put(key, value)
+				future.set_result(value)
+			else:
+				future.set_exception(value)
+
+def _compute(batch):
+	"""
+	Internal function, work out a batch of distinct requests
+
+	Return a list of 2-tuples, one per request, of True and the result or
+	False and the exception raised.
+	"""
+	results = [None] * len(batch)
+
+	# hash requests with the same constraints are made together
+	groups = {}
+	for index, (op, params) in enumerate(batch):
+		if op != "hash":
+			results[index] = _attempt(_OPERATIONS[op], params)
+			continue
+		try:
+			key = str(params["key"])
+			if set(params) - set(_HASHCONSTRAINTS) - set(["key"]):
+				raise ValueError("unexpected hash parameters")
+			for name in _HASHCONSTRAINTS:
+				value = params.get(name)
+				if value is not None and (isinstance(value, bool) \
+						or not isinstance(value, (int, float))):
+					raise TypeError("expected %s to be a number" % name)
+			constraints = tuple((name, params[name]) \
+					for name in _HASHCONSTRAINTS if name in params)
+			groups.setdefault(constraints, []).append((index, key))
+		except Exception as e:
+			results[index] = (False, e)
+	for constraints, members in groups.items():
+		try:
+			colours = colour.hash_many([key for index, key in members],
+					**dict(constraints))
+			hexes = colour.rgbtohex_many(colours)
+		except Exception as e:
+			for index, key in members:
+				results[index] = (False, e)
+			continue
+		for (index, key), hex in zip(members, hexes):
+			results[index] = (True, hex)
+	return results
+
+def _attempt(function, params):
+	"""
+	Internal function, return (True, function(params)) or, if the function
+	raises an error, (False, the exception)
+	"""
+	try:
+		return (True, function(params))
+	except Exception as e:
+		return (False, e)
+
+def _colour(params):
+	"""
+	Internal function, return the Colour described by a request's "colour"
+	parameter
+	"""
+	value = params["colour"]
+	if isinstance(value, list):
+		value = tuple(value)
+	return colour.Colour(value)
+
+def _convert(params):
+	"""Internal function, carry out a convert request"""
+	name = params["function"]
+	if name not in CONVERSIONS:
+		raise ValueError("unknown conversion function %r" % name)
+	value = params["value"]
+	if isinstance(value, list):
+		value = tuple(value)
+	return getattr(colour, name)(value, **params.get("options", {}))
+
+# the operations other than hash, which is handled specially in _compute()
+_OPERATIONS = {
+		"hash": None,
+		"css3": lambda params: _colour(params).css3(),
+		"nearest_css3": lambda params: list(_colour(params).nearest_css3()),
+		"convert": _convert,
+		}
+
+# client
+# ------------------------------------------------------------------------------
+
+async def connect(path=None, host="127.0.0.1", port=7047):
+	"""
+	Connect to a server on the Unix socket at the given path or, if no path is
+	given, at the given TCP host and port, and return a Client
+	"""
+	if path is not None:
+		reader, writer = await asyncio.open_unix_connection(path)
+	else:
+		reader, writer = await asyncio.open_connection(host, port)
+	return Client(reader, writer)
+
+class Client(object):
+	"""
+	A connection to a colour server, made with connect()
+
+	Any number of requests can be in progress at once. Errors reported by the
+	server are raised as ValueErrors.
+	"""
+
+	def __init__(self, reader, writer):
+		"""
+		Constructor
+
+		Arguments are the stream reader and writer of a connection to a server.
+		"""
+		self.__reader = reader
+		self.__writer = writer
+		self.__ids = 0
+		self.__waiting = {}
+		self.__receiver = asyncio.ensure_future(self.__receive())
+
+	async def __receive(self):
+		"""
+		Internal method, pass responses from the server to their requests
+		"""
+		try:
+			while True:
+				line = await self.__reader.readline()
+				if not line:
+					break
+				response = json.loads(line)
+				future = self.__waiting.pop(response["id"], None)
+				if future is None or future.done():
+					continue
+				if "error" in response:
+					future.set_exception(ValueError(response["error"]))
+				else:
+					future.set_result(response["result"])
+		finally:
+			for future in self.__waiting.values():
+				if not future.done():
+					future.set_exception(ConnectionError(
+							"connection to colour server closed"))
+			self.__waiting.clear()
+
+	async def request(self, op, params):
+		"""
+		Send a request to the server and return its result (see the module
+		documentation for the operations)
+		"""
+		if self.__receiver.done():
+			raise ConnectionError("connection to colour server closed")
+		self.__ids += 1
+		id = self.__ids
+		future = self.__waiting[id] = asyncio.get_event_loop().create_future()
+		self.__writer.write(json.dumps({"id": id, "op": op,
+				"params": params}).encode("utf-8") + b"\n")
+		await self.__writer.drain()
+		return await future
+
+	async def hash(self, key, **constraints):
+		"""
+		Return the hex string of Colour(hash=key), with any constraint
+		arguments of Colour.hash() given
+		"""
+		params = dict(constraints)
+		params["key"] = str(key)
+		return await self.request("hash", params)
+
+	async def css3(self, value):
+		"""
+		Return the CSS3 name of the colour made by Colour(value), or None
+		"""
+		return await self.request("css3", {"colour": value})
+
+	async def nearest_css3(self, value):
+		"""
+		Return a 2-tuple of the name of the nearest CSS3 named colour to
+		Colour(value) and its distance
+		"""
+		return tuple(await self.request("nearest_css3", {"colour": value}))
+
+	async def convert(self, function, value, **options):
+		"""
+		Return the result of the named conversion function (see CONVERSIONS)
+		given the value and any keyword arguments, with lists converted to
+		tuples
+		"""
+		params = {"function": function, "value": value}
+		if options:
+			params["options"] = options
+		result = await self.request("convert", params)
+		return tuple(result) if isinstance(result, list) else result
+
+	async def close(self):
+		"""Close the connection"""
+		self.__writer.close()
+		await self.__receiver
+
+# command line
+# ------------------------------------------------------------------------------
+
+def main():
+	parser = argparse.ArgumentParser(description="Run a colour server")
+	parser.add_argument("--unix", metavar="PATH",
+			help="listen on a Unix socket at this path")
+	parser.add_argument("--host", default="127.0.0.1",
+			help="TCP host to listen on if not using a Unix socket "
+				"(default 127.0.0.1)")
+	parser.add_argument("--port", type=int, default=7047,
+			help="TCP port to listen on (default 7047)")
+	parser.add_argument("--window", type=float, default=0.002,
+			help="seconds to wait for more requests before answering a batch "
+				"(default 0.002)")
+	parser.add_argument("--maxbatch", type=int, default=1024,
+			help="most distinct requests in a batch (default 1024)")
+	parser.add_argument("--cachesize", type=int, default=65536,
+			help="most results to remember (default 65536)")
+	args = parser.parse_args()
+
+	server = Server(window=args.window, maxbatch=args.maxbatch,
+			cachesize=args.cachesize)
+	try:
+		asyncio.run(server.serve(path=args.unix, host=args.host,
+				port=args.port))
+	except KeyboardInterrupt:
+		pass
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -1,14 +1,38 @@
 #!/usr/bin/env python
 
 from distutils.core import setup
-import colour
-
-setup(name=colour.NAME,
-		version=colour.VERSION,
-		description=colour.DESCRIPTION,
-		author=colour.AUTHOR,
-		author_email=colour.AUTHOR_EMAIL,
-		url=colour.URL,
-		license=colour.LICENSE,
-		py_modules=["colour"],
+import ast
+import os
+import re
+import sys
+
+def metadata():
+	"""
+	Read the metadata constants (NAME, VERSION and so on) from colour.py
+	without importing it
+	"""
+	values = {}
+	path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "colour.py")
+	with open(path) as f:
+		for line in f:
+			match = re.match(r"^([A-Z_]+) = (\".*\")\s*$", line)
+			if match:
+				values[match.group(1)] = ast.literal_eval(match.group(2))
+	return values
+
+meta = metadata()
+
+# the colour service needs asyncio features from Python 3.7
+modules = ["colour"]
+if sys.version_info >= (3, 7):
+	modules.append("colourd")
+
+setup(name=meta["NAME"],
+		version=meta["VERSION"],
+		description=meta["DESCRIPTION"],
+		author=meta["AUTHOR"],
+		author_email=meta["AUTHOR_EMAIL"],
+		url=meta["URL"],
+		license=meta["LICENSE"],
+		py_modules=modules,
 		)
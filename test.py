@@ -5,6 +5,9 @@ import colour
 import cgi
 import sys
 
+if sys.version_info >= (3, 7):
+	import colourd
+
 def head(title, level=2):
 	print("<h%s>%s</h%s>\n" % (level, title, level))
 
@@ -140,6 +143,17 @@ def main():
 	test("Colour().yiq((45, -1, 0.5), ymin=40, ymax=60).swatch()")
 	test("Colour(\"goldenrod\").yiq()")
 
+	head("xyz/lab/lch")
+
+	test("Colour().xyz((0.2, 0.3, 0.1)).swatch()")
+	test("Colour().lab((60, 40, -50)).swatch()")
+	test("Colour(\"goldenrod\").lab((30, None, None)).swatch()")
+	test("Colour().lch((70, 50, 140)).swatch()")
+	test("Colour(\"goldenrod\").lch((None, None, 200)).swatch()")
+	test("Colour(\"goldenrod\").xyz()")
+	test("Colour(\"goldenrod\").lab()")
+	test("Colour(\"goldenrod\").lch()")
+
 	head("hex")
 
 	test("Colour().hex(\"abc\").swatch()")
@@ -160,6 +174,9 @@ def main():
 	test("Colour().css3(\"wheat\").swatch()")
 	test("Colour((0.8, 1, 0.1)).css3()")
 	test("Colour(\"daa520\").css3()")
+	test("Colour(\"daa520\").nearest_css3()")
+	test("Colour(\"#123456\").nearest_css3()")
+	test("Colour((0.8, 1, 0.1)).nearest_css3()")
 
 	head("grey")
 
@@ -180,6 +197,10 @@ def main():
 		test("Colour().hash(\"%s\", miny=0, maxy=0.2).swatch()" % x)
 	for x in ["1", "9.22", "\"blah\"", "None", "Colour(\"goldenrod\")", "Colour(\"red\")", "[2, 3, 3]"]:
 		test("Colour().hash(%s).swatch()" % x)
+	test("colour.rgbtohex_many(colour.hash_many([\"tremby\", \"yappy\", \"mon\", \"bill\"]))")
+	test("colour.rgbtohex_many(colour.hash_many([\"tremby\", \"yappy\", \"mon\", \"bill\"], minh=-15, maxh=15))")
+	test("list(colour.hash_parallel([\"tremby\", \"yappy\", \"mon\", \"bill\"], convert=colour.rgbtohex, processes=2, chunksize=2))")
+	test("list(colour.convert_parallel(colour.rgbtohsv, [(0.2, 0.8, 0), (1, 0.5, 0)], processes=2))")
 
 	head("hue methods")
 
@@ -267,12 +288,96 @@ def main():
 	for x in range(8):
 		test("Colour(\"goldenrod\").mix(Colour(\"darkblue\"), %f).swatch()" % (x / 7.0))
 
+	head("sequences")
+
+	head("hue_cycle", 3)
+	for x in colour.hue_cycle(Colour(hsv=(0, 0.8, 0.6)), 30, 12):
+		test("Colour(%r).swatch()" % (x,))
+	for x in colour.hue_cycle(Colour(hsv=(0, 0.8, 0.6)), 30, 12, perceptual=True, hex=True):
+		test("Colour(%r).swatch()" % x)
+
+	head("luma_ramp", 3)
+	for x in colour.luma_ramp("goldenrod", 8, start=0.1, stop=0.9, hex=True):
+		test("Colour(%r).swatch()" % x)
+
+	head("saturation_ramp", 3)
+	for x in colour.saturation_ramp("goldenrod", 8, hex=True):
+		test("Colour(%r).swatch()" % x)
+	for x in colour.saturation_ramp("goldenrod", 8, hsl=True, perceptual=True, hex=True):
+		test("Colour(%r).swatch()" % x)
+
 	head("swatch")
 
 	test("Colour(\"goldenrod\").swatch()")
 	test("Colour(\"goldenrod\").swatch(showhex=False)")
 	test("Colour(\"goldenrod\").swatch(cssclass=\"reallybig\")")
 
+	head("SwatchWriter", 3)
+	colour.SwatchWriter(sys.stdout).writemany(colour.hue_cycle("goldenrod", count=6)).close()
+	print("<br>")
+	colour.SwatchWriter(sys.stdout, cssclass="reallybig", classes=True).writemany(["goldenrod", "navy", "goldenrod"]).close()
+	print("<br>")
+
+	head("factory methods")
+	test("Colour.from_rgb((0.2, 0.8, 0)).swatch()")
+	test("Colour.from_rgb255((218, 165, 32)).swatch()")
+	test("Colour.from_hsv((88, 0.8, 0.4)).swatch()")
+	test("Colour.from_hsl((88, 0.8, 0.4)).swatch()")
+	test("Colour.from_yiq((0.7, -0.2, 0.1)).swatch()")
+	test("Colour.from_hex(\"#342\").swatch()")
+	test("Colour.from_css3(\"goldenrod\").swatch()")
+	test("colour.FrozenColour.from_css3(\"goldenrod\") == colour.FrozenColour(\"goldenrod\")")
+
+	head("FrozenColour")
+	test("colour.FrozenColour(\"goldenrod\").swatch()")
+	test("colour.FrozenColour(\"goldenrod\").hsv()")
+	test("colour.FrozenColour(\"goldenrod\") == colour.FrozenColour(\"#daa520\")")
+	test("len(set([colour.FrozenColour(\"aqua\"), colour.FrozenColour(\"cyan\")]))")
+	test("Colour(colour.FrozenColour(\"goldenrod\")).shiftluma(-0.5).swatch()")
+
+	head("Transform")
+	test("colour.Transform().shiftluma(0.2).shifthue(30, perceptual=True).operations")
+	test("colour.Transform().shiftluma(0.2).shifthue(30, perceptual=True)(Colour(\"goldenrod\")).swatch()")
+	test("colour.Transform().saturation_hsv(0.5).mix(\"red\", 0.2).apply_rgb255((218, 165, 32))")
+	test("colour.Transform().mix(\"red\", 0.2).shiftintensity(0.3).shiftluma(-0.4).mix(\"navy\", 0.1)(Colour(\"goldenrod\")).swatch()")
+	test("Colour(\"goldenrod\").mix(\"red\", 0.2).shiftintensity(0.3).shiftluma(-0.4).mix(\"navy\", 0.1).swatch()")
+
+	head("LUT")
+	test("colour.LUT(colour.Transform().shiftluma(0.2).mix(\"red\", 0.2), size=9, processes=1)(Colour(\"goldenrod\")).swatch()")
+	test("colour.LUT(colour.Transform().shiftluma(0.2).mix(\"red\", 0.2), size=9, processes=1).apply_rgb255((218, 165, 32))")
+	test("colour.Transform().shiftluma(0.2).mix(\"red\", 0.2).apply_rgb255((218, 165, 32))")
+	test("colour.LUT(colour.Transform().shiftluma(0.2).mix(\"red\", 0.2), size=9, processes=1)(colour.ColourArray([\"goldenrod\", \"slateblue\"])).hex()")
+	test("colour.LUT(colour.Transform().shiftluma(0.2).mix(\"red\", 0.2), size=9, processes=1).apply_rgb255_many([(218, 165, 32), (106, 90, 205)])")
+
+	head("distances")
+	for m in ["rgb", "yiq", "cie76", "ciede2000"]:
+		test("colour.distance(\"goldenrod\", \"darkgoldenrod\", metric=%r)" % m)
+	test("colour.distance_many(\"red\", [\"red\", \"crimson\", \"blue\"], metric=\"ciede2000\")")
+	test("colour.distance_matrix(colour.ColourArray(css3=[\"red\", \"crimson\", \"blue\", \"navy\"]), metric=\"cie76\").round(3)")
+	test("colour.close_pairs(colour.ColourArray(css3=[\"red\", \"crimson\", \"blue\", \"navy\"]), 15, metric=\"ciede2000\")")
+
+	head("HashAssigner")
+	test("[Colour().hash(\"series%d\" % x).hex() for x in range(8)]")
+	test("colour.HashAssigner(threshold=20).rgb_many(\"series%d\" % x for x in range(8)) == colour.hash_many(\"series%d\" % x for x in range(8))")
+	test("[colour.rgbtohex(x) for x in colour.HashAssigner(threshold=20).rgb_many(\"series%d\" % x for x in range(8))]")
+	test("sorted(colour.HashAssigner(threshold=20, state={\"series0\": 0, \"series5\": 2}).state().items())")
+	test("colour.HashAssigner(threshold=20, state={\"series0\": 0, \"series5\": 2}).colour(\"series5\").swatch()")
+
+	head("Palette")
+	test("colour.Palette([\"#00263e\", \"#d50032\", \"#ffb81c\", \"white\"]).snap(\"#c01040\").swatch()")
+	test("colour.Palette([\"#00263e\", \"#d50032\", \"#ffb81c\", \"white\"], space=\"yiq\").nearest(\"#c01040\", k=2)")
+	test("[colour.Palette.css3().names[i] for i, d in colour.Palette.css3().nearest(\"#c01040\", k=3)]")
+	test("[colour.Palette.css3(space=\"yiq\").names[i] for i, d in colour.Palette.css3(space=\"yiq\").nearest(\"#c01040\", k=3)]")
+	test("colour.Palette.css3().nearest_many([\"goldenrod\", \"#c01040\", \"goldenrod\"])")
+
+	head("Gradient")
+	test("colour.Gradient([\"red\", \"blue\"]).colour(0.5).swatch()")
+	test("colour.Gradient([\"red\", \"blue\"], space=\"hsv\").colour(0.5).swatch()")
+	test("colour.Gradient([\"red\", \"white\"], space=\"lch\").colour(0.5).swatch()")
+	test("colour.Gradient([\"black\", \"red\", \"yellow\", \"white\"], space=\"lab\").table(8, hex=True)")
+	test("colour.Gradient([(0, \"navy\"), (0.5, \"navy\"), (0.5, \"gold\"), (1, \"gold\")]).lookup([0.2, 0.5, 0.8], hex=True)")
+	test("colour.Gradient([\"#00263e\", \"#ffb81c\"], space=\"hsl\").sample(5).hex()")
+
 	head("conversion functions")
 	test("colour.rgbtohsv((0.2, 0.8, 0))")
 	test("colour.rgbtohsl((0.2, 0.8, 0))")
@@ -280,8 +385,49 @@ def main():
 	test("colour.hsvtorgb((88, 0.8, 0.4))")
 	test("colour.hsltorgb((88, 0.8, 0.4))")
 	test("colour.yiqtorgb((0.7, -0.8, 0.4))")
+	test("colour.rgbtolab((0.2, 0.8, 0))")
+	test("colour.labtorgb((50, 20, -30))")
+	test("colour.rgbtolch((0.2, 0.8, 0))")
+	test("colour.lchtorgb((50, 20, 300))")
 	test("colour.hextorgb(\"#342\")")
 	test("colour.rgbtohex((0.2, 0.8, 0))")
+	test("colour.hsvtorgb((88, 0.8, 0.4), trusted=True)")
+	test("colour.setluma((0.2, 0.8, 0), 0.3)")
+	test("colour.setluma_many([(0.2, 0.8, 0), (1, 1, 1)], [0.3, 0.5])")
+	test("Colour().rgb((0.2, 0.8, 0), trusted=True).swatch()")
+	test("colour.hextorgb_many([\"#342\", \"DAA520\", \"#c09\"])")
+	test("colour.rgbtohex_many([(0.2, 0.8, 0), (1, 0.4, 0.6)])")
+	test("colour.rgbtohex_many([(0.2, 0.8, 0), (1, 0.4, 0.6)], hash=False, allowshort=True)")
+	test("colour.rgb255tohsv255((218, 165, 32))")
+	test("colour.rgb255tohsl255((218, 165, 32))")
+	test("colour.rgb255toyiq255((218, 165, 32))")
+	test("colour.hsv255torgb255((43, 218, 218))")
+	test("colour.hsl255torgb255((43, 190, 125))")
+	test("colour.yiq255torgb255((166, 75, -30))")
+	test("colour.rgb255tohsv255_many([(218, 165, 32), (255, 0, 1), (218, 165, 32)])")
+	test("colour.hsl255torgb255_many([(43, 190, 125), (360, 255, 128)])")
+
+	head("ColourArray")
+	test("colour.ColourArray([\"goldenrod\", \"slateblue\", \"#c09\"]).hex()")
+	test("colour.ColourArray(hsv=(range(0, 360, 60), 0.8, 0.6)).hex()")
+	test("colour.ColourArray(hsv=(range(0, 360, 60), 0.8, 0.6)).shifthue(30, perceptual=True).hex()")
+	test("colour.ColourArray(hash=[\"tremby\", \"yappy\", \"mon\", \"bill\"]).hex()")
+	test("colour.ColourArray([\"goldenrod\", \"slateblue\"]).hsv255()")
+
+	head("ColourList")
+	test("colour.ColourList([\"goldenrod\", \"#c09\", (0.2, 0.4, 0.6), Colour(\"navy\")]).hex()")
+	test("colour.ColourList([\"goldenrod\", \"#c09\", (0.2, 0.4, 0.6), Colour(\"navy\")]).rgb255()")
+	test("colour.ColourList([\"goldenrod\", \"#c09\"])[0].hsv()")
+	test("colour.ColourList([\"goldenrod\", \"#c09\"])[-1].swatch()")
+	test("colour.ColourList([\"goldenrod\", \"#c09\"])[0].css3()")
+	test("Colour(colour.ColourList([\"goldenrod\", \"#c09\"])[0]).shiftluma(-0.5).swatch()")
+	test("colour.ColourList([\"goldenrod\", \"#c09\"]).memoryview().tolist()")
+	test("colour.ColourList.from_packed([0xdaa520, 0xcc0099]).hex(allowshort=True)")
+
+	if sys.version_info >= (3, 7):
+		head("colourd")
+		test("colourd._compute([(\"hash\", {\"key\": \"x\", \"minh\": [1]}), (\"hash\", {\"key\": \"tremby\"}), (\"css3\", {\"colour\": \"#daa520\"})])")
+		test("colourd._compute([(\"convert\", {\"function\": \"rgbtohex\", \"value\": [1e400, 0, 0]}), (\"convert\", {\"function\": \"rgbtohex\", \"value\": [1, 0.5, 0]})])")
 
 	head("cubes")
 